@@ -0,0 +1,70 @@
+"""Time the vectorized sig/ISI/xtalk metrics against the scalar functions.
+
+``rows`` waveforms of ``samples`` points on a non-uniform time grid are
+scored once with :func:`get_sig_isi` / :func:`integrate_nonuniform` per row
+and once with :func:`batch_sig_isi` / :func:`batch_abs_integral` for the
+whole block; the largest absolute difference is reported with the timings.
+
+    python benchmarks/batch_metrics.py --samples 10000 --rows 8 32 128
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import batch_abs_integral, batch_sig_isi, get_sig_isi, integrate_nonuniform  # noqa: E402
+
+
+def make_waveforms(rows: int, samples: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    steps = rng.uniform(0.5, 1.5, samples - 1)
+    time_ps = np.concatenate([[0.0], np.cumsum(steps)]) * (10000.0 / steps.sum())
+    volts = 0.05 * rng.standard_normal((rows, samples))
+    volts += 0.8 * np.exp(-((time_ps - 2000.0) / 80.0) ** 2)
+    return time_ps, volts
+
+
+def run_case(rows: int, samples: int, unit_interval: float):
+    time_ps, volts = make_waveforms(rows, samples)
+
+    start = time.perf_counter()
+    scalar = np.array([
+        (*get_sig_isi(time_ps, row, unit_interval), integrate_nonuniform(time_ps, np.abs(row)))
+        for row in volts
+    ])
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sig, isi = batch_sig_isi(time_ps, volts, unit_interval)
+    xtalk = batch_abs_integral(time_ps, volts)
+    batch_seconds = time.perf_counter() - start
+
+    error = float(np.max(np.abs(np.column_stack([sig, isi, xtalk]) - scalar)))
+    return scalar_seconds, batch_seconds, error
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--samples', type=int, default=10_000)
+    parser.add_argument('--ui', type=float, default=133.0, help='unit interval in ps')
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>6} {'samples':>8} {'scalar s':>9} {'batch s':>8} {'speedup':>8} {'max |diff|':>11}")
+    for rows in args.rows:
+        scalar_seconds, batch_seconds, error = run_case(rows, args.samples, args.ui)
+        print(
+            f"{rows:>6} {args.samples:>8} {scalar_seconds:>9.3f} {batch_seconds:>8.3f} "
+            f"{scalar_seconds / batch_seconds:>7.1f}x {error:>11.1e}"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
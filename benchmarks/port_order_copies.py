@@ -0,0 +1,130 @@
+"""Slice-copy bytes per pre_run with metadata versus locality port order.
+
+A synthetic board places ``nets`` single-ended nets side by side; each net
+has a controller and a DRAM port, and coupling falls off with the physical
+distance between nets, so the coupling graph is banded.  Net sequences are
+shuffled, as they are when the metadata is sorted by name, so in metadata
+order each TX's kept ports are scattered.  ``CCT.pre_run`` is then run once
+per port order on a fresh workdir and the bytes copied to build the trimmed
+touchstones are totalled: a kept set that is one index run is written from
+a view, any other set costs an ``(n_freq, k, k)`` complex128 copy.  The one
+permuted S copy the locality order writes to the sidecar is reported too.
+
+    python benchmarks/port_order_copies.py --nets 40 --freqs 50 --threshold -40
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import CCT, _index_runs, write_touchstone_ma  # noqa: E402
+
+
+def make_board(directory: Path, nets: int, freqs: int, seed: int = 0):
+    """Write a banded ``2 * nets``-port touchstone and its port metadata."""
+    rng = np.random.default_rng(seed)
+    position = rng.permutation(nets)  # physical slot of the net with sequence k
+    ports = 2 * nets
+    slot = np.repeat(position, 2)  # ports 2k (controller) and 2k + 1 (DRAM) of net k
+    side = np.tile([0, 1], nets)
+    distance = np.abs(slot[:, None] - slot[None, :])
+    loss_db = 25.0 + 12.0 * distance + 10.0 * (side[:, None] != side[None, :])
+    magnitude = 10 ** (-loss_db / 20)
+    same_net = distance == 0
+    magnitude[same_net & (side[:, None] != side[None, :])] = 0.9
+    np.fill_diagonal(magnitude, 0.1)
+
+    freqs_hz = np.linspace(1e7, 2e10, freqs)
+    phase = np.exp(-2j * np.pi * freqs_hz[:, None, None] * 1e-10 * (1 + distance[None]))
+    s_params = magnitude[None] * phase
+    snp_path = directory / f'banded.s{ports}p'
+    write_touchstone_ma(snp_path, freqs_hz, s_params)
+
+    entries = []
+    for net in range(nets):
+        for offset, (component, role) in enumerate((('U1', 'controller'), ('U2', 'dram'))):
+            entries.append({
+                'sequence': 2 * net + offset + 1,
+                'name': f'{component}_DQ<{net}>',
+                'component': component,
+                'component_role': role,
+                'net': f'DQ<{net}>',
+                'net_type': 'single',
+            })
+    metadata_path = directory / 'banded_ports.json'
+    metadata_path.write_text(json.dumps({
+        'reference_net': 'GND',
+        'controller_components': ['U1'],
+        'dram_components': ['U2'],
+        'ports': entries,
+    }), encoding='utf-8')
+    return snp_path, metadata_path
+
+
+def run_case(snp_path: Path, metadata_path: Path, port_order: str, threshold_db: float):
+    with tempfile.TemporaryDirectory() as workdir:
+        cct = CCT(snp_path, metadata_path, workdir=workdir, threshold_db=threshold_db, port_order=port_order)
+        cct.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+        cct.set_rxs(res_rx='30ohm', cap_rx='1.8pF')
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            summaries = cct.pre_run()
+        seconds = time.perf_counter() - start
+
+        n_freq = int(np.asarray(cct._network.f).size)
+        files = {}
+        for tx in cct.txs:
+            prune_result = cct._prune_cache[cct._tx_to_key(tx)]
+            indices = cct._network_indices(prune_result.kept_indices)
+            files[str(prune_result.touchstone_path)] = indices
+        copied = sum(n_freq * idx.size ** 2 * 16 for idx in files.values() if _index_runs(idx) > 1)
+        views = sum(1 for idx in files.values() if _index_runs(idx) == 1)
+        runs = np.mean([stats['kept_port_runs'] for stats in summaries])
+        kept = np.mean([stats['kept_port_count'] for stats in summaries])
+        permuted = n_freq * len(cct.port_metadata) ** 2 * 16 if cct._port_positions is not None else 0
+    return {
+        'files': len(files),
+        'views': views,
+        'runs': float(runs),
+        'kept': float(kept),
+        'copied': copied,
+        'permuted': permuted,
+        'seconds': seconds,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nets', type=int, default=40)
+    parser.add_argument('--freqs', type=int, default=50)
+    parser.add_argument('--threshold', type=float, default=-40.0, help='prune threshold in dB')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        snp_path, metadata_path = make_board(Path(directory), args.nets, args.freqs)
+        print(
+            f"{2 * args.nets} ports, {args.freqs} frequencies, threshold {args.threshold:g} dB\n"
+            f"{'order':>9} {'kept':>6} {'runs':>6} {'files':>6} {'views':>6} "
+            f"{'copied MB':>10} {'permuted MB':>12} {'pre_run s':>10}"
+        )
+        for port_order in ('metadata', 'locality'):
+            case = run_case(snp_path, metadata_path, port_order, args.threshold)
+            print(
+                f"{port_order:>9} {case['kept']:>6.1f} {case['runs']:>6.1f} {case['files']:>6d} {case['views']:>6d} "
+                f"{case['copied'] / 1024 ** 2:>10.1f} {case['permuted'] / 1024 ** 2:>12.1f} {case['seconds']:>10.2f}"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Peak RSS of the in-memory and disk-backed waveform stores versus port count.
+
+Each case runs in a fresh process: ``ports / 2`` TX blocks of ``ports / 2``
+RX waveforms are added to the store and then read back RX by RX, the way
+``CCT.calculate`` walks it.
+
+    python benchmarks/waveform_store_rss.py --ports 50 100 200 300
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import DiskWaveformStore, WaveformStore  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    try:
+        import psutil  # type: ignore
+
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024 ** 2
+    except ImportError:
+        import resource
+
+        # ru_maxrss is in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(mode: str, ports: int, samples: int) -> float:
+    txs = rxs = max(1, ports // 2)
+    time_values = np.linspace(0.0, 3e3, samples)
+    with tempfile.TemporaryDirectory() as workdir:
+        store = WaveformStore() if mode == 'memory' else DiskWaveformStore(workdir)
+        rx_ids = list(range(rxs))
+        rng = np.random.default_rng(0)
+        for tx in range(txs):
+            store.add(tx, time_values, rx_ids, rng.standard_normal((rxs, samples)))
+        total = 0.0
+        for rx in rx_ids:
+            for tx in store.txs_for(rx):
+                total += float(np.abs(store.get(rx, tx)[1]).max())
+        store.clear()
+        del store
+    return peak_rss_mb()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ports', type=int, nargs='+', default=[50, 100, 200, 300])
+    parser.add_argument('--samples', type=int, default=3001, help='samples per waveform (3 ns at 1 ps)')
+    parser.add_argument('--case', nargs=2, metavar=('MODE', 'PORTS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(f"{run_case(args.case[0], int(args.case[1]), args.samples):.1f}")
+        return 0
+
+    print(f"{'ports':>6} {'waveforms':>10} {'data MB':>9} {'memory MB':>10} {'disk MB':>9}")
+    for ports in args.ports:
+        peaks = []
+        for mode in ('memory', 'disk'):
+            out = subprocess.run(
+                [sys.executable, __file__, '--case', mode, str(ports), '--samples', str(args.samples)],
+                check=True, capture_output=True, text=True,
+            )
+            peaks.append(float(out.stdout.strip()))
+        count = (ports // 2) ** 2
+        data_mb = count * args.samples * 8 / 1024 ** 2
+        print(f"{ports:>6} {count:>10} {data_mb:>9.0f} {peaks[0]:>10.0f} {peaks[1]:>9.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,8 @@ try:
     from PySide6.QtGui import QColor, QBrush, QTextCursor
     from PySide6.QtWidgets import (
         QApplication,
+        QDialog,
+        QDialogButtonBox,
         QFileDialog,
         QCheckBox,
         QGroupBox,
@@ -41,6 +43,8 @@ except ImportError:  # pragma: no cover - fallback when PySide6 is unavailable
     from PySide2.QtGui import QColor, QBrush, QTextCursor
     from PySide2.QtWidgets import (
         QApplication,
+        QDialog,
+        QDialogButtonBox,
         QFileDialog,
         QCheckBox,
         QGroupBox,
@@ -79,11 +83,28 @@ if SRC_DIR.exists():
         sys.path.append(src_str)
 
 try:  # pragma: no cover - optional dependency at runtime
-    from cct import CCT, load_port_metadata, prefix_port_name, DEFAULT_CIRCUIT_VERSION
+    from cct import (
+        CCT,
+        load_port_metadata,
+        prefix_port_name,
+        service_available,
+        format_duration,
+        DEFAULT_CIRCUIT_VERSION,
+        PRUNE_CRITERIA,
+        SCREENING_PRECISIONS,
+        PORT_ORDERS,
+    )
 except ImportError:  # pragma: no cover - allow GUI without CCT backend
     CCT = None
     load_port_metadata = None
+    service_available = None
     DEFAULT_CIRCUIT_VERSION = "2025.1"
+    PRUNE_CRITERIA = ("peak", "band_peak", "band_energy", "sdd")
+    SCREENING_PRECISIONS = ("complex128", "complex64")
+    PORT_ORDERS = ("metadata", "locality")
+
+    def format_duration(seconds: float) -> str:
+        return f"{seconds / 3600:.2f} h"
 
     def prefix_port_name(name: str, sequence: int) -> str:
         base = str(name or '')
@@ -133,6 +154,7 @@ class _CctWorker(QObject):
     message = Signal(str)
     finished = Signal(str)
     failed = Signal(str, object)
+    sweep_ready = Signal(object)
 
     def __init__(
         self,
@@ -165,10 +187,18 @@ class _CctWorker(QObject):
                 threshold_value = None
 
             circuit_version = None
+            prune_criterion = 'peak'
+            screening_precision = 'complex128'
+            screening_report = False
+            port_order = 'metadata'
             if isinstance(options, dict):
                 version_candidate = options.get('circuit_version')
                 if version_candidate is not None:
                     circuit_version = str(version_candidate).strip() or None
+                prune_criterion = options.get('prune_criterion') or prune_criterion
+                screening_precision = options.get('screening_precision') or screening_precision
+                screening_report = options.get('screening_report', 'off') == 'on'
+                port_order = options.get('port_order') or port_order
 
             cct = CCT(
                 str(self._touchstone_path),
@@ -176,6 +206,10 @@ class _CctWorker(QObject):
                 workdir=self._workdir,
                 threshold_db=threshold_value,
                 circuit_version=circuit_version,
+                prune_criterion=prune_criterion,
+                screening_precision=screening_precision,
+                screening_report=screening_report,
+                port_order=port_order,
             )
 
             self.message.emit('Configuring transmit settings...')
@@ -197,21 +231,55 @@ class _CctWorker(QObject):
                 cap_rx=rx.get('cap_rx', ''),
             )
 
+            sweep_thresholds = self._parse_threshold_sweep(options.get('threshold_sweep') if isinstance(options, dict) else None)
+            if self._mode == 'prerun' and sweep_thresholds:
+                self.message.emit('Running threshold sweep...')
+                self.progress.emit(3)
+                sweep = cct.pre_run(sweep_thresholds)
+                self.progress.emit(4)
+                self.sweep_ready.emit(sweep)
+                self.finished.emit(f'Threshold sweep complete: {len(sweep)} transmitters, {len(sweep_thresholds)} thresholds.')
+                return
+
+            run_params = self._settings.get('run', {})
+            budget_hours = float(options.get('budget_hours') or 0.0) if isinstance(options, dict) else 0.0
+            budget_kwargs = {}
+            if budget_hours > 0:
+                budget_kwargs = {
+                    'budget_seconds': budget_hours * 3600.0,
+                    'tstep': run_params.get('tstep', '100ps'),
+                    'tstop': run_params.get('tstop', '3ns'),
+                    'licenses': int(run_params.get('workers', 1) or 1),
+                    'engine': run_params.get('engine', 'aedt'),
+                }
+
             if self._mode == 'prerun':
                 self.message.emit('Running pre-run threshold analysis...')
                 self.progress.emit(3)
-                summaries = cct.pre_run()
+                summaries = cct.pre_run(**budget_kwargs)
+                if budget_kwargs:
+                    threshold_value = cct.threshold_db
                 summary_text = self._summarize_prerun(summaries, threshold_value)
                 self.progress.emit(4)
                 self.finished.emit(summary_text)
                 return
 
+            if budget_kwargs:
+                self.message.emit('Selecting threshold for the time budget...')
+                cct.pre_run(**budget_kwargs)
             self.message.emit('Running transient simulation...')
             self.progress.emit(3)
-            run_params = self._settings.get('run', {})
+            use_service = run_params.get('engine', 'aedt') == 'aedt' and run_params.get('service') == 'on'
+            if use_service and service_available is not None and service_available():
+                self.message.emit('Running transient simulation on the CCT service...')
             cct.run(
                 tstep=run_params.get('tstep', ''),
                 tstop=run_params.get('tstop', ''),
+                workers=int(run_params.get('workers', 1) or 1),
+                batch_size=run_params.get('batch_size', 1),
+                engine=run_params.get('engine', 'aedt'),
+                service=use_service,
+                streaming=True,
             )
 
             self.message.emit('Generating CCT report...')
@@ -229,6 +297,25 @@ class _CctWorker(QObject):
         self.message.emit(f"CCT results saved to {self._output_path}")
         self.finished.emit(str(self._output_path))
 
+    @staticmethod
+    def _parse_threshold_sweep(text: object) -> List[float]:
+        """Parse ``"start:stop:step"`` (stop inclusive) or a comma separated list."""
+        raw = str(text or '').strip()
+        if not raw:
+            return []
+        if ':' in raw:
+            parts = [float(part) for part in raw.split(':')]
+            if len(parts) != 3 or parts[2] == 0:
+                raise ValueError(f'Invalid threshold sweep {raw!r}; expected start:stop:step')
+            start, stop, step = parts
+            values = []
+            value = start
+            while (value <= stop + 1e-9) if step > 0 else (value >= stop - 1e-9):
+                values.append(round(value, 6))
+                value += step
+            return values
+        return [float(part) for part in re.split(r'[,\s]+', raw) if part]
+
     @staticmethod
     def _summarize_prerun(summaries: List[Dict[str, object]], threshold_value: Optional[float]) -> str:
         if not summaries:
@@ -262,6 +349,8 @@ class _CctWorker(QObject):
                 line += f" ({port_ratio:.1%})"
             if total_rx:
                 line += f", rx {kept_rx}/{total_rx} ({rx_ratio:.1%})"
+            if 'predicted_seconds' in stats:
+                line += f", ~{format_duration(float(stats['predicted_seconds']))}"
             lines.append(line)
 
         if port_ratios:
@@ -272,6 +361,31 @@ class _CctWorker(QObject):
             insert_at = 2 if port_ratios else 1
             lines.insert(insert_at, f"Average kept RX ports: {avg_rx:.1%}")
 
+        if 'predicted_total_seconds' in summaries[0]:
+            predicted = float(summaries[0]['predicted_total_seconds'])
+            budget = float(summaries[0].get('budget_seconds', 0.0) or 0.0)
+            verdict = 'fits' if predicted <= budget else 'exceeds'
+            lines.insert(1, f"Predicted runtime {format_duration(predicted)} {verdict} the {format_duration(budget)} budget.")
+
+        by_criterion = [stats.get('kept_port_count_by_criterion') for stats in summaries]
+        if all(by_criterion):
+            total_ports = int(summaries[0].get('total_port_count', 0) or 0)
+            active = summaries[0].get('prune_criterion')
+            lines.append('Average kept ports by criterion:')
+            for name in by_criterion[0]:
+                average = sum(counts[name] for counts in by_criterion) / len(by_criterion)
+                line = f"  {name}: {average:.1f}/{total_ports}"
+                if name == active:
+                    line += " (active)"
+                lines.append(line)
+
+        if all('screening_match' in stats for stats in summaries):
+            changed = sum(1 for stats in summaries if not stats['screening_match'])
+            if changed:
+                lines.append(f"Screening precision changes the kept ports for {changed} TX; check the log.")
+            else:
+                lines.append('Screening precision matches complex128 pruning for every TX.')
+
         return "\n".join(lines)
 
 
@@ -314,22 +428,58 @@ DEFAULT_CCT_SETTINGS: Dict[str, float] = {
     "tstep": 100.0,
     "tstop": 3.0,
     "threshold_db": -60.0,
+    "workers": 1.0,
+    "batch_size": 1.0,
+    "budget_hours": 0.0,
 }
 
 DEFAULT_CCT_TEXT_SETTINGS: Dict[str, str] = {
     "circuit_version": DEFAULT_CIRCUIT_VERSION,
+    "threshold_sweep": "",
+}
+
+DEFAULT_CCT_CHOICE_SETTINGS: Dict[str, str] = {
+    "engine": "aedt",
+    "service": "off",
+    "prune_criterion": "peak",
+    "screening_precision": "complex128",
+    "screening_report": "off",
+    "port_order": "metadata",
+}
+
+CCT_CHOICE_OPTIONS: Dict[str, List[str]] = {
+    "engine": ["aedt", "local"],
+    "service": ["off", "on"],
+    "prune_criterion": list(PRUNE_CRITERIA),
+    "screening_precision": list(SCREENING_PRECISIONS),
+    "screening_report": ["off", "on"],
+    "port_order": list(PORT_ORDERS),
 }
 
 DEFAULT_CCT_ALL_SETTINGS: Dict[str, object] = {
     **DEFAULT_CCT_SETTINGS,
     **DEFAULT_CCT_TEXT_SETTINGS,
+    **DEFAULT_CCT_CHOICE_SETTINGS,
 }
 
 CCT_PARAM_GROUPS = {
     "tx": ["vhigh", "t_rise", "ui", "res_tx", "cap_tx"],
     "rx": ["res_rx", "cap_rx"],
     "transient": ["tstep", "tstop"],
-    "options": ["circuit_version", "threshold_db"],
+    "options": [
+        "circuit_version",
+        "threshold_db",
+        "threshold_sweep",
+        "prune_criterion",
+        "screening_precision",
+        "screening_report",
+        "port_order",
+        "budget_hours",
+        "workers",
+        "batch_size",
+        "engine",
+        "service",
+    ],
 }
 
 CCT_GROUP_ALIASES = {
@@ -355,7 +505,9 @@ class EdbGui(QWidget):
         self._settings = QSettings(SETTINGS_ORG, SETTINGS_APP)
         self._cct_param_spins: Dict[str, QDoubleSpinBox] = {}
         self._cct_text_fields: Dict[str, QLineEdit] = {}
+        self._cct_choice_fields: Dict[str, QComboBox] = {}
         self._active_cct_mode: Optional[str] = None
+        self._cct_sweep: Optional[List[Dict[str, object]]] = None
         self._cct_progress_steps = 4
         self.cutout_enable_checkbox: Optional[QCheckBox] = None
         self.cutout_expansion_spin: Optional[QDoubleSpinBox] = None
@@ -1010,6 +1162,59 @@ class EdbGui(QWidget):
         _add_param(transient_form, "tstop", "Transient Stop", "ns", 0.0, 1_000_000.0, 0.1, 3)
         _add_param(option_form, "threshold_db", "Threshold", "dB", -200.0, 0.0, 1.0, 1)
 
+        sweep_edit = QLineEdit()
+        sweep_edit.setPlaceholderText("e.g. -80:-30:5 (Pre-run sweep)")
+        sweep_edit.editingFinished.connect(self._persist_cct_settings)
+        option_form.addRow("Threshold Sweep", sweep_edit)
+        self._cct_text_fields["threshold_sweep"] = sweep_edit
+
+        criterion_combo = QComboBox()
+        criterion_combo.addItems(CCT_CHOICE_OPTIONS["prune_criterion"])
+        criterion_combo.setCurrentText(DEFAULT_CCT_CHOICE_SETTINGS["prune_criterion"])
+        criterion_combo.currentTextChanged.connect(self._persist_cct_settings)
+        option_form.addRow("Prune Criterion", criterion_combo)
+        self._cct_choice_fields["prune_criterion"] = criterion_combo
+
+        precision_combo = QComboBox()
+        precision_combo.addItems(CCT_CHOICE_OPTIONS["screening_precision"])
+        precision_combo.setCurrentText(DEFAULT_CCT_CHOICE_SETTINGS["screening_precision"])
+        precision_combo.currentTextChanged.connect(self._persist_cct_settings)
+        option_form.addRow("Screening Precision", precision_combo)
+        self._cct_choice_fields["screening_precision"] = precision_combo
+
+        report_combo = QComboBox()
+        report_combo.addItems(CCT_CHOICE_OPTIONS["screening_report"])
+        report_combo.setCurrentText(DEFAULT_CCT_CHOICE_SETTINGS["screening_report"])
+        report_combo.currentTextChanged.connect(self._persist_cct_settings)
+        option_form.addRow("Screening Report", report_combo)
+        self._cct_choice_fields["screening_report"] = report_combo
+
+        order_combo = QComboBox()
+        order_combo.addItems(CCT_CHOICE_OPTIONS["port_order"])
+        order_combo.setCurrentText(DEFAULT_CCT_CHOICE_SETTINGS["port_order"])
+        order_combo.currentTextChanged.connect(self._persist_cct_settings)
+        option_form.addRow("Port Order", order_combo)
+        self._cct_choice_fields["port_order"] = order_combo
+
+        _add_param(option_form, "budget_hours", "Time Budget (0 = off)", "h", 0.0, 10_000.0, 0.5, 2)
+
+        _add_param(option_form, "workers", "Parallel Workers", "", 1.0, 64.0, 1.0, 0)
+        _add_param(option_form, "batch_size", "TX Batch (0 = auto)", "", 0.0, 64.0, 1.0, 0)
+
+        engine_combo = QComboBox()
+        engine_combo.addItems(CCT_CHOICE_OPTIONS["engine"])
+        engine_combo.setCurrentText(DEFAULT_CCT_CHOICE_SETTINGS["engine"])
+        engine_combo.currentTextChanged.connect(self._persist_cct_settings)
+        option_form.addRow("Engine", engine_combo)
+        self._cct_choice_fields["engine"] = engine_combo
+
+        service_combo = QComboBox()
+        service_combo.addItems(CCT_CHOICE_OPTIONS["service"])
+        service_combo.setCurrentText(DEFAULT_CCT_CHOICE_SETTINGS["service"])
+        service_combo.currentTextChanged.connect(self._persist_cct_settings)
+        option_form.addRow("CCT Service", service_combo)
+        self._cct_choice_fields["service"] = service_combo
+
         params_row.addStretch(1)
 
         button_container = QWidget()
@@ -1325,6 +1530,8 @@ class EdbGui(QWidget):
             self._settings.setValue(f"cct/{key}", spin.value())
         for key, field in self._cct_text_fields.items():
             self._settings.setValue(f"cct/{key}", field.text().strip())
+        for key, combo in self._cct_choice_fields.items():
+            self._settings.setValue(f"cct/{key}", combo.currentText())
         self._settings.sync()
 
     def _restore_cct_settings(self) -> None:
@@ -1343,6 +1550,9 @@ class EdbGui(QWidget):
                 stored[key] = default
             else:
                 stored[key] = str(value)
+        for key, default in DEFAULT_CCT_CHOICE_SETTINGS.items():
+            value = self._settings.value(f"cct/{key}", default)
+            stored[key] = str(value) if value is not None else default
         self._apply_cct_values(stored, persist=False)
 
     def _current_cct_settings(self) -> Dict[str, object]:
@@ -1357,6 +1567,9 @@ class EdbGui(QWidget):
                 continue
             text = field.text().strip()
             values[key] = text if text else default
+        for key, default in DEFAULT_CCT_CHOICE_SETTINGS.items():
+            combo = self._cct_choice_fields.get(key)
+            values[key] = combo.currentText() if combo is not None else default
         return values
 
     @staticmethod
@@ -1389,6 +1602,16 @@ class EdbGui(QWidget):
                 was_blocked = field.blockSignals(True)
                 field.setText(text_value)
                 field.blockSignals(was_blocked)
+                continue
+
+            combo = self._cct_choice_fields.get(key)
+            if combo is not None:
+                choice = str(raw_value).strip() if raw_value is not None else ""
+                if choice not in CCT_CHOICE_OPTIONS.get(key, []):
+                    choice = DEFAULT_CCT_CHOICE_SETTINGS.get(key, "")
+                was_blocked = combo.blockSignals(True)
+                combo.setCurrentText(choice)
+                combo.blockSignals(was_blocked)
         if persist:
             self._persist_cct_settings()
 
@@ -1455,7 +1678,7 @@ class EdbGui(QWidget):
                     if key in section:
                         extracted[key] = section[key]
         else:
-            allowed_keys = set(DEFAULT_CCT_SETTINGS) | set(DEFAULT_CCT_TEXT_SETTINGS)
+            allowed_keys = set(DEFAULT_CCT_SETTINGS) | set(DEFAULT_CCT_TEXT_SETTINGS) | set(DEFAULT_CCT_CHOICE_SETTINGS)
             for key in allowed_keys:
                 if key in data:
                     extracted[key] = data[key]
@@ -1553,9 +1776,23 @@ class EdbGui(QWidget):
             "run": {
                 "tstep": self._format_with_unit(params.get("tstep", 0.0), "ps"),
                 "tstop": self._format_with_unit(params.get("tstop", 0.0), "ns"),
+                "workers": max(1, int(params.get("workers", 1) or 1)),
+                "batch_size": int(params.get("batch_size", 1)) or "auto",
+                "engine": str(params.get("engine") or DEFAULT_CCT_CHOICE_SETTINGS["engine"]),
+                "service": str(params.get("service") or DEFAULT_CCT_CHOICE_SETTINGS["service"]),
             },
             "options": {
                 "threshold_db": params.get("threshold_db"),
+                "prune_criterion": str(params.get("prune_criterion") or DEFAULT_CCT_CHOICE_SETTINGS["prune_criterion"]),
+                "screening_precision": str(
+                    params.get("screening_precision") or DEFAULT_CCT_CHOICE_SETTINGS["screening_precision"]
+                ),
+                "screening_report": str(
+                    params.get("screening_report") or DEFAULT_CCT_CHOICE_SETTINGS["screening_report"]
+                ),
+                "port_order": str(params.get("port_order") or DEFAULT_CCT_CHOICE_SETTINGS["port_order"]),
+                "threshold_sweep": str(params.get("threshold_sweep") or ""),
+                "budget_hours": float(params.get("budget_hours", 0.0) or 0.0),
                 "circuit_version": version_str,
             },
         }
@@ -1601,6 +1838,7 @@ class EdbGui(QWidget):
         worker.message.connect(self._set_status_message)
         worker.finished.connect(self._on_cct_finished)
         worker.failed.connect(self._on_cct_failed)
+        worker.sweep_ready.connect(self._on_cct_sweep_ready)
         worker.finished.connect(thread.quit)
         worker.failed.connect(thread.quit)
         worker.finished.connect(worker.deleteLater)
@@ -1665,7 +1903,11 @@ class EdbGui(QWidget):
         QApplication.restoreOverrideCursor()
         self._finalize_cct_feedback()
         mode = self._active_cct_mode or "run"
-        if mode == "prerun":
+        if mode == "prerun" and self._cct_sweep is not None:
+            sweep, self._cct_sweep = self._cct_sweep, None
+            self._show_threshold_sweep(sweep)
+            self._set_status_message(payload.strip() if payload else 'Threshold sweep complete')
+        elif mode == "prerun":
             summary = payload.strip() if payload else "Pre-run complete."
             QMessageBox.information(
                 self,
@@ -1684,6 +1926,49 @@ class EdbGui(QWidget):
         self._active_cct_mode = None
         self._update_cct_ui_state()
 
+    def _on_cct_sweep_ready(self, sweep: object) -> None:
+        self._cct_sweep = list(sweep) if sweep else []
+
+    def _show_threshold_sweep(self, sweep: List[Dict[str, object]]) -> None:
+        if not sweep:
+            QMessageBox.information(self, 'Threshold sweep', 'No transmitters evaluated.')
+            return
+        thresholds = list(sweep[0].get('thresholds', []))
+        total_ports = int(sweep[0].get('total_port_count', 0) or 0)
+        total_rx = int(sweep[0].get('total_rx_port_count', 0) or 0)
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle('Threshold sweep')
+        dialog.resize(900, 500)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel(
+            f"Kept ports / kept RX ports per TX ({sweep[0].get('prune_criterion', 'peak')} criterion, "
+            f"{total_ports} ports, {total_rx} RX ports in total)."
+        ))
+
+        table = QTableWidget(len(sweep) + 1, len(thresholds))
+        table.setHorizontalHeaderLabels([f"{value:g} dB" for value in thresholds])
+        table.setVerticalHeaderLabels([str(entry.get('tx_label', 'tx')) for entry in sweep] + ['Average'])
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for row, entry in enumerate(sweep):
+            for column, (ports, rx_ports) in enumerate(zip(entry['kept_port_count'], entry['kept_rx_port_count'])):
+                table.setItem(row, column, QTableWidgetItem(f"{ports} / {rx_ports}"))
+        for column in range(len(thresholds)):
+            avg_ports = sum(entry['kept_port_count'][column] for entry in sweep) / len(sweep)
+            avg_rx = sum(entry['kept_rx_port_count'][column] for entry in sweep) / len(sweep)
+            item = QTableWidgetItem(f"{avg_ports:.1f} / {avg_rx:.1f}")
+            font = item.font()
+            font.setBold(True)
+            item.setFont(font)
+            table.setItem(len(sweep), column, item)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok)
+        buttons.accepted.connect(dialog.accept)
+        layout.addWidget(buttons)
+        dialog.exec()
+
     def _on_cct_failed(self, kind: str, exc: object) -> None:
         QApplication.restoreOverrideCursor()
         self._finalize_cct_feedback()
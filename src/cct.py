@@ -1,10 +1,23 @@
+import csv
+import hashlib
 import json
 import math
+import numbers
+import os
 import re
+import secrets
+import shutil
+import tempfile
+import time
 import uuid
-from dataclasses import dataclass
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from multiprocessing.connection import Client
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 try:  # pragma: no cover - optional dependency
     from ansys.aedt.core import Circuit
@@ -23,14 +36,64 @@ import numpy as np
 ROOT_DIR = Path(__file__).resolve().parents[1]
 NETLIST_DEBUG_DIR = ROOT_DIR / "data" / "netlist"
 TRIMMED_TOUCHSTONE_DIRNAME = "trimmed_touchstone"
+PULSE_CACHE_DIRNAME = "pulse_cache"
+WAVEFORM_SHARD_DIRNAME = "waveforms"
+RUN_HISTORY_FILENAME = "run_history.json"
+RUN_HISTORY_LIMIT = 500
+DEFAULT_PULSE_CACHE_BYTES = 2 * 1024 ** 3
+DEFAULT_TRIMMED_CACHE_BYTES = 4 * 1024 ** 3
+# Frequency points per slice when scanning the full S-matrix for peak coupling,
+# capped so one slice of a large package stays within COUPLING_SCAN_BYTES.
+COUPLING_SCAN_CHUNK = 256
+COUPLING_SCAN_BYTES = 64 * 1024 ** 2
+# peak: |S| over all frequencies; band_peak: |S| up to the signal band edge;
+# band_energy: pulse-spectrum weighted power sum over the band; sdd: peak of
+# the mixed-mode (differential) coupling wherever a differential pair is involved.
+PRUNE_CRITERIA = ('peak', 'band_peak', 'band_energy', 'sdd')
+# S-data precision used for the coupling scan; complex64 halves its memory
+# traffic.  CCT(screening_report=True) makes pre_run also scan at complex128
+# and report how the decisions compare; use it to validate a board.
+SCREENING_PRECISIONS = ('complex128', 'complex64')
+# metadata: S-block ports in metadata order; locality: the always-kept
+# controller ports first, then a reverse Cuthill-McKee order of the coupling
+# graph, so most pruned port sets are one contiguous index range.
+PORT_ORDERS = ('metadata', 'locality')
+# Largest |Sij - Sji| accepted by the reciprocal mode.
+RECIPROCITY_TOLERANCE = 1e-6
+# Circuit versions whose Nexxim has been verified to read Touchstone 2.0
+# "[Matrix Format] Upper" files.  Reciprocal trimmed files use that format
+# only for these versions or with CCT(upper_touchstone=True).
+UPPER_TOUCHSTONE_VERSIONS: Tuple[str, ...] = ()
 DEFAULT_CIRCUIT_VERSION = "2025.1"
+DEFAULT_SERVICE_ADDRESS = ("127.0.0.1", 50731)
+# Binary transient result file Nexxim writes for the ``myTransient`` setup,
+# directly inside the circuit's results directory.
+TRANSIENT_RESULT_FILENAME = "myTransient.raw"
+SERVICE_AUTHKEY_PATH = Path.home() / ".cct" / "service_authkey"
+
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def _file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's bytes, memoised on path, size and mtime."""
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    memo_key = (str(resolved), stat.st_size, stat.st_mtime_ns)
+    digest = _FILE_DIGESTS.get(memo_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with resolved.open('rb') as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b''):
+                hasher.update(chunk)
+        digest = _FILE_DIGESTS[memo_key] = hasher.hexdigest()
+    return digest
 
 def integrate_nonuniform(x_list, y_list):
-    integral = 0.0
-    for i in range(len(x_list) - 1):
-        dx = x_list[i + 1] - x_list[i]
-        integral += 0.5 * (y_list[i] + y_list[i + 1]) * dx
-    return integral
+    x = np.asarray(x_list, dtype=float)
+    y = np.asarray(y_list, dtype=float)
+    if x.size < 2:
+        return 0.0
+    return float(np.sum(0.5 * (y[:-1] + y[1:]) * np.diff(x)))
 
 
 def get_sig_isi(time_list, voltage_list, unit_interval):
@@ -89,6 +152,156 @@ def get_sig_isi(time_list, voltage_list, unit_interval):
     return sig, isi
 
 
+# Upper bound on rows x window starts evaluated at once by batch_sig_isi.
+BATCH_METRIC_CHUNK = 1 << 22
+
+
+def batch_abs_integral(time_values, volts) -> np.ndarray:
+    """Trapezoidal integral of ``|v|`` for every row of ``volts``."""
+    t = np.asarray(time_values, dtype=float)
+    v = np.abs(np.asarray(volts, dtype=float))
+    if v.ndim != 2 or v.shape[1] != t.size:
+        raise ValueError("volts must be 2-D with one column per time sample")
+    if t.size < 2:
+        return np.zeros(v.shape[0])
+    return np.sum(0.5 * (v[:, :-1] + v[:, 1:]) * np.diff(t), axis=1)
+
+
+def batch_sig_isi(time_values, volts, unit_interval) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized :func:`get_sig_isi` for waveforms sharing one time axis.
+
+    Every UI window start ``t[i]`` is paired with its end sample through
+    ``searchsorted``; window integrals come from the cumulative trapezoid of
+    each row plus the interpolated partial segment at ``t[i] + ui``.
+    """
+    t = np.asarray(time_values, dtype=float)
+    v = np.asarray(volts, dtype=float)
+    if t.ndim != 1 or v.ndim != 2 or v.shape[1] != t.size:
+        raise ValueError("volts must be 2-D with one column per time sample")
+    if unit_interval <= 0:
+        raise ValueError("unit_interval must be positive")
+
+    order = np.argsort(t)
+    t = t[order]
+    v = v[:, order]
+
+    if t[-1] - t[0] < unit_interval:
+        raise ValueError("Waveform duration is shorter than unit interval")
+
+    n = t.size
+    last_i = np.searchsorted(t, t[-1] - unit_interval, side="right") - 1
+    if last_i < 0:
+        raise ValueError("No valid integration window of length unit_interval")
+
+    starts = np.arange(last_i + 1)
+    t_end = t[starts] + unit_interval
+    ends = np.minimum(np.searchsorted(t, t_end, side="right") - 1, n - 1)
+    nxt = np.minimum(ends + 1, n - 1)
+    partial = (ends + 1 < n) & (t[ends] < t_end) & (t_end < t[nxt])
+    span = t_end - t[ends]
+    seg = np.where(partial, t[nxt] - t[ends], 1.0)
+
+    dt = np.diff(t)
+    sig = np.empty(v.shape[0])
+    isi = np.empty(v.shape[0])
+    rows_per_chunk = max(1, BATCH_METRIC_CHUNK // starts.size)
+    for lo in range(0, v.shape[0], rows_per_chunk):
+        rows = v[lo:lo + rows_per_chunk]
+        trap = np.zeros((rows.shape[0], n))
+        np.cumsum((rows[:, :-1] + rows[:, 1:]) * 0.5 * dt, axis=1, out=trap[:, 1:])
+        v_j = rows[:, ends]
+        v_end = v_j + (rows[:, nxt] - v_j) * span / seg
+        integ = trap[:, ends] - trap[:, starts]
+        integ = np.where(partial, integ + 0.5 * (v_j + v_end) * span, integ)
+        best = np.argmax(integ, axis=1)
+        picked = np.arange(rows.shape[0])
+        sig[lo:lo + rows.shape[0]] = integ[picked, best]
+
+        absolute = np.abs(rows)
+        trap_abs = np.zeros_like(trap)
+        np.cumsum((absolute[:, :-1] + absolute[:, 1:]) * 0.5 * dt, axis=1, out=trap_abs[:, 1:])
+        i, j = starts[best], ends[best]
+        integ_abs = trap_abs[picked, j] - trap_abs[picked, i]
+        v_end_best = v_end[picked, best]
+        integ_abs = np.where(
+            partial[best],
+            integ_abs + 0.5 * (absolute[picked, j] + np.abs(v_end_best)) * span[best],
+            integ_abs,
+        )
+        isi[lo:lo + rows.shape[0]] = trap_abs[:, -1] - integ_abs
+    return sig, isi
+
+
+class ChannelMetrics:
+    """Per-RX sig/ISI/xtalk sums, fed one TX block of waveforms at a time.
+
+    A block holds every RX reached by one TX; rows whose RX expects that TX
+    give signal and ISI, the others add their integrated ``|v|`` to xtalk.
+    Crosstalk terms are summed in ``tx_order`` (arrival order by default), so
+    the result does not depend on which TX finished first.
+    """
+
+    def __init__(self, rxs: Iterable[object], unit_interval: float, tx_order: Optional[Iterable[object]] = None):
+        self.rxs = list(rxs)
+        self.unit_interval = float(unit_interval)
+        self._index = {rx: idx for idx, rx in enumerate(self.rxs)}
+        self._tx_order = list(tx_order) if tx_order is not None else []
+        self._xtalk_terms: Dict[object, Tuple[List[int], np.ndarray]] = {}
+        self.sig = np.zeros(len(self.rxs))
+        self.isi = np.zeros(len(self.rxs))
+        self.has_primary = np.zeros(len(self.rxs), dtype=bool)
+
+    @property
+    def xtalk(self) -> np.ndarray:
+        total = np.zeros(len(self.rxs))
+        ordered = [tx for tx in self._tx_order if tx in self._xtalk_terms]
+        seen = set(ordered)
+        ordered.extend(tx for tx in self._xtalk_terms if tx not in seen)
+        for tx in ordered:
+            idx, values = self._xtalk_terms[tx]
+            total[idx] += values
+        return total
+
+    def add(self, tx: object, time_values: np.ndarray, rxs: List[object], volts: np.ndarray) -> None:
+        primary_rows, primary_idx, other_rows, other_idx = [], [], [], []
+        for row, rx in enumerate(rxs):
+            idx = self._index.get(rx)
+            if idx is None:
+                continue
+            if getattr(rx, 'expected_tx', None) is tx:
+                primary_rows.append(row)
+                primary_idx.append(idx)
+            else:
+                other_rows.append(row)
+                other_idx.append(idx)
+        if primary_rows:
+            sig, isi = batch_sig_isi(time_values, volts[primary_rows], self.unit_interval)
+            self.sig[primary_idx] = sig
+            self.isi[primary_idx] = isi
+            self.has_primary[primary_idx] = True
+        if other_rows:
+            self._xtalk_terms[tx] = (other_idx, batch_abs_integral(time_values, volts[other_rows]))
+
+    def rows(self) -> List[str]:
+        xtalk = self.xtalk
+        pseudo_eye = self.sig - self.isi - xtalk
+        denom = self.isi + xtalk
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_ratio = np.where(denom != 0, self.sig / np.where(denom != 0, denom, 1.0), np.inf)
+        lines = []
+        for idx, rx in enumerate(self.rxs):
+            if not self.has_primary[idx]:
+                continue
+            primary_tx = rx.expected_tx
+            tx_label = getattr(primary_tx, 'label', getattr(primary_tx, 'pid', 'unknown'))
+            rx_label = getattr(rx, 'label', str(getattr(rx, 'pid', 'unknown')))
+            lines.append(
+                f'{tx_label}, {rx_label}, {self.sig[idx]:.3f}, {self.isi[idx]:.3f}, {xtalk[idx]:.3f}, '
+                f'{pseudo_eye[idx]:.3f}, {p_ratio[idx]:.3f}'
+            )
+        return lines
+
+
 @dataclass
 class PortMetadata:
     sequence: int
@@ -103,13 +316,50 @@ class PortMetadata:
 
 @dataclass
 class PruneResult:
-    kept_sequences: List[int]
-    trimmed_metadata: List[PortMetadata]
+    """Pruned port set of one TX.
+
+    ``kept_indices`` are the kept ports (``sequence - 1``) in S-block order;
+    ``tx_groups`` and ``rx_groups`` index the TX/RX groups precomputed by
+    :class:`CCT`, in netlist order.  The trimmed metadata and Tx/Rx objects
+    are built on first access, i.e. only when a netlist is emitted.
+    """
+
+    kept_indices: np.ndarray
+    tx_groups: np.ndarray
+    rx_groups: np.ndarray
     touchstone_path: Path
-    txs: List[object]
-    rxs: List[object]
-    tx_lookup: Dict[Tuple[str, str], object]
     stats: Dict[str, object]
+    materialize: Optional[Callable[["PruneResult"], Tuple]] = field(default=None, repr=False)
+    _objects: Optional[Tuple] = field(default=None, repr=False)
+
+    @property
+    def kept_sequences(self) -> List[int]:
+        return (self.kept_indices + 1).tolist()
+
+    def clear_objects(self) -> None:
+        """Drop the materialized objects; the next access rebuilds them."""
+        self._objects = None
+
+    def _materialized(self) -> Tuple:
+        if self._objects is None:
+            self._objects = self.materialize(self)
+        return self._objects
+
+    @property
+    def trimmed_metadata(self) -> List[PortMetadata]:
+        return self._materialized()[0]
+
+    @property
+    def txs(self) -> List[object]:
+        return self._materialized()[1]
+
+    @property
+    def rxs(self) -> List[object]:
+        return self._materialized()[2]
+
+    @property
+    def tx_lookup(self) -> Dict[Tuple[str, str], object]:
+        return self._materialized()[3]
 
 
 def _normalize_role(value: Optional[str]) -> str:
@@ -265,7 +515,6 @@ class Rx:
             f"R{self.pid} net_{self.pid} 0 {res_rx}",
             f"C{self.pid} net_{self.pid} 0 {cap_rx}",
         ]
-        self.waveforms: Dict[object, Tuple[List[float], List[float]]] = {}
         self.expected_tx: Optional[object] = None
         self.kind = 'single'
         self.key = meta.net
@@ -287,7 +536,6 @@ class Rx_diff:
             f"R{self.pid_neg} net_{self.pid_neg} 0 {res_rx}",
             f"C{self.pid_neg} net_{self.pid_neg} 0 {cap_rx}",
         ]
-        self.waveforms: Dict[object, Tuple[List[float], List[float]]] = {}
         self.expected_tx: Optional[object] = None
         self.kind = 'diff'
         self.key = tuple(sorted([positive.net, negative.net]))
@@ -296,9 +544,280 @@ class Rx_diff:
         return self.netlist
 
 
+class WaveformStore:
+    """RX waveforms of every simulated TX, one contiguous block per TX.
+
+    Each TX simulation shares a single time vector, and the voltages of all
+    RXs it reached are kept in one ``(n_rx, n_samples)`` array.  ``dtype``
+    may be ``float32`` to halve memory; times stay float64.
+    """
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self._blocks: Dict[object, Tuple[np.ndarray, np.ndarray, Dict[object, int]]] = {}
+        self._rx_txs: Dict[object, List[object]] = {}
+
+    def add(self, tx: object, time_values: np.ndarray, rxs: List[object], volts: np.ndarray) -> None:
+        volts = np.asarray(volts)
+        if volts.dtype != self.dtype:
+            volts = volts.astype(self.dtype)
+        rows = {rx: row for row, rx in enumerate(rxs)}
+        if tx in self._blocks:
+            self.discard(tx)
+        self._blocks[tx] = (np.asarray(time_values, dtype=float), volts, rows)
+        for rx in rxs:
+            self._rx_txs.setdefault(rx, []).append(tx)
+
+    def discard(self, tx: object) -> None:
+        block = self._blocks.pop(tx, None)
+        if block is None:
+            return
+        for rx in block[2]:
+            self._rx_txs[rx].remove(tx)
+
+    def get(self, rx: object, tx: object) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        block = self._blocks.get(tx)
+        if block is None:
+            return None
+        row = block[2].get(rx)
+        if row is None:
+            return None
+        return block[0], block[1][row]
+
+    def block(self, tx: object) -> Optional[Tuple[np.ndarray, List[object], np.ndarray]]:
+        block = self._blocks.get(tx)
+        if block is None:
+            return None
+        return block[0], list(block[2]), block[1]
+
+    def txs(self) -> List[object]:
+        return list(self._blocks)
+
+    def txs_for(self, rx: object) -> List[object]:
+        return list(self._rx_txs.get(rx, []))
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._rx_txs.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(t.nbytes + v.nbytes for t, v, _ in self._blocks.values())
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+
+class DiskWaveformStore(WaveformStore):
+    """:class:`WaveformStore` that keeps each TX block in ``.npy`` shards.
+
+    Blocks are written to ``<n>_time.npy`` and ``<n>_volts.npy`` in a
+    private ``store_*`` subdirectory of ``directory`` as soon as they are
+    added and read back as read-only memory maps, so resident memory is
+    bounded by the few shards opened at a time rather than by TX x RX x
+    samples.  Stores sharing ``directory`` never touch each other's shards;
+    the subdirectory is removed when the store is garbage collected.
+    """
+
+    def __init__(self, directory: str | Path, dtype=np.float64, open_shards: int = 4):
+        super().__init__(dtype)
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix='store_', dir=directory))
+        self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.directory), True)
+        self._open_shards = max(1, int(open_shards))
+        self._mapped: Dict[object, Tuple[np.ndarray, np.ndarray]] = {}
+        self._shard_bytes: Dict[object, int] = {}
+        self._counter = 0
+
+    def add(self, tx: object, time_values: np.ndarray, rxs: List[object], volts: np.ndarray) -> None:
+        if tx in self._blocks:
+            self.discard(tx)
+        self._counter += 1
+        time_path = self.directory / f"{self._counter:05d}_time.npy"
+        volts_path = self.directory / f"{self._counter:05d}_volts.npy"
+        time_values = np.asarray(time_values, dtype=float)
+        volts = np.asarray(volts, dtype=self.dtype)
+        np.save(time_path, time_values)
+        np.save(volts_path, volts)
+        self._shard_bytes[tx] = time_values.nbytes + volts.nbytes
+        self._blocks[tx] = (time_path, volts_path, {rx: row for row, rx in enumerate(rxs)})
+        for rx in rxs:
+            self._rx_txs.setdefault(rx, []).append(tx)
+
+    def _load(self, tx: object) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        block = self._blocks.get(tx)
+        if block is None:
+            return None
+        mapped = self._mapped.pop(tx, None)
+        if mapped is None:
+            mapped = (np.load(block[0], mmap_mode='r'), np.load(block[1], mmap_mode='r'))
+        self._mapped[tx] = mapped
+        while len(self._mapped) > self._open_shards:
+            self._mapped.pop(next(iter(self._mapped)))
+        return mapped
+
+    def get(self, rx: object, tx: object) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        block = self._blocks.get(tx)
+        if block is None or rx not in block[2]:
+            return None
+        time_values, volts = self._load(tx)
+        return time_values, volts[block[2][rx]]
+
+    def block(self, tx: object) -> Optional[Tuple[np.ndarray, List[object], np.ndarray]]:
+        mapped = self._load(tx)
+        if mapped is None:
+            return None
+        return mapped[0], list(self._blocks[tx][2]), mapped[1]
+
+    def discard(self, tx: object) -> None:
+        block = self._blocks.get(tx)
+        if block is None:
+            return
+        self._mapped.pop(tx, None)
+        self._shard_bytes.pop(tx, None)
+        super().discard(tx)
+        for path in block[:2]:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for tx in list(self._blocks):
+            self.discard(tx)
+        self._mapped.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._shard_bytes.values())
+
+
+@dataclass
+class SimulationJob:
+    tx: object
+    prune_result: PruneResult
+    netlist_text: str
+
+
+class _StandInSetup:
+    def __init__(self) -> None:
+        self.props: Dict[str, object] = {}
+
+    def update(self) -> bool:
+        return True
+
+
+class _StandInSolutionData:
+    def __init__(self, time_ns: List[float], volts_mv: List[float]) -> None:
+        self.primary_sweep_values = time_ns
+        self._volts_mv = volts_mv
+
+    def data_real(self) -> List[float]:
+        return self._volts_mv
+
+
+class _StandInPost:
+    def __init__(self, circuit: "CircuitStandIn") -> None:
+        self._circuit = circuit
+
+    def available_report_quantities(self) -> List[str]:
+        return list(self._circuit.solutions)
+
+    def get_solution_data(self, expression: str, domain: str = 'Time') -> _StandInSolutionData:
+        time_ns, volts_mv = self._circuit.solutions[expression]
+        return _StandInSolutionData(time_ns, volts_mv)
+
+    def create_report(self, expressions=None, plot_name: Optional[str] = None, **_kwargs) -> str:
+        self._circuit.reports[plot_name] = list(expressions or [])
+        return plot_name
+
+    def export_report_to_csv(self, project_dir: str, plot_name: str, **_kwargs) -> str:
+        expressions = self._circuit.reports[plot_name]
+        path = Path(project_dir) / f"{plot_name}.csv"
+        columns = [self._circuit.solutions[expr] for expr in expressions]
+        with path.open('w', newline='', encoding='utf-8') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(['Time [ns]'] + [f'{expr} [mV]' for expr in expressions])
+            time_ns = columns[0][0] if columns else []
+            for row, t in enumerate(time_ns):
+                writer.writerow([repr(t)] + [repr(column[1][row]) for column in columns])
+        return str(path)
+
+    def delete_report(self, plot_name: str) -> bool:
+        return self._circuit.reports.pop(plot_name, None) is not None
+
+
+class _StandInDesign:
+    def __init__(self, circuit: "CircuitStandIn") -> None:
+        self._circuit = circuit
+
+    def InvalidateSolution(self, _setup_name: str) -> None:
+        self._circuit.solutions = {}
+
+
+class CircuitStandIn:
+    """Minimal local replacement for ``ansys.aedt.core.Circuit``.
+
+    Implements only the calls made by :class:`Design`.  ``analyze`` reads the
+    netlist datablock and produces a deterministic decaying pulse on every
+    ``net_<n>`` node, so job scheduling and result merging can be exercised on
+    machines without AEDT.  Like Nexxim it also writes a binary transient
+    result file into :attr:`results_directory`; set ``write_results_file`` to
+    ``False`` on a subclass to exercise the report-export path instead.
+    """
+
+    write_results_file = True
+
+    def __init__(self, version: Optional[str] = None, non_graphical: bool = True, close_on_exit: bool = True, **_kwargs):
+        self.version = version
+        self.results_directory: Optional[str] = None
+        self.odesign = _StandInDesign(self)
+        self.post = _StandInPost(self)
+        self.solutions: Dict[str, Tuple[List[float], List[float]]] = {}
+        self.reports: Dict[str, List[str]] = {}
+        self._netlist_path: Optional[Path] = None
+        self._setup = _StandInSetup()
+
+    def add_netlist_datablock(self, path: str) -> None:
+        self._netlist_path = Path(path)
+        self.results_directory = str(self._netlist_path.with_suffix('.results'))
+
+    def create_setup(self, _name: str, _setup_type: object = None) -> _StandInSetup:
+        return self._setup
+
+    def save_project(self) -> bool:
+        return True
+
+    def analyze(self, _setup_name: str) -> bool:
+        text = self._netlist_path.read_text(encoding='utf-8') if self._netlist_path else ''
+        nodes = sorted(set(re.findall(r'\b((?:b\d+_)?net_(\d+))\b', text)))
+        time_ns = [0.01 * i for i in range(301)]
+        self.solutions = {
+            f'V({name})': (time_ns, [1000.0 / int(number) * math.exp(-t) for t in time_ns])
+            for name, number in nodes
+        }
+        if self.write_results_file and self.results_directory and self.solutions:
+            names = list(self.solutions)
+            results_dir = Path(self.results_directory)
+            results_dir.mkdir(parents=True, exist_ok=True)
+            write_transient_raw(
+                results_dir / TRANSIENT_RESULT_FILENAME,
+                np.asarray(time_ns) * 1e-9,
+                names,
+                np.asarray([self.solutions[name][1] for name in names]) * 1e-3,
+            )
+        return True
+
+
 class Design:
-    def __init__(self, workdir: Path, tstep='100ps', tstop='3ns', version: Optional[str] = None):
-        if Circuit is None or Setups is None:
+    def __init__(
+        self,
+        workdir: Path,
+        tstep='100ps',
+        tstop='3ns',
+        version: Optional[str] = None,
+        circuit_factory=None,
+        new_desktop: bool = False,
+    ):
+        circuit_cls = circuit_factory or Circuit
+        if circuit_cls is None or (circuit_factory is None and Setups is None):
             raise ImportError("ansys.aedt.core is required to run CCT simulations")
 
         self.workdir = Path(workdir)
@@ -310,37 +829,1496 @@ class Design:
         version_str = (str(version).strip() if version is not None else '') or DEFAULT_CIRCUIT_VERSION
         self.circuit_version = version_str
 
-        self.circuit = circuit = Circuit(
+        circuit_kwargs = {"new_desktop": True} if new_desktop else {}
+        self.circuit = circuit = circuit_cls(
             version=self.circuit_version,
             non_graphical=True,
             close_on_exit=True,
+            **circuit_kwargs,
         )
 
         circuit.add_netlist_datablock(str(self.netlist_path))
-        self.setup = circuit.create_setup('myTransient', Setups.NexximTransient)
+        setup_type = Setups.NexximTransient if Setups is not None else None
+        self.setup = circuit.create_setup('myTransient', setup_type)
         self.setup.props['TransientData'] = [tstep, tstop]
+        self.transient = (tstep, tstop)
         self.circuit.save_project()
+        self.timings: Dict[str, float] = {}
+        self.run_count = 0
+        self._bulk_extract = True
+
+    def set_transient(self, tstep, tstop) -> None:
+        if (tstep, tstop) == self.transient:
+            return
+        self.setup.props['TransientData'] = [tstep, tstop]
+        update = getattr(self.setup, 'update', None)
+        if callable(update):
+            update()
+        self.transient = (tstep, tstop)
+
+    def close(self) -> None:
+        release = getattr(self.circuit, 'release_desktop', None)
+        if callable(release):
+            release()
 
     def run(self, netlist):
+        raw = self._simulate(netlist)
+        result = {}
+        for v, waveform in raw.items():
+            m = re.search(r'net_(\d+)', v)
+            if m:
+                number = int(m.group(1))
+                result[number] = waveform
+        return result
+
+    def run_batch(self, netlist, batch_count: int) -> List[Dict[int, Tuple[List[float], List[float]]]]:
+        """Run a netlist holding ``batch_count`` prefixed copies of the channel.
+
+        Node names of copy ``k`` carry the ``b<k>_`` prefix written by
+        :func:`prefix_netlist_lines`; the results are split back into one
+        ``{net_number: waveform}`` dictionary per copy.
+        """
+        raw = self._simulate(netlist)
+        results: List[Dict[int, Tuple[List[float], List[float]]]] = [{} for _ in range(batch_count)]
+        for v, waveform in raw.items():
+            m = re.search(r'(?<!\w)b(\d+)_net_(\d+)\b', v)
+            if not m:
+                continue
+            batch_index = int(m.group(1)) - 1
+            if 0 <= batch_index < batch_count:
+                results[batch_index][int(m.group(2))] = waveform
+        return results
+
+    def _simulate(self, netlist) -> Dict[str, Tuple[List[float], List[float]]]:
+        start = time.perf_counter()
         with open(self.netlist_path, 'w') as f:
             f.write(netlist)
+        start = self._record_phase('write', start)
 
         self.circuit.odesign.InvalidateSolution('myTransient')
         self.circuit.save_project()
+        fresh = self._discard_results_file()
+        start = self._record_phase('invalidate', start)
         self.circuit.analyze('myTransient')
+        start = self._record_phase('analyze', start)
         self.circuit.save_project()
+        start = self._record_phase('save', start)
 
-        result = {}
+        raw = self._read_results_file() if fresh else None
+        if raw is None and self._bulk_extract:
+            try:
+                raw = self._extract_bulk()
+            except Exception as exc:
+                print(f"[timing] Bulk waveform export failed ({exc}); using per-quantity extraction")
+                self._bulk_extract = False
+        if raw is None:
+            raw = self._extract_per_quantity()
+        self._record_phase('extract', start)
+        self.run_count += 1
+        return raw
+
+    def _discard_results_file(self) -> bool:
+        """Delete the previous result file so an analyze that writes none cannot return it.
+
+        Returns ``False`` if a file is left in place, which must then not be read.
+        """
+        directory = getattr(self.circuit, 'results_directory', None)
+        if not directory:
+            return True
+        try:
+            (Path(directory) / TRANSIENT_RESULT_FILENAME).unlink(missing_ok=True)
+        except OSError:
+            return False
+        return True
+
+    def _read_results_file(self) -> Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """Read the ``net_*`` voltages from the result file of this analyze call.
+
+        Only :data:`TRANSIENT_RESULT_FILENAME` directly in the circuit's
+        results directory is accepted; :meth:`_discard_results_file` removes
+        it before each analyze, so a file found here was written by that call.
+        The voltages are copied out in one block and the mapping is released,
+        so the next analyze can rewrite the file.
+        """
+        directory = getattr(self.circuit, 'results_directory', None)
+        if not directory:
+            return None
+        path = Path(directory) / TRANSIENT_RESULT_FILENAME
+        if not path.is_file():
+            return None
+        try:
+            raw_file = TransientRawFile(path)
+        except ValueError as exc:
+            print(f"[timing] Cannot map transient result file ({exc}); using report export")
+            return None
+        with raw_file:
+            names = [name for name in raw_file.names[1:] if re.search(r'net_\d+', name)]
+            volts = raw_file.columns(names)
+            time_ps = raw_file.time_ps
+        return {name: (time_ps, row) for name, row in zip(names, volts)}
+
+    def _extract_per_quantity(self) -> Dict[str, Tuple[List[float], List[float]]]:
+        raw = {}
         for v in self.circuit.post.available_report_quantities():
             data = self.circuit.post.get_solution_data(v, domain='Time')
             x = [1e3 * i for i in data.primary_sweep_values]
             y = [1e-3 * i for i in data.data_real()]
-            m = re.search(r'net_(\d+)', v)
+            raw[v] = (x, y)
+        return raw
+
+    def _extract_bulk(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Export every ``net_*`` voltage in one report and parse it with NumPy."""
+        post = self.circuit.post
+        quantities = [q for q in post.available_report_quantities() if re.search(r'net_\d+', q)]
+        if not quantities:
+            return {}
+        plot_name = f"cct_waveforms_{uuid.uuid4().hex[:8]}"
+        post.create_report(
+            expressions=quantities,
+            setup_sweep_name='myTransient',
+            domain='Time',
+            primary_sweep_variable='Time',
+            plot_name=plot_name,
+        )
+        try:
+            csv_path = post.export_report_to_csv(str(self.workdir), plot_name)
+        finally:
+            post.delete_report(plot_name)
+        names, time_ps, volts = parse_waveform_csv(csv_path)
+        Path(csv_path).unlink(missing_ok=True)
+        return {name: (time_ps, volts[row]) for row, name in enumerate(names)}
+
+    def _record_phase(self, phase: str, start: float) -> float:
+        now = time.perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.0) + (now - start)
+        return now
+
+    def log_timings(self) -> None:
+        if not self.run_count:
+            return
+        total = sum(self.timings.values())
+        parts = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in self.timings.items())
+        print(f"[timing] {self.run_count} analyze calls, {total:.2f}s total: {parts}")
+
+
+class TransientRawFile:
+    """Memory-mapped reader for binary SPICE/Nexxim transient result files.
+
+    The file is an ASCII header (``No. Variables``, ``No. Points``,
+    ``Variables:`` table) followed by ``Binary:`` and one little-endian
+    float64 record per time point.  :meth:`column` returns zero-copy views of
+    the mapped record array and :meth:`columns` copies several at once; the
+    time axis is copied for the s -> ps conversion.  Use it as a context
+    manager (or call :meth:`close`) to release the mapping.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        names: List[str] = []
+        variable_count = point_count = None
+        flags = ''
+        with self.path.open('rb') as handle:
+            in_variables = False
+            while True:
+                line = handle.readline()
+                if not line:
+                    raise ValueError(f"No binary data block in {self.path}")
+                text = line.decode('latin-1').strip()
+                if text.lower().startswith('binary:'):
+                    offset = handle.tell()
+                    break
+                if text.lower().startswith('values:'):
+                    raise ValueError("ASCII result files are not supported")
+                key, _, value = text.partition(':')
+                key = key.strip().lower()
+                if in_variables and not value and text:
+                    fields = text.split()
+                    if len(fields) >= 2 and fields[0].isdigit():
+                        names.append(fields[1])
+                        continue
+                if key == 'flags':
+                    flags = value.strip().lower()
+                elif key == 'no. variables':
+                    variable_count = int(value)
+                elif key == 'no. points':
+                    point_count = int(value)
+                elif key == 'variables':
+                    in_variables = True
+                    fields = value.split()
+                    if len(fields) >= 2 and fields[0].isdigit():
+                        names.append(fields[1])
+        if 'complex' in flags:
+            raise ValueError("Complex result files are not supported")
+        if not variable_count or point_count is None or len(names) != variable_count:
+            raise ValueError(f"Malformed result header in {self.path}")
+
+        self.names = names
+        self._index = {name: i for i, name in enumerate(names)}
+        self.data = np.memmap(self.path, dtype='<f8', mode='r', offset=offset, shape=(point_count, variable_count))
+        self.time_ps = np.asarray(self.data[:, 0]) * 1e12
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[:, self._index[name]]
+
+    def columns(self, names: List[str]) -> np.ndarray:
+        """``(len(names), n_points)`` copy of the named columns."""
+        return np.array(self.data[:, [self._index[name] for name in names]].T)
+
+    def close(self) -> None:
+        # The file stays mapped until the last view of ``data`` is gone.
+        self.data = None
+
+    def __enter__(self) -> "TransientRawFile":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+def write_transient_raw(path: str | Path, time_s: np.ndarray, names: List[str], volts: np.ndarray) -> None:
+    """Write a binary transient result file readable by :class:`TransientRawFile`."""
+    volts = np.atleast_2d(np.asarray(volts, dtype='<f8'))
+    records = np.column_stack([np.asarray(time_s, dtype='<f8'), volts.T])
+    header = [
+        'Title: CCT',
+        'Plotname: Transient Analysis',
+        'Flags: real',
+        f'No. Variables: {records.shape[1]}',
+        f'No. Points: {records.shape[0]}',
+        'Variables:',
+        '\t0\ttime\ttime',
+    ]
+    header.extend(f'\t{i}\t{name}\tvoltage' for i, name in enumerate(names, 1))
+    header.append('Binary:')
+    with Path(path).open('wb') as handle:
+        handle.write(('\n'.join(header) + '\n').encode('latin-1'))
+        handle.write(np.ascontiguousarray(records).tobytes())
+
+
+_TIME_UNITS_TO_PS = {'s': 1e12, 'ms': 1e9, 'us': 1e6, 'ns': 1e3, 'ps': 1.0, 'fs': 1e-3}
+_VOLTAGE_UNITS_TO_V = {'kv': 1e3, 'v': 1.0, 'mv': 1e-3, 'uv': 1e-6, 'nv': 1e-9}
+
+
+def _split_unit(header: str) -> Tuple[str, str]:
+    m = re.match(r'^\s*(.*?)\s*\[([^\]]*)\]\s*$', header)
+    if m:
+        return m.group(1), m.group(2).strip()
+    return header.strip(), ''
+
+
+def parse_waveform_csv(path: str | Path) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Parse an exported multi-trace transient report.
+
+    Returns the trace names, the shared time axis in ps and a
+    ``(n_traces, n_samples)`` voltage array in V.  Units are read from the
+    ``name [unit]`` column headers and applied to whole columns at once.
+    """
+    path = Path(path)
+    with path.open('r', newline='', encoding='utf-8') as handle:
+        header = next(csv.reader(handle))
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    _, time_unit = _split_unit(header[0])
+    time_ps = data[:, 0] * _TIME_UNITS_TO_PS.get(time_unit.lower(), 1e3)
+
+    names: List[str] = []
+    scales: List[float] = []
+    for column in header[1:]:
+        name, unit = _split_unit(column)
+        names.append(name)
+        scales.append(_VOLTAGE_UNITS_TO_V.get(unit.lower(), 1e-3))
+    volts = data[:, 1:].T * np.asarray(scales)[:, None]
+    return names, time_ps, volts
+
+
+def prefix_netlist_lines(lines: Iterable[str], prefix: str) -> List[str]:
+    """Rename elements, nodes, models, parameters and subcircuits of a CCT netlist with ``prefix``.
+
+    Used to place several independent copies of the channel in one netlist;
+    ground (``0``) stays shared.  Elements and nodes get ``<prefix>_`` in
+    front; ``.model``, ``.param`` and ``.subckt`` names defined in ``lines``
+    get ``_<prefix>`` appended, and so do their references.
+    """
+    lines = [line for line in lines if line.strip()]
+    params = [
+        name
+        for line in lines if re.match(r'\.param\b', line, re.IGNORECASE)
+        for name in re.findall(r'(\w+)\s*=', line)
+    ]
+    subckts = [
+        m.group(1) for m in (re.match(r'\.subckt\s+(\S+)', line, re.IGNORECASE) for line in lines) if m
+    ]
+    param_re = re.compile(rf"(?<![\w.])({'|'.join(map(re.escape, params))})(?![\w(])") if params else None
+    prefixed: List[str] = []
+    for line in lines:
+        if line.startswith('.model'):
+            prefixed.append(re.sub(r'^\.model "([^"]+)"', rf'.model "\1_{prefix}"', line))
+            continue
+        if line.startswith('.'):
+            head, _, rest = line.partition(' ')
+            if head.lower() in ('.subckt', '.ends') and rest:
+                name, _, rest = rest.partition(' ')
+                head = f"{head} {name}_{prefix}"
+        else:
+            head, _, rest = line.partition(' ')
+            head = re.sub(r'^([A-Za-z])', rf'\1{prefix}_', head)
+            if head[0] in 'Xx' and subckts:
+                rest = ' '.join(
+                    f"{token}_{prefix}" if token in subckts else token for token in rest.split(' ')
+                )
+        if param_re is not None:
+            rest = param_re.sub(rf'\1_{prefix}', rest)
+        line = f"{head} {rest}" if rest else head
+        line = re.sub(r'(?<!\w)(netb?_\d+)\b', rf'{prefix}_\1', line)
+        line = re.sub(r'FQMODEL="([^"]+)"', rf'FQMODEL="\1_{prefix}"', line)
+        prefixed.append(line)
+    return prefixed
+
+
+_SPICE_VALUE_RE = re.compile(r'^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*(meg|[tgkmunpf])?', re.IGNORECASE)
+_SPICE_SCALE = {
+    't': 1e12,
+    'g': 1e9,
+    'meg': 1e6,
+    'k': 1e3,
+    'm': 1e-3,
+    'u': 1e-6,
+    'n': 1e-9,
+    'p': 1e-12,
+    'f': 1e-15,
+}
+
+
+def parse_spice_value(text) -> float:
+    """Convert a SPICE value such as ``"30ps"`` or ``"1.8pF"`` to a float."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = _SPICE_VALUE_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Cannot parse SPICE value: {text!r}")
+    value = float(match.group(1))
+    suffix = (match.group(2) or '').lower()
+    return value * _SPICE_SCALE.get(suffix, 1.0)
+
+
+def _pulse_waveform(t: np.ndarray, v1, v2, td, tr, tf, pw, per=None) -> np.ndarray:
+    v1, v2, td, tr, tf, pw = (parse_spice_value(value) for value in (v1, v2, td, tr, tf, pw))
+    tr = max(tr, 1e-18)
+    tf = max(tf, 1e-18)
+    rise = np.clip((t - td) / tr, 0.0, 1.0)
+    fall = np.clip((t - td - tr - pw) / tf, 0.0, 1.0)
+    return v1 + (v2 - v1) * (rise - fall)
+
+
+class LocalEngine:
+    """Solve CCT netlists with a linear frequency-domain model instead of AEDT.
+
+    The netlists written by :class:`CCT` only contain PULSE sources, R/C
+    terminations and one S-parameter block, so every S-block port can be
+    reduced to a Norton equivalent and the whole circuit solved per frequency
+    with a single batched linear solve.  Node voltages are returned in the same
+    ``{net_number: (time_ps, volts)}`` form as :meth:`Design.run`.
+    """
+
+    def __init__(self, network, tstep='100ps', tstop='3ns'):
+        if network is None:
+            raise ImportError("scikit-rf is required to run the local engine")
+        self.network = network
+        self.tstop = parse_spice_value(tstop)
+        freqs = np.asarray(network.f, dtype=float)
+        f_max = float(freqs.max()) if freqs.size else 0.0
+        self.dt = parse_spice_value(tstep)
+        if f_max > 0:
+            self.dt = min(self.dt, 0.5 / f_max)
+        sample_count = int(math.ceil(2 * self.tstop / self.dt)) + 1
+        self.fft_size = 1 << max(1, (sample_count - 1).bit_length())
+        self.time = np.arange(self.fft_size) * self.dt
+        self.output_count = int(math.floor(self.tstop / self.dt + 1e-9)) + 1
+
+    def run(self, netlist: str, port_indices: Optional[List[int]] = None) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        nodes, shunts, series, sources = self._parse_netlist(netlist)
+        if port_indices is None:
+            port_indices = list(range(len(nodes)))
+        if len(port_indices) != len(nodes):
+            raise ValueError("port_indices must match the S-block terminals")
+
+        freqs = np.asarray(self.network.f, dtype=float)
+        idx = np.asarray(port_indices, dtype=int)
+        s = _port_block(self.network.s, idx)
+        z0 = np.real(np.asarray(self.network.z0)[:, idx])
+        omega = 2j * np.pi * freqs
+
+        port_count = len(nodes)
+        source_names = list(sources)
+        admittance = np.zeros((freqs.size, port_count), dtype=complex)
+        norton = np.zeros((freqs.size, port_count, len(source_names)), dtype=complex)
+        for column, node in enumerate(nodes):
+            admittance[:, column] += self._shunt_admittance(shunts.get(node, []), omega)
+            for resistance, other in series.get(node, []):
+                if other in sources:
+                    admittance[:, column] += 1.0 / resistance
+                    norton[:, column, source_names.index(other)] += 1.0 / resistance
+                else:
+                    y_other = self._shunt_admittance(shunts.get(other, []), omega)
+                    admittance[:, column] += y_other / (1.0 + resistance * y_other)
+
+        gamma = (1.0 - z0 * admittance) / (1.0 + z0 * admittance)
+        incident = np.sqrt(z0)[:, :, None] * norton / (1.0 + z0 * admittance)[:, :, None]
+        system = np.eye(port_count)[None, :, :] - s * gamma[:, None, :]
+        reflected = np.linalg.solve(system, s @ incident)
+        transfer = np.sqrt(z0)[:, :, None] * (gamma[:, :, None] * reflected + incident + reflected)
+
+        grid = np.fft.rfftfreq(self.fft_size, self.dt)
+        spectrum = np.zeros((grid.size, port_count), dtype=complex)
+        for column, name in enumerate(source_names):
+            stimulus = np.fft.rfft(_pulse_waveform(self.time, *sources[name]))
+            spectrum += _interpolate_columns(freqs, transfer[:, :, column], grid) * stimulus[:, None]
+        volts = np.fft.irfft(spectrum, n=self.fft_size, axis=0)[: self.output_count]
+
+        time_ps = self.time[: self.output_count] * 1e12
+        result: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for column, node in enumerate(nodes):
+            m = re.fullmatch(r'net_(\d+)', node)
             if m:
-                number = int(m.group(1))
-                result[number] = (x, y)
+                result[int(m.group(1))] = (time_ps, volts[:, column])
         return result
 
+    @staticmethod
+    def _shunt_admittance(elements: List[Tuple[str, float]], omega: np.ndarray) -> np.ndarray:
+        total = np.zeros(omega.shape, dtype=complex)
+        for kind, value in elements:
+            if kind == 'R':
+                total += 1.0 / value
+            elif kind == 'C':
+                total += omega * value
+        return total
+
+    @staticmethod
+    def _parse_netlist(netlist: str):
+        nodes: List[str] = []
+        shunts: Dict[str, List[Tuple[str, float]]] = {}
+        series: Dict[str, List[Tuple[float, str]]] = {}
+        sources: Dict[str, List[str]] = {}
+        for line in netlist.splitlines():
+            tokens = line.split()
+            if not tokens or tokens[0].startswith(('.', '*')):
+                continue
+            kind = tokens[0][0].upper()
+            if kind == 'S':
+                nodes = [token for token in tokens[1:] if '=' not in token]
+            elif kind == 'V':
+                m = re.search(r'PULSE\(([^)]*)\)', line, re.IGNORECASE)
+                if not m:
+                    raise ValueError(f"Unsupported source in local engine: {line}")
+                sources[tokens[1]] = m.group(1).split()
+            elif kind in ('R', 'C'):
+                node_a, node_b, value = tokens[1], tokens[2], parse_spice_value(tokens[3])
+                if node_b == '0' or node_a == '0':
+                    node = node_a if node_b == '0' else node_b
+                    shunts.setdefault(node, []).append((kind, value))
+                elif kind == 'R':
+                    series.setdefault(node_a, []).append((value, node_b))
+                    series.setdefault(node_b, []).append((value, node_a))
+                else:
+                    raise ValueError(f"Unsupported series capacitor in local engine: {line}")
+            else:
+                raise ValueError(f"Unsupported element in local engine: {line}")
+        if not nodes:
+            raise ValueError("Netlist has no S-parameter block")
+        return nodes, shunts, series, sources
+
+
+def _interpolate_columns(x: np.ndarray, y: np.ndarray, x_new: np.ndarray) -> np.ndarray:
+    """Linear interpolation of every column of ``y``; zero above ``x[-1]``."""
+    upper = np.searchsorted(x, x_new, side='right').clip(1, x.size - 1)
+    lower = upper - 1
+    span = x[upper] - x[lower]
+    weight = np.where(span > 0, (x_new - x[lower]) / np.where(span > 0, span, 1.0), 0.0).clip(0.0, 1.0)
+    values = y[lower] * (1.0 - weight)[:, None] + y[upper] * weight[:, None]
+    values[x_new > x[-1]] = 0.0
+    return values
+
+
+class PulseResponseCache:
+    """Content-addressed on-disk store of per-TX simulation results.
+
+    Each entry is one ``.npz`` file holding the node numbers, the shared time
+    axis and a ``(n_nodes, n_samples)`` voltage array.  Hits refresh the file
+    mtime, and the least recently used entries are evicted once the directory
+    grows beyond ``max_bytes``.  A ``read_only`` cache (used for dry runs)
+    neither creates the directory nor refreshes or writes entries.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_PULSE_CACHE_BYTES, read_only: bool = False):
+        self.directory = Path(directory)
+        self.read_only = bool(read_only)
+        if not self.read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[Dict[int, Tuple[np.ndarray, np.ndarray]]]:
+        path = self._entry_path(key)
+        try:
+            with np.load(path) as data:
+                nodes, times, volts = data['nodes'], data['time'], data['volts']
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        if not self.read_only:
+            os.utime(path, None)
+        self.hits += 1
+        if times.ndim == 1:
+            return {int(node): (times, volts[row]) for row, node in enumerate(nodes)}
+        return {int(node): (times[row], volts[row]) for row, node in enumerate(nodes)}
+
+    def put(self, key: str, result: Dict[int, Tuple[List[float], List[float]]]) -> None:
+        if not result or self.read_only:
+            return
+        nodes = sorted(result)
+        times = [np.asarray(result[node][0], dtype=float) for node in nodes]
+        volts = [np.asarray(result[node][1], dtype=float) for node in nodes]
+        if len({t.size for t in times} | {v.size for v in volts}) != 1:
+            return
+        shared = all(np.array_equal(times[0], t) for t in times[1:])
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            nodes=np.asarray(nodes, dtype=np.int32),
+            time=times[0] if shared else np.vstack(times),
+            volts=np.vstack(volts),
+        )
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self.directory.glob('*.npz'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def size_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in self.directory.glob('*.npz'))
+
+    def log_stats(self) -> None:
+        lookups = self.hits + self.misses
+        hit_ratio = self.hits / lookups if lookups else 0.0
+        print(
+            f"[cache] pulse responses: {self.hits} hits, {self.misses} misses ({hit_ratio:.1%}), "
+            f"{self.evictions} evicted, {self.size_bytes() / 1024 ** 2:.1f} MB on disk"
+        )
+
+
+TOUCHSTONE_SIDECAR_SUFFIX = ".cctcache"
+TOUCHSTONE_SIDECAR_VERSION = 2
+# Fallback sidecar location under the workdir when the Touchstone's own
+# directory is read-only.
+TOUCHSTONE_SIDECAR_DIRNAME = "touchstone_cache"
+# Bytes of Touchstone data text handed to one parser thread.
+TOUCHSTONE_PARSE_CHUNK = 8 * 1024 * 1024
+_TOUCHSTONE_FREQ_UNITS = {'hz': 1.0, 'khz': 1e3, 'mhz': 1e6, 'ghz': 1e9}
+_TOUCHSTONE_COMMENT_RE = re.compile(rb'![^\n]*')
+
+# Frequency rows formatted per string operation by write_touchstone_ma.
+TOUCHSTONE_WRITE_CHUNK = 128
+
+
+def _touchstone_row_template(n_ports: int, precision: int = 12) -> str:
+    """``%``-template for one frequency row of an MA Touchstone 1.0 file."""
+    pair = f"%.{precision}g %.{precision}g"
+    if n_ports == 2:
+        # Two-port data is a single line in S11 S21 S12 S22 order.
+        return " ".join([f"%.{precision}g"] + [pair] * 4) + "\n"
+    lines = []
+    for row in range(n_ports):
+        for start in range(0, n_ports, 4):
+            count = min(4, n_ports - start)
+            prefix = f"%.{precision}g " if row == 0 and start == 0 else "  "
+            lines.append(prefix + " ".join([pair] * count))
+    return "\n".join(lines) + "\n"
+
+
+def _touchstone_upper_template(n_ports: int, precision: int = 12) -> str:
+    """``%``-template for one frequency row of a ``[Matrix Format] Upper`` file."""
+    pair = f"%.{precision}g %.{precision}g"
+    lines = [f"%.{precision}g " + " ".join([pair] * n_ports)]
+    lines += ["  " + " ".join([pair] * (n_ports - row)) for row in range(1, n_ports)]
+    return "\n".join(lines) + "\n"
+
+
+def _triu_position(n_ports: int, rows, cols) -> np.ndarray:
+    """Index of ``(rows, cols)`` in the row-major packed upper triangle."""
+    rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+    return rows * n_ports - rows * (rows - 1) // 2 + (cols - rows)
+
+
+def _port_block(s_params: np.ndarray, indices) -> np.ndarray:
+    """``s[:, indices, indices]``; a view instead of a copy when ``indices`` is one ascending run."""
+    indices = np.asarray(indices, dtype=int)
+    if indices.size and np.all(np.diff(indices) == 1):
+        block = slice(int(indices[0]), int(indices[-1]) + 1)
+        return s_params[:, block, block]
+    return s_params[:, indices[:, None], indices[None, :]]
+
+
+def _index_runs(indices) -> int:
+    """Number of contiguous ascending runs in ``indices``."""
+    indices = np.asarray(indices, dtype=int)
+    return int(indices.size and 1 + np.count_nonzero(np.diff(indices) != 1))
+
+
+def locality_order(adjacency: np.ndarray, leading: Iterable[int] = ()) -> np.ndarray:
+    """Reverse Cuthill-McKee permutation of a symmetric boolean adjacency.
+
+    Ports in ``leading`` are placed first in the given order; every other
+    connected component is walked breadth-first from a minimum-degree port,
+    visiting neighbours by increasing degree, and the walk is reversed.
+    Returns the port index at each new position.
+    """
+    adjacency = np.asarray(adjacency, dtype=bool)
+    count = adjacency.shape[0]
+    degree = adjacency.sum(axis=1)
+    leading = [int(index) for index in leading]
+    visited = np.zeros(count, dtype=bool)
+    visited[leading] = True
+    walk: List[int] = []
+    for seed in np.argsort(degree, kind='stable'):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        queue = [int(seed)]
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            neighbours = np.flatnonzero(adjacency[node] & ~visited)
+            neighbours = neighbours[np.argsort(degree[neighbours], kind='stable')]
+            visited[neighbours] = True
+            queue.extend(neighbours.tolist())
+        walk.extend(queue)
+    return np.array(leading + walk[::-1], dtype=int)
+
+
+def write_touchstone_ma(
+    path: str | Path,
+    freqs_hz: np.ndarray,
+    s_params: np.ndarray,
+    z0: float = 50.0,
+    precision: int = 12,
+    matrix_format: str = 'full',
+) -> None:
+    """Write an ``(n_freq, n, n)`` S-matrix as a magnitude/angle Touchstone file.
+
+    ``matrix_format='full'`` writes Touchstone 1.0; ``'upper'`` writes a
+    Touchstone 2.0 file holding only the upper triangle, for reciprocal data.
+    Rows are formatted a chunk at a time with one ``%`` operation on a
+    repeated template, which is much faster than per-value formatting.
+    """
+    freqs_hz = np.asarray(freqs_hz, dtype=float)
+    n_freq, n_ports = s_params.shape[0], s_params.shape[1]
+    upper = matrix_format == 'upper'
+    if not upper and matrix_format != 'full':
+        raise ValueError(f"Unsupported matrix format: {matrix_format!r}")
+    if upper:
+        template = _touchstone_upper_template(n_ports, precision)
+        row_index, col_index = np.triu_indices(n_ports)
+    else:
+        template = _touchstone_row_template(n_ports, precision)
+    with open(path, 'w', encoding='ascii', newline='\n') as handle:
+        handle.write("! Written by cct.write_touchstone_ma\n")
+        if upper:
+            handle.write("[Version] 2.0\n")
+        handle.write(f"# Hz S MA R {float(z0):g}\n")
+        if upper:
+            handle.write(f"[Number of Ports] {n_ports}\n")
+            if n_ports == 2:
+                handle.write("[Two-Port Data Order] 12_21\n")
+            handle.write(f"[Number of Frequencies] {n_freq}\n")
+            handle.write("[Matrix Format] Upper\n")
+            handle.write("[Network Data]\n")
+        for start in range(0, n_freq, TOUCHSTONE_WRITE_CHUNK):
+            chunk = np.asarray(s_params[start:start + TOUCHSTONE_WRITE_CHUNK])
+            rows = chunk.shape[0]
+            if upper:
+                flat = chunk[:, row_index, col_index]
+            else:
+                if n_ports == 2:
+                    chunk = chunk.transpose(0, 2, 1)
+                flat = chunk.reshape(rows, -1)
+            values = np.empty((rows, 1 + 2 * flat.shape[1]))
+            values[:, 0] = freqs_hz[start:start + rows]
+            values[:, 1::2] = np.abs(flat)
+            values[:, 2::2] = np.angle(flat, deg=True)
+            handle.write((template * rows) % tuple(values.ravel().tolist()))
+        if upper:
+            handle.write("[End]\n")
+
+
+def _uniform_z0(network) -> Optional[float]:
+    z0 = np.asarray(getattr(network, 'z0', 50.0))
+    if np.iscomplexobj(z0):
+        if np.any(z0.imag != 0):
+            return None
+        z0 = z0.real
+    first = float(z0.flat[0]) if z0.size else 50.0
+    return first if np.all(z0 == first) else None
+
+
+class TouchstoneSidecar:
+    """Binary copy of a parsed Touchstone file kept in ``<file>.cctcache/``.
+
+    ``freq_<build>.f64`` and ``s_<build>.c128`` hold the raw little-endian
+    frequency vector and ``(n_freq, n, n)`` S array (``s_<build>.c64`` is an
+    optional complex64 copy); ``meta.json`` records the build tag, the source
+    size, mtime and SHA-256 plus the shape and reference impedance.  Files
+    with per-port reference impedances keep them in ``z0_<build>.c128``,
+    an ``(n_freq, n)`` array, and record ``z0`` as ``null``.  A sidecar
+    is valid when size and mtime match, or when only the mtime changed but the
+    content hash is the same.  ``directory`` places the sidecar elsewhere,
+    e.g. under the workdir when the source directory is read-only.
+
+    Every build writes files under a new tag, so data another process still
+    has memory-mapped is never overwritten.
+    """
+
+    def __init__(self, source: str | Path, directory: Optional[str | Path] = None):
+        self.source = Path(source)
+        if directory is None:
+            directory = self.source.with_name(self.source.name + TOUCHSTONE_SIDECAR_SUFFIX)
+        self.directory = Path(directory)
+        self.meta_path = self.directory / 'meta.json'
+        self.build_tag = ''
+
+    @property
+    def freq_path(self) -> Path:
+        return self.directory / f'freq_{self.build_tag}.f64'
+
+    @property
+    def s_path(self) -> Path:
+        return self.directory / f's_{self.build_tag}.c128'
+
+    @property
+    def s64_path(self) -> Path:
+        return self.directory / f's_{self.build_tag}.c64'
+
+    @property
+    def z0_path(self) -> Path:
+        return self.directory / f'z0_{self.build_tag}.c128'
+
+    def permuted_path(self, order_key: str) -> Path:
+        return self.directory / f's_perm_{self.build_tag}_{order_key}.c128'
+
+    def load_meta(self) -> Optional[Dict[str, object]]:
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+            stat = self.source.stat()
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != TOUCHSTONE_SIDECAR_VERSION or meta.get('size') != stat.st_size:
+            return None
+        self.build_tag = str(meta.get('build', ''))
+        if not (self.freq_path.exists() and self.s_path.exists()):
+            return None
+        if meta.get('z0') is None and not self.z0_path.exists():
+            return None
+        if meta.get('mtime_ns') != stat.st_mtime_ns:
+            if meta.get('sha256') != _file_digest(self.source):
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            self._write_meta(meta)
+        return meta
+
+    def open(self, meta: Dict[str, object]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Memory-map the frequency vector, S array and ``(n_freq, n)`` z0 described by ``meta``."""
+        n_freq, n_ports = int(meta['nfreq']), int(meta['nports'])
+        freqs = np.memmap(self.freq_path, dtype='<f8', mode='r', shape=(n_freq,))
+        s_params = np.memmap(self.s_path, dtype='<c16', mode='r', shape=(n_freq, n_ports, n_ports))
+        if meta.get('z0') is None:
+            z0 = np.memmap(self.z0_path, dtype='<c16', mode='r', shape=(n_freq, n_ports))
+        else:
+            z0 = np.broadcast_to(np.complex128(meta['z0']), (n_freq, n_ports))
+        return freqs, s_params, z0
+
+    def build(self, workers: Optional[int] = None) -> Dict[str, object]:
+        """Parse the source into the sidecar, falling back to scikit-rf."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+        self.build_tag = uuid.uuid4().hex[:12]
+        stat = self.source.stat()
+        parsed = _parse_touchstone_v1(self.source, self.freq_path, self.s_path, workers)
+        if parsed is None:
+            if rf is None:
+                raise RuntimeError(f"Cannot parse {self.source} without scikit-rf")
+            network = rf.Network(str(self.source))
+            z0 = _uniform_z0(network)
+            if z0 is None:
+                z0_values = np.broadcast_to(np.asarray(network.z0), network.s.shape[:2])
+                np.ascontiguousarray(z0_values, dtype='<c16').tofile(self.z0_path)
+            np.ascontiguousarray(network.f, dtype='<f8').tofile(self.freq_path)
+            np.ascontiguousarray(network.s, dtype='<c16').tofile(self.s_path)
+            parsed = (network.f.size, network.s.shape[1], z0)
+        n_freq, n_ports, z0 = parsed
+        meta = {
+            'version': TOUCHSTONE_SIDECAR_VERSION,
+            'build': self.build_tag,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_digest(self.source),
+            'nfreq': int(n_freq),
+            'nports': int(n_ports),
+            'z0': None if z0 is None else float(z0),
+        }
+        self._write_meta(meta)
+        self._remove_old_builds()
+        return meta
+
+    def _remove_old_builds(self) -> None:
+        # Best effort: a file still mapped elsewhere cannot be removed on
+        # Windows and is left for the next build; on POSIX existing mappings
+        # stay valid after the unlink.
+        current = (
+            f'freq_{self.build_tag}.', f's_{self.build_tag}.', f'z0_{self.build_tag}.', f's_perm_{self.build_tag}_',
+        )
+        for path in self.directory.iterdir():
+            if path == self.meta_path or path.suffix == '.tmp' or path.name.startswith(current):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _write_meta(self, meta: Dict[str, object]) -> None:
+        tmp_path = self.meta_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(meta, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.meta_path)
+
+
+def _parse_touchstone_chunk(chunk: bytes) -> Optional[np.ndarray]:
+    """Numbers in ``chunk``, or ``None`` if any token is not a plain float."""
+    if b'!' in chunk:
+        chunk = _TOUCHSTONE_COMMENT_RE.sub(b'', chunk)
+    try:
+        return np.array(chunk.split(), dtype=np.float64)
+    except ValueError:
+        return None  # e.g. Fortran exponents such as 1.0D-3
+
+
+def _parse_touchstone_v1(source: Path, freq_path: Path, s_path: Path, workers: Optional[int] = None):
+    """Stream a Touchstone 1.0 data block into raw binary files.
+
+    Chunks of whole lines are parsed on a thread pool; complete frequency
+    records are converted and appended in order, so memory stays bounded by
+    the chunks in flight.  Returns ``(n_freq, n_ports, z0)`` or ``None`` when
+    the file needs the full scikit-rf reader (Touchstone 2.0 keywords, noise
+    data, non-S parameters, numbers NumPy cannot parse).
+    """
+    match = re.search(r'\.s(\d+)p$', source.name, re.IGNORECASE)
+    if not match:
+        return None
+    n_ports = int(match.group(1))
+    unit, fmt, z0 = 'ghz', 'ma', 50.0
+    with open(source, 'rb') as handle:
+        data_start = 0
+        for line in iter(handle.readline, b''):
+            stripped = line.strip()
+            if not stripped or stripped.startswith(b'!'):
+                data_start += len(line)
+                continue
+            if stripped.startswith(b'['):
+                return None
+            if stripped.startswith(b'#'):
+                tokens = stripped[1:].split(b'!')[0].decode('ascii').lower().split()
+                for index, token in enumerate(tokens):
+                    if token in _TOUCHSTONE_FREQ_UNITS:
+                        unit = token
+                    elif token in {'ma', 'db', 'ri'}:
+                        fmt = token
+                    elif token in {'y', 'z', 'h', 'g'}:
+                        return None
+                    elif token == 'r' and index + 1 < len(tokens):
+                        z0 = float(tokens[index + 1])
+                data_start += len(line)
+                continue
+            break
+        handle.seek(data_start)
+
+        record = 1 + 2 * n_ports * n_ports
+        scale = _TOUCHSTONE_FREQ_UNITS[unit]
+        workers = max(1, int(workers or os.cpu_count() or 1))
+        carry = np.empty(0)
+        tail = b''
+        n_freq = 0
+        last_freq = -np.inf
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                open(freq_path, 'wb') as freq_out, open(s_path, 'wb') as s_out:
+            while True:
+                chunks = []
+                for _ in range(workers):
+                    block = handle.read(TOUCHSTONE_PARSE_CHUNK)
+                    if not block:
+                        break
+                    block = tail + block
+                    cut = block.rfind(b'\n') + 1
+                    tail = block[cut:] if cut else block
+                    if cut:
+                        chunks.append(block[:cut])
+                if not chunks:
+                    if tail.strip():
+                        chunks.append(tail)
+                        tail = b''
+                    else:
+                        break
+                for values in executor.map(_parse_touchstone_chunk, chunks):
+                    if values is None:
+                        return None
+                    values = np.concatenate([carry, values]) if carry.size else values
+                    whole = values.size // record * record
+                    carry = values[whole:]
+                    if not whole:
+                        continue
+                    rows = values[:whole].reshape(-1, record)
+                    freqs = rows[:, 0] * scale
+                    if freqs[0] <= last_freq or np.any(np.diff(freqs) <= 0):
+                        return None  # noise parameters or a malformed block
+                    last_freq = freqs[-1]
+                    first, second = rows[:, 1::2], rows[:, 2::2]
+                    if fmt == 'ri':
+                        values_c = first + 1j * second
+                    elif fmt == 'ma':
+                        values_c = first * np.exp(1j * second * math.pi / 180.)
+                    else:
+                        values_c = 10 ** (first / 20.) * np.exp(1j * second * math.pi / 180.)
+                    s_block = values_c.reshape(-1, n_ports, n_ports)
+                    if n_ports == 2:
+                        s_block = s_block.transpose(0, 2, 1)
+                    freqs.astype('<f8').tofile(freq_out)
+                    np.ascontiguousarray(s_block, dtype='<c16').tofile(s_out)
+                    n_freq += rows.shape[0]
+    if carry.size or not n_freq:
+        return None
+    return n_freq, n_ports, z0
+
+
+class LazyNetwork:
+    """Read-only network view over a :class:`TouchstoneSidecar`.
+
+    ``s`` is the memory-mapped ``(n_freq, n, n)`` array, so indexing it only
+    reads the requested entries; nothing is loaded up front.  Provides the
+    subset of the ``rf.Network`` interface CCT uses.
+    """
+
+    def __init__(self, sidecar: TouchstoneSidecar, meta: Dict[str, object]):
+        self.sidecar = sidecar
+        self.name = sidecar.source.stem
+        self.meta = meta
+        self.f, self.s, self.z0 = sidecar.open(meta)
+        self.order: Optional[np.ndarray] = None
+        self._s64: Optional[np.ndarray] = None
+        self.nports = int(meta['nports'])
+        # None when the ports have different reference impedances; see z0.
+        self.reference_z0 = None if meta.get('z0') is None else float(meta['z0'])
+
+    @classmethod
+    def open(
+        cls,
+        path: str | Path,
+        workers: Optional[int] = None,
+        directory: Optional[str | Path] = None,
+    ) -> "LazyNetwork":
+        """Map ``path``'s sidecar, parsing the Touchstone first if needed."""
+        sidecar = TouchstoneSidecar(path, directory)
+        meta = sidecar.load_meta()
+        if meta is None:
+            meta = sidecar.build(workers)
+        return cls(sidecar, meta)
+
+    def max_asymmetry(self) -> float:
+        """Largest ``|Sij - Sji|``; computed once and kept in the sidecar metadata."""
+        if 'max_asymmetry' not in self.meta:
+            step = max(1, min(COUPLING_SCAN_CHUNK, COUPLING_SCAN_BYTES // (16 * self.nports * self.nports)))
+            error = 0.0
+            for start in range(0, self.f.size, step):
+                chunk = np.asarray(self.s[start:start + step])
+                if chunk.size:
+                    error = max(error, float(np.abs(chunk - chunk.transpose(0, 2, 1)).max()))
+            self.meta['max_asymmetry'] = error
+            self.sidecar._write_meta(self.meta)
+        return float(self.meta['max_asymmetry'])
+
+    def screening(self, precision: str = 'complex128') -> np.ndarray:
+        """``s`` at ``precision``; the complex64 copy is written to the sidecar once."""
+        if precision == 'complex128':
+            return self.s
+        if self.order is not None:
+            raise ValueError("Screening copies are only kept for the source port order")
+        if precision != 'complex64':
+            raise ValueError(f"Unsupported screening precision: {precision!r}")
+        if self._s64 is None:
+            path = self.sidecar.s64_path
+            if not (self.meta.get('complex64') and path.exists()):
+                step = max(1, min(COUPLING_SCAN_CHUNK, COUPLING_SCAN_BYTES // (16 * self.nports * self.nports)))
+                tmp_path = path.with_suffix('.tmp')
+                with open(tmp_path, 'wb') as handle:
+                    for start in range(0, self.f.size, step):
+                        np.asarray(self.s[start:start + step], dtype='<c8').tofile(handle)
+                os.replace(tmp_path, path)
+                self.meta['complex64'] = True
+                self.sidecar._write_meta(self.meta)
+            self._s64 = np.memmap(path, dtype='<c8', mode='r', shape=self.s.shape)
+        return self._s64
+
+    def permuted(self, order: Iterable[int]) -> "LazyNetwork":
+        """Network whose port ``i`` is port ``order[i]`` of this one.
+
+        The permuted S array is written to the sidecar once per order, kept
+        next to the copies for other orders, and mapped like ``s``; use it for
+        slicing, not for screening.
+        """
+        order = np.asarray(order, dtype=int)
+        key = hashlib.sha256(order.tobytes()).hexdigest()[:16]
+        path = self.sidecar.permuted_path(key)
+        if not path.exists():
+            step = max(1, min(COUPLING_SCAN_CHUNK, COUPLING_SCAN_BYTES // (16 * self.nports * self.nports)))
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as handle:
+                for start in range(0, self.f.size, step):
+                    chunk = np.asarray(self.s[start:start + step])
+                    np.ascontiguousarray(chunk[:, order[:, None], order[None, :]], dtype='<c16').tofile(handle)
+            os.replace(tmp_path, path)
+        network = LazyNetwork(self.sidecar, self.meta)
+        network.s = np.memmap(path, dtype='<c16', mode='r', shape=self.s.shape)
+        network.order = order
+        if network.reference_z0 is None:
+            network.z0 = np.asarray(self.z0)[:, order]
+        return network
+
+    def slice(self, rows, cols=None) -> np.ndarray:
+        """``s[:, rows, cols]`` as an in-memory array; ``cols`` defaults to ``rows``."""
+        rows = np.asarray(rows, dtype=int)
+        cols = rows if cols is None else np.asarray(cols, dtype=int)
+        return np.asarray(self.s[:, rows[:, None], cols[None, :]])
+
+    def subnetwork(self, ports: Iterable[int]):
+        if rf is None:
+            raise ImportError("scikit-rf is required to build a subnetwork")
+        ports = list(ports)
+        frequency = rf.Frequency.from_f(np.asarray(self.f), unit='hz')
+        z0 = self.reference_z0 if self.reference_z0 is not None else np.asarray(self.z0[:, ports])
+        return rf.Network(frequency=frequency, s=self.slice(ports), z0=z0, name=self.name)
+
+
+def load_network(path: str | Path, workers: Optional[int] = None):
+    """``rf.Network`` for ``path``, read through its binary sidecar.
+
+    The first load parses the text file and writes the sidecar; later loads
+    of an unchanged file only map the binary arrays.  Use
+    :meth:`LazyNetwork.open` to avoid materializing the full S array.
+    """
+    if rf is None:
+        raise ImportError("scikit-rf is required to load touchstone networks")
+    network = LazyNetwork.open(path, workers)
+    return network.subnetwork(range(network.nports))
+
+
+class TrimmedTouchstoneStore:
+    """Trimmed touchstones keyed by source content and kept port set.
+
+    A file is named ``<stem>_<key>.s<N>p`` where ``key`` hashes the source
+    digest with the sorted kept ports, so TXs keeping the same ports share
+    one file and later runs on an unchanged source reuse it.  Reuse
+    refreshes the mtime; beyond ``max_bytes`` the least recently used files
+    are evicted, except those passed as ``protected``.
+
+    With ``background`` the writes run on one worker thread so they overlap
+    with pruning the next TX; call :meth:`flush` before the files are used.
+    The thread is started by the first write and stopped by :meth:`flush`.
+    ``matrix_format='upper'`` writes reciprocal networks as Touchstone 2.0
+    upper-triangle files.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = DEFAULT_TRIMMED_CACHE_BYTES,
+        background: bool = False,
+        matrix_format: str = 'full',
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.matrix_format = matrix_format
+        self.reused = 0
+        self.written = 0
+        self.evictions = 0
+        self.view_writes = 0
+        self.copy_bytes_saved = 0
+        self.background = bool(background)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[Path, object] = {}
+
+    def path_for(self, source_path: str | Path, kept_sequences: Iterable[int]) -> Path:
+        """Cache path for ``kept_sequences``, listed in the file's port order."""
+        kept = [int(seq) for seq in kept_sequences]
+        parts = {"source": _file_digest(source_path), "ports": kept}
+        if self.matrix_format != 'full':
+            parts["format"] = self.matrix_format
+        payload = json.dumps(parts)
+        key = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+        return self.directory / f"{Path(source_path).stem}_{key}.s{len(kept)}p"
+
+    def get_or_write(
+        self,
+        network,
+        source_path: str | Path,
+        kept_sequences: List[int],
+        protected: Iterable[Path] = (),
+        indices: Optional[Iterable[int]] = None,
+    ) -> Path:
+        """Path of the trimmed file, writing it if needed.
+
+        ``indices`` are the ports of ``network`` to keep, in file order; by
+        default ``sequence - 1`` for each kept sequence.
+        """
+        path = self.path_for(source_path, kept_sequences)
+        if path in self._pending:
+            self.reused += 1
+            return path
+        if path.exists():
+            os.utime(path, None)
+            self.reused += 1
+            return path
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if indices is None:
+            indices = [seq - 1 for seq in kept_sequences]
+        indices = np.asarray(indices, dtype=int)
+        if _index_runs(indices) == 1:
+            self.view_writes += 1
+            self.copy_bytes_saved += int(np.asarray(network.f).size) * indices.size ** 2 * 16
+        protected = {path, *(Path(item) for item in protected)}
+        if not self.background:
+            self._write(network, indices, path)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            self._pending[path] = self._executor.submit(self._write, network, indices, path)
+        self.written += 1
+        self._evict(protected)
+        return path
+
+    def _write(self, network, indices: np.ndarray, path: Path) -> None:
+        tmp_path = path.with_name(f"{path.stem}_tmp{uuid.uuid4().hex[:8]}{path.suffix}")
+        z0 = _uniform_z0(network)
+        if z0 is None:
+            # Per-port reference impedances: a 1.0 header holds one value, so
+            # renormalize the kept block to 50 ohm, which describes the same circuit.
+            trimmed = network.subnetwork(indices.tolist())
+            trimmed.renormalize(50.0)
+            s_params, z0 = trimmed.s, 50.0
+        else:
+            s_params = _port_block(network.s, indices)
+        write_touchstone_ma(tmp_path, network.f, s_params, z0, matrix_format=self.matrix_format)
+        os.replace(tmp_path, path)
+
+    def flush(self) -> None:
+        """Wait for background writes and stop the writer thread; re-raises the first failure."""
+        pending, self._pending = self._pending, {}
+        executor, self._executor = self._executor, None
+        try:
+            for future in pending.values():
+                future.result()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _evict(self, protected: set) -> None:
+        entries = []
+        protected = protected | set(self._pending)
+        for entry in self.directory.glob('*.s*p'):
+            if entry in protected or re.search(r'_tmp[0-9a-f]{8}$', entry.stem):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = self.size_bytes()
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def size_bytes(self) -> int:
+        if not self.directory.exists():
+            return 0
+        total = 0
+        for entry in self.directory.glob('*.s*p'):
+            try:
+                total += entry.stat().st_size
+            except OSError:  # a background write renamed its temp file
+                continue
+        return total
+
+    def log_stats(self) -> None:
+        if not (self.reused or self.written):
+            return
+        print(
+            f"[trim] trimmed touchstones: {self.written} written, {self.reused} reused, "
+            f"{self.evictions} evicted, {self.size_bytes() / 1024 ** 2:.1f} MB on disk"
+        )
+        if self.view_writes:
+            print(
+                f"[trim] {self.view_writes} written from contiguous views, "
+                f"{self.copy_bytes_saved / 1024 ** 2:.1f} MB of slice copies saved"
+            )
+        self.reused = self.written = self.evictions = 0
+        self.view_writes = self.copy_bytes_saved = 0
+
+
+def format_duration(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.2f} h"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds:.1f} s"
+
+
+@dataclass
+class CostModel:
+    """Predicted seconds of one simulated netlist with ``ports`` ports.
+
+    ``overhead + steps * (per_port * ports + per_port_sq * ports ** 2)`` where
+    ``steps = tstop / tstep``.  The defaults are a rough seed for AEDT Circuit;
+    :meth:`fit` replaces them with measured runs from ``run_history.json``.
+    Other engines have no seed: until they have history the model still ranks
+    netlists by size, but :attr:`predicts_time` is false.
+    """
+
+    overhead: float = 10.0
+    per_port: float = 0.02
+    per_port_sq: float = 2e-4
+    samples: int = 0
+    engine: str = 'aedt'
+
+    @property
+    def predicts_time(self) -> bool:
+        return self.samples > 0 or self.engine == 'aedt'
+
+    def predict(self, ports, steps: float):
+        ports = np.asarray(ports, dtype=float)
+        return self.overhead + steps * (self.per_port * ports + self.per_port_sq * ports ** 2)
+
+    @classmethod
+    def fit(cls, records: Iterable[Dict[str, object]], engine: str = 'aedt') -> "CostModel":
+        seed = cls(engine=engine)
+        rows = [r for r in records if r.get('engine', 'aedt') == engine and float(r.get('seconds', 0)) > 0]
+        if not rows:
+            return seed
+        ports = np.array([float(r['ports']) for r in rows])
+        steps = np.array([float(r['steps']) for r in rows])
+        seconds = np.array([float(r['seconds']) for r in rows])
+        design = np.column_stack([np.ones_like(ports), steps * ports, steps * ports ** 2])
+        if len(rows) >= 3 and np.linalg.matrix_rank(design) == 3:
+            coef = np.linalg.lstsq(design, seconds, rcond=None)[0]
+            if np.all(coef >= 0):
+                return cls(float(coef[0]), float(coef[1]), float(coef[2]), len(rows), engine)
+        # Too few or degenerate samples: keep the seed's shape, fit its scale.
+        scale = float(seconds.sum() / np.sum(seed.predict(ports, steps)))
+        return cls(seed.overhead * scale, seed.per_port * scale, seed.per_port_sq * scale, len(rows), engine)
+
+
+def service_address() -> Tuple[str, int]:
+    """Address of the CCT simulation service (``CCT_SERVICE_ADDRESS=host:port``)."""
+    value = os.environ.get("CCT_SERVICE_ADDRESS", "").strip()
+    if not value:
+        return DEFAULT_SERVICE_ADDRESS
+    host, _, port = value.rpartition(':')
+    return (host or DEFAULT_SERVICE_ADDRESS[0], int(port))
+
+
+def service_authkey() -> bytes:
+    """Shared secret of the CCT service (``CCT_SERVICE_AUTHKEY`` overrides).
+
+    A random key is generated on first use and stored in
+    :data:`SERVICE_AUTHKEY_PATH`, readable by the current user only.
+    """
+    value = os.environ.get("CCT_SERVICE_AUTHKEY")
+    if value:
+        return value.encode('utf-8')
+    path = SERVICE_AUTHKEY_PATH
+    try:
+        return _read_service_authkey(path)
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:  # another process created it first
+        return _read_service_authkey(path)
+    with os.fdopen(fd, 'w', encoding='ascii') as handle:
+        handle.write(secrets.token_hex(32))
+    return _read_service_authkey(path)
+
+
+def _read_service_authkey(path: Path) -> bytes:
+    if os.name == 'posix' and path.stat().st_mode & 0o077:
+        raise PermissionError(f"{path} must be readable by its owner only (chmod 600)")
+    value = path.read_text(encoding='ascii').strip()
+    if not value:
+        raise RuntimeError(f"{path} is empty; delete it to generate a new CCT service key")
+    return value.encode('ascii')
+
+
+def circuit_kind(circuit_factory=None) -> str:
+    """``"aedt"`` for the real AEDT Circuit, otherwise the factory's name."""
+    if circuit_factory is None:
+        return "aedt"
+    return getattr(circuit_factory, '__qualname__', repr(circuit_factory))
+
+
+class ServiceClient:
+    """Connection to a running ``cct_service.py`` process.
+
+    Requests and replies are plain dictionaries sent over a local
+    ``multiprocessing.connection`` socket: ``{"op": "run", "netlist": ...,
+    "tstep": ..., "tstop": ..., "version": ..., "batch_count": ...}`` returns
+    ``{"ok": True, "results": [...]}`` with one ``Design.run`` result per batch
+    copy.  ``ping`` replies carry the service's :func:`circuit_kind` and
+    ``run`` requests name the kind they expect, which the service checks.
+    """
+
+    def __init__(self, address: Optional[Tuple[str, int]] = None, authkey: Optional[bytes] = None):
+        self.address = tuple(address) if address is not None else service_address()
+        self._conn = Client(self.address, authkey=authkey or service_authkey())
+
+    @classmethod
+    def connect(cls, address: Optional[Tuple[str, int]] = None) -> Optional["ServiceClient"]:
+        """Return a client if a service is listening, otherwise ``None``."""
+        try:
+            return cls(address)
+        except (OSError, EOFError):
+            return None
+        except Exception:  # pragma: no cover - authentication mismatch
+            return None
+
+    def request(self, payload: Dict[str, object]) -> Dict[str, object]:
+        self._conn.send(payload)
+        reply = self._conn.recv()
+        if not reply.get("ok"):
+            raise RuntimeError(f"CCT service error: {reply.get('error', 'unknown error')}")
+        return reply
+
+    def ping(self) -> Dict[str, object]:
+        return self.request({"op": "ping"})
+
+    def run(
+        self,
+        netlist: str,
+        tstep,
+        tstop,
+        version: Optional[str] = None,
+        batch_count: int = 1,
+        circuit: str = "aedt",
+    ):
+        reply = self.request(
+            {
+                "op": "run",
+                "netlist": netlist,
+                "tstep": tstep,
+                "tstop": tstop,
+                "version": version,
+                "batch_count": batch_count,
+                "circuit": circuit,
+            }
+        )
+        return reply["results"]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ServiceClient":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+def service_circuit(address: Optional[Tuple[str, int]] = None) -> Optional[str]:
+    """Circuit kind reported by a listening service, ``None`` if there is none."""
+    client = ServiceClient.connect(address)
+    if client is None:
+        return None
+    try:
+        reply = client.ping()
+    except Exception:
+        return None
+    finally:
+        client.close()
+    circuit = reply.get("circuit")
+    return str(circuit) if circuit else None
+
+
+def service_available(address: Optional[Tuple[str, int]] = None, circuit: str = "aedt") -> bool:
+    """True when a service backed by ``circuit`` is listening."""
+    return service_circuit(address) == circuit
+
+
+_POOL_DESIGN: Optional[Design] = None
+
+
+def _init_pool_worker(workdir: str, tstep, tstop, version: Optional[str], circuit_factory) -> None:
+    global _POOL_DESIGN
+    worker_dir = Path(workdir) / f"worker_{os.getpid()}"
+    _POOL_DESIGN = Design(
+        worker_dir,
+        tstep,
+        tstop,
+        version=version,
+        circuit_factory=circuit_factory,
+        new_desktop=True,
+    )
+
+
+def _run_pool_job(netlist_text: str, batch_count: int = 1) -> List[Dict[int, Tuple[List[float], List[float]]]]:
+    if _POOL_DESIGN is None:
+        raise RuntimeError("Pool worker was not initialised")
+    if batch_count > 1:
+        return _POOL_DESIGN.run_batch(netlist_text, batch_count)
+    return [_POOL_DESIGN.run(netlist_text)]
+
+
+def _run_timed_pool_job(netlist_text: str, batch_count: int = 1):
+    start = time.perf_counter()
+    results = _run_pool_job(netlist_text, batch_count)
+    return time.perf_counter() - start, results
+
+
 class CCT:
     def __init__(
         self,
@@ -349,6 +2327,16 @@ class CCT:
         workdir: Optional[str | Path] = None,
         threshold_db: Optional[float] = None,
         circuit_version: Optional[str] = None,
+        waveform_precision: str = 'float64',
+        waveform_store: str = 'memory',
+        prune_criterion: str = 'peak',
+        background_writes: bool = True,
+        reciprocal: bool = False,
+        reciprocal_tolerance: float = RECIPROCITY_TOLERANCE,
+        screening_precision: str = 'complex128',
+        screening_report: bool = False,
+        port_order: str = 'metadata',
+        upper_touchstone: Optional[bool] = None,
     ):
         self.snp_path = str(snp_path)
         self.port_metadata, self.metadata_info = load_port_metadata(port_metadata_path)
@@ -372,8 +2360,35 @@ class CCT:
         self._prune_cache: Dict[Tuple[str, str], PruneResult] = {}
         self._prerun_summaries: List[Dict[str, object]] = []
         self._prune_warning_emitted = False
-
-        self._metadata_by_sequence = {entry.sequence: entry for entry in self.port_metadata}
+        self.prune_criterion = self._check_prune_criterion(prune_criterion)
+        self._coupling_db: Dict[str, np.ndarray] = {}
+        self._rx_coupling: Dict[str, np.ndarray] = {}
+        # complex128 RX x TX coupling used as the screening accuracy reference.
+        self._reference_coupling: Dict[str, np.ndarray] = {}
+        self._rx_expected_column: Optional[np.ndarray] = None
+        self._rx_group_rxs: List[object] = []
+        self._tx_columns: Dict[Tuple[str, str], int] = {}
+        self._prune_mask: Optional[np.ndarray] = None
+        self.reciprocal = bool(reciprocal)
+        self.reciprocal_tolerance = float(reciprocal_tolerance)
+        self._reciprocal_ok: Optional[bool] = None
+        if upper_touchstone is None:
+            upper_touchstone = self.circuit_version in UPPER_TOUCHSTONE_VERSIONS
+        self.upper_touchstone = bool(upper_touchstone)
+        if screening_precision not in SCREENING_PRECISIONS:
+            raise ValueError(
+                f"Unsupported screening precision: {screening_precision!r}; expected one of {', '.join(SCREENING_PRECISIONS)}"
+            )
+        self.screening_precision = screening_precision
+        # Whether pre_run checks a reduced screening precision against complex128.
+        self.check_screening = bool(screening_report)
+        self.screening_report: Optional[Dict[str, object]] = None
+        if port_order not in PORT_ORDERS:
+            raise ValueError(f"Unsupported port order: {port_order!r}; expected one of {', '.join(PORT_ORDERS)}")
+        self.port_order = port_order
+        # Position of every port (sequence - 1) in _slice_network; None keeps metadata order.
+        self._port_positions: Optional[np.ndarray] = None
+        self._port_order_threshold: Optional[float] = None
 
         self.txs: List[object] = []
         self.rxs: List[object] = []
@@ -385,6 +2400,18 @@ class CCT:
         self._rx_lookup: Dict[Tuple[str, str], object] = {}
         self.tx_config: Optional[Dict[str, str]] = None
         self.rx_config: Optional[Dict[str, str]] = None
+        store_kind = str(waveform_store or 'memory').strip().lower()
+        if store_kind == 'memory':
+            self.waveforms = WaveformStore(self._waveform_dtype(waveform_precision))
+        elif store_kind == 'disk':
+            self.waveforms = DiskWaveformStore(
+                self.workdir / WAVEFORM_SHARD_DIRNAME,
+                self._waveform_dtype(waveform_precision),
+            )
+        else:
+            raise ValueError(f"Unsupported waveform store: {waveform_store!r}")
+        self.metrics: Optional[ChannelMetrics] = None
+        self.batch_seconds: List[float] = []
 
         self._classify_ports()
 
@@ -395,13 +2422,41 @@ class CCT:
         ]
 
         self._network = None
+        self._network_error = 'scikit-rf not available'
         if rf is not None:
-            try:
-                self._network = rf.Network(self.snp_path)
-            except Exception:
-                self._network = None
+            self._network = self._open_network()
+        self._slice_network = self._network
 
         self._trim_dir = self.workdir / TRIMMED_TOUCHSTONE_DIRNAME
+        self._trim_store = TrimmedTouchstoneStore(self._trim_dir, background=background_writes)
+
+    def _open_network(self) -> Optional[LazyNetwork]:
+        """Open the sidecar next to the Touchstone, else one under the workdir."""
+        source = Path(self.snp_path)
+        fallback = self.workdir / TOUCHSTONE_SIDECAR_DIRNAME / (source.name + TOUCHSTONE_SIDECAR_SUFFIX)
+        for directory in (None, fallback):
+            try:
+                return LazyNetwork.open(source, directory=directory)
+            except OSError as exc:
+                error = exc
+                if directory is None and source.is_file():
+                    print(f"[network] Cannot use the sidecar next to {source.name} ({exc}); using {fallback}")
+                    continue
+            except Exception as exc:
+                error = exc
+            break
+        self._network_error = f"cannot read {source.name} ({type(error).__name__}: {error})"
+        print(f"[network] {self._network_error}")
+        return None
+
+    @staticmethod
+    def _waveform_dtype(precision: str):
+        value = str(precision or 'float64').strip().lower()
+        if value in {'float32', 'single', '32'}:
+            return np.float32
+        if value in {'float64', 'double', '64'}:
+            return np.float64
+        raise ValueError(f"Unsupported waveform precision: {precision!r}")
 
     @staticmethod
     def _channel_model_line(tstone_path: str | Path) -> str:
@@ -438,9 +2493,78 @@ class CCT:
             controller_sequences.extend([pos_entry.sequence, neg_entry.sequence])
         self._controller_sequences = sorted(set(controller_sequences))
 
+        # Port indices of every TX/RX group (singles, then differential
+        # pairs); a single-ended group has equal positive and negative ports.
+        self._tx_group_ports = self._group_ports(self.tx_single_entries, self.tx_diff_entries)
+        self._rx_group_ports = self._group_ports(self.rx_single_entries, self.rx_diff_entries)
+
         self._rx_total_groups = len(self.rx_single_entries) + len(self.rx_diff_entries)
         self._rx_total_ports = len(self.rx_single_entries) + 2 * len(self.rx_diff_entries)
 
+    @staticmethod
+    def _group_ports(
+        single_entries: List[PortMetadata],
+        diff_entries: List[Tuple[PortMetadata, PortMetadata]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        positive = [entry.sequence - 1 for entry in single_entries] + [pos.sequence - 1 for pos, _ in diff_entries]
+        negative = [entry.sequence - 1 for entry in single_entries] + [neg.sequence - 1 for _, neg in diff_entries]
+        return np.array(positive, dtype=int), np.array(negative, dtype=int)
+
+    @staticmethod
+    def _kept_groups(group_ports: Tuple[np.ndarray, np.ndarray], new_sequence: np.ndarray) -> np.ndarray:
+        """Groups with every port kept, ordered like :meth:`_classify_port_groups` on the trimmed ports."""
+        positive, negative = new_sequence[group_ports[0]], new_sequence[group_ports[1]]
+        kept = (positive > 0) & (negative > 0)
+        diff = group_ports[0] != group_ports[1]
+        singles = np.flatnonzero(kept & ~diff)
+        pairs = np.flatnonzero(kept & diff)
+        singles = singles[np.argsort(positive[singles], kind='stable')]
+        pairs = pairs[np.argsort(np.minimum(positive[pairs], negative[pairs]), kind='stable')]
+        return np.concatenate([singles, pairs])
+
+    def _new_sequences(self, kept_indices: np.ndarray) -> np.ndarray:
+        """Trimmed sequence of every port, 0 where the port is pruned."""
+        new_sequence = np.zeros(len(self.port_metadata), dtype=int)
+        new_sequence[kept_indices] = np.arange(1, kept_indices.size + 1)
+        return new_sequence
+
+    def _materialize_prune_result(self, prune_result: PruneResult) -> Tuple:
+        """Trimmed metadata, Tx/Rx objects and TX lookup of ``prune_result``."""
+        new_sequence = self._new_sequences(prune_result.kept_indices)
+        trimmed_metadata = [
+            _clone_port(self.port_metadata[index], sequence)
+            for sequence, index in enumerate(prune_result.kept_indices.tolist(), 1)
+        ]
+
+        def entries(group_ports, groups):
+            singles, pairs = [], []
+            for group in groups.tolist():
+                positive = trimmed_metadata[new_sequence[group_ports[0][group]] - 1]
+                negative = trimmed_metadata[new_sequence[group_ports[1][group]] - 1]
+                if positive is negative:
+                    singles.append(positive)
+                else:
+                    pairs.append((positive, negative))
+            return singles, pairs
+
+        tx_single_entries, tx_diff_entries = entries(self._tx_group_ports, prune_result.tx_groups)
+        rx_single_entries, rx_diff_entries = entries(self._rx_group_ports, prune_result.rx_groups)
+        txs, tx_single_map, tx_diff_map = self._create_tx_objects(
+            tx_single_entries,
+            tx_diff_entries,
+            **self.tx_config,
+        )
+        rxs, _rx_single_map, _rx_diff_map = self._create_rx_objects(
+            rx_single_entries,
+            rx_diff_entries,
+            res_rx=self.rx_config["res_rx"],
+            cap_rx=self.rx_config["cap_rx"],
+            tx_single_map=tx_single_map,
+            tx_diff_map=tx_diff_map,
+        )
+        tx_lookup = {self._tx_to_key(tx_obj): tx_obj for tx_obj in txs}
+        return trimmed_metadata, txs, rxs, tx_lookup
+
     def _group_differential(
         self,
         role: str,
@@ -530,6 +2654,20 @@ class CCT:
 
     def set_threshold(self, threshold_db: Optional[float]) -> None:
         self.threshold_db = threshold_db
+        self._prune_mask = None
+        self._prune_cache.clear()
+        self._prerun_summaries.clear()
+
+    @staticmethod
+    def _check_prune_criterion(criterion: Optional[str]) -> str:
+        name = str(criterion or 'peak').strip().lower()
+        if name not in PRUNE_CRITERIA:
+            raise ValueError(f"Unsupported prune criterion: {criterion!r}")
+        return name
+
+    def set_prune_criterion(self, criterion: str) -> None:
+        self.prune_criterion = self._check_prune_criterion(criterion)
+        self._prune_mask = None
         self._prune_cache.clear()
         self._prerun_summaries.clear()
 
@@ -554,6 +2692,12 @@ class CCT:
         )
 
         self._tx_lookup = {self._tx_to_key(tx): tx for tx in self.txs}
+        self._coupling_db.clear()
+        self._rx_coupling.clear()
+        self._reference_coupling.clear()
+        self.screening_report = None
+        self._rx_expected_column = None
+        self._prune_mask = None
         self._prune_cache.clear()
         self._prerun_summaries.clear()
 
@@ -575,13 +2719,33 @@ class CCT:
             tx_diff_map=self.tx_diff_map,
         )
 
+        previous_rxs = self._rx_entry_keys()
         self._rx_lookup = {self._rx_to_key(rx): rx for rx in self.rxs}
-        for rx in self.rxs:
-            rx.waveforms.clear()
-
+        self.waveforms.clear()
+        self.metrics = None
+
+        self._rx_expected_column = None
+        if self._rx_entry_keys() == previous_rxs:
+            # Only the terminations changed: coupling and pruning still hold,
+            # but cached prune results must rebuild their Rx netlist lines.
+            self._rx_groups()
+            for prune_result in self._prune_cache.values():
+                prune_result.clear_objects()
+            return
+        self._rx_coupling.clear()
+        self._reference_coupling.clear()
+        self.screening_report = None
+        self._prune_mask = None
         self._prune_cache.clear()
         self._prerun_summaries.clear()
 
+    def _rx_entry_keys(self) -> List[Tuple[Tuple[str, str], Optional[Tuple[str, str]]]]:
+        """Key of every RX with the key of the TX it expects; pruning uses nothing else of the RXs."""
+        return [
+            (key, None if rx.expected_tx is None else self._tx_to_key(rx.expected_tx))
+            for key, rx in self._rx_lookup.items()
+        ]
+
     def _tx_to_key(self, tx: object) -> Tuple[str, str]:
         if isinstance(tx, Tx_diff):
             identifier = self._diff_identifier(tx.pos, tx.neg)
@@ -598,158 +2762,457 @@ class CCT:
             return ("single", rx.meta.net)
         raise TypeError(f"Unsupported RX type: {type(rx)!r}")
 
-    def _ensure_prune_result(self, tx: object) -> PruneResult:
+    def _ensure_prune_result(self, tx: object, write: bool = True) -> PruneResult:
+        """Cached prune result of ``tx``.
+
+        With ``write=False`` a missing result is computed without writing its
+        trimmed touchstone and is not cached (used for dry runs).
+        """
         key = self._tx_to_key(tx)
         cached = self._prune_cache.get(key)
         if cached is not None:
             return cached
-        prune_result = self._compute_prune_result(tx)
-        self._prune_cache[key] = prune_result
+        prune_result = self._compute_prune_result(tx, write)
+        if write:
+            self._prune_cache[key] = prune_result
         return prune_result
 
-    def _compute_prune_result(self, tx: object) -> PruneResult:
+    def _prune_band_edge(self) -> float:
+        """Upper edge (Hz) of the signal band: Nyquist of ``ui`` or the ``t_rise`` knee."""
+        ui = parse_spice_value(self.tx_config["ui"])
+        t_rise = parse_spice_value(self.tx_config["t_rise"])
+        edges = [0.5 / ui if ui > 0 else 0.0, 0.35 / t_rise if t_rise > 0 else 0.0]
+        return max(edges) or float('inf')
+
+    def _band_weights(self, freqs: np.ndarray) -> np.ndarray:
+        """Power spectrum of the TX trapezoid pulse, used to weight |S|^2 in band."""
+        ui = parse_spice_value(self.tx_config["ui"])
+        t_rise = parse_spice_value(self.tx_config["t_rise"])
+        return (np.sinc(freqs * ui) * np.sinc(freqs * t_rise)) ** 2
+
+    def _rx_groups(self) -> None:
+        """TX columns, base RX objects and expected-TX column of every RX group."""
+        if self._rx_expected_column is not None:
+            return
+        self._tx_columns = {self._tx_to_key(tx): column for column, tx in enumerate(self.txs)}
+        columns_by_tx = {id(tx): column for column, tx in enumerate(self.txs)}
+        base_rxs = [self.rx_single_map.get(entry.net) for entry in self.rx_single_entries]
+        base_rxs.extend(self.rx_diff_map.get(self._diff_identifier(pos, neg)) for pos, neg in self.rx_diff_entries)
+        self._rx_group_rxs = base_rxs
+        self._rx_expected_column = np.array(
+            [columns_by_tx.get(id(getattr(rx, 'expected_tx', None)), -1) for rx in base_rxs],
+            dtype=int,
+        )
+
+    def _scan_coupling(self, precision: Optional[str] = None) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Evaluate every pruning criterion in one chunked pass over ``network.s``.
+
+        Returns port-pair matrices (dB) for ``peak``, ``band_peak`` and
+        ``band_energy`` and RX-group x TX matrices for all criteria, read at
+        ``precision`` (default ``screening_precision``).  A group's value is the maximum over its ports and
+        the ports of the TX, except for ``sdd`` which projects both sides on
+        their differential mode.  For a reciprocal network the port-pair
+        statistics are computed and kept as packed upper triangles.
+        """
+        self._rx_groups()
+        rx_pos, rx_neg = self._rx_group_ports
+        tx_pos = np.array([(tx.pid_pos if isinstance(tx, Tx_diff) else tx.pid) - 1 for tx in self.txs], dtype=int)
+        tx_neg = np.array([(tx.pid_neg if isinstance(tx, Tx_diff) else tx.pid) - 1 for tx in self.txs], dtype=int)
+        freqs = np.asarray(self._network.f, dtype=float)
+        s_params = self._network.screening(precision or self.screening_precision)
+        port_count = s_params.shape[1]
+        step = max(1, min(COUPLING_SCAN_CHUNK, COUPLING_SCAN_BYTES // (s_params.itemsize * port_count * port_count)))
+        real = np.finfo(s_params.dtype).dtype
+        half = math.sqrt(0.5)
+        tx_w_pos = np.where(tx_pos != tx_neg, half, 1.0).astype(real)
+        tx_w_neg = np.where(tx_pos != tx_neg, -half, 0.0).astype(real)
+        rx_w_pos = np.where(rx_pos != rx_neg, half, 1.0).astype(real)[:, None]
+        rx_w_neg = np.where(rx_pos != rx_neg, -half, 0.0).astype(real)[:, None]
+        upper = self._check_reciprocity()
+        if upper:
+            row_index, col_index = np.triu_indices(port_count)
+            pair_shape = row_index.shape
+        else:
+            pair_shape = s_params.shape[1:]
+        in_band = freqs <= self._prune_band_edge()
+        weights = np.where(in_band, self._band_weights(freqs), 0.0)
+        if weights.sum() > 0:
+            weights = weights / weights.sum()
+
+        peak = np.zeros(pair_shape)
+        band_peak = np.zeros(pair_shape)
+        energy = np.zeros(pair_shape)
+        sdd_peak = np.zeros((rx_pos.size, tx_pos.size))
+        for start in range(0, s_params.shape[0], step):
+            stop = start + step
+            chunk = np.asarray(s_params[start:stop])
+            magnitude = np.abs(chunk[:, row_index, col_index] if upper else chunk)
+            np.maximum(peak, magnitude.max(axis=0), out=peak)
+            band = in_band[start:stop]
+            if band.any():
+                np.maximum(band_peak, magnitude[band].max(axis=0), out=band_peak)
+                energy += np.tensordot(weights[start:stop][band], magnitude[band] ** 2, axes=1)
+            driven = chunk[:, :, tx_pos] * tx_w_pos + chunk[:, :, tx_neg] * tx_w_neg
+            mixed = driven[:, rx_pos, :] * rx_w_pos + driven[:, rx_neg, :] * rx_w_neg
+            np.maximum(sdd_peak, np.abs(mixed).max(axis=0), out=sdd_peak)
+
+        with np.errstate(divide='ignore'):
+            coupling_db = {
+                'peak': 20 * np.log10(peak),
+                'band_peak': 20 * np.log10(band_peak),
+                'band_energy': 10 * np.log10(energy),
+            }
+            rx_coupling = {'sdd': (20 * np.log10(sdd_peak)).reshape(rx_pos.size, tx_pos.size)}
+
+        def pairs(port_db, rows, cols):
+            if upper:
+                return port_db[_triu_position(port_count, rows[:, None], cols[None, :])]
+            return port_db[rows[:, None], cols[None, :]]
+
+        for name, port_db in coupling_db.items():
+            per_pos = np.maximum(pairs(port_db, rx_pos, tx_pos), pairs(port_db, rx_pos, tx_neg))
+            per_neg = np.maximum(pairs(port_db, rx_neg, tx_pos), pairs(port_db, rx_neg, tx_neg))
+            rx_coupling[name] = np.maximum(per_pos, per_neg).reshape(rx_pos.size, tx_pos.size)
+        return coupling_db, rx_coupling
+
+    def _network_indices(self, kept_indices: np.ndarray) -> np.ndarray:
+        """S-block indices of ports ``kept_indices`` in ``_slice_network``."""
+        return kept_indices if self._port_positions is None else self._port_positions[kept_indices]
+
+    def _ensure_port_order(self, write: bool = True) -> None:
+        """Apply the locality port order, once.
+
+        The order comes from the coupling graph at the first threshold pruned
+        with and is kept when the threshold changes, so a threshold sweep or
+        budget search does not write a permuted S copy per threshold.  Any
+        order gives the same pruning; it only affects how contiguous the
+        kept index ranges are.  With ``write=False`` (dry runs) the order is
+        chosen but the permuted copy is left for the first write.
+        """
+        if self.port_order != 'locality' or self._network is None:
+            return
+        if self._port_positions is None:
+            self._choose_port_order()
+        if write and self._slice_network is self._network:
+            self._slice_network = self._network.permuted(np.argsort(self._port_positions))
+
+    def _choose_port_order(self) -> None:
+        threshold = float(self.threshold_db)
+        peak = self._coupling_db['peak']
+        port_count = len(self.port_metadata)
+        if peak.ndim == 1:  # packed upper triangle in reciprocal mode
+            rows = np.arange(port_count)
+            peak = peak[_triu_position(port_count, rows[:, None], rows[None, :])]
+        adjacency = np.maximum(peak, peak.T) >= threshold
+        np.fill_diagonal(adjacency, False)
+        for positive, negative in self.tx_diff_entries + self.rx_diff_entries:
+            adjacency[positive.sequence - 1, negative.sequence - 1] = True
+            adjacency[negative.sequence - 1, positive.sequence - 1] = True
+        order = locality_order(adjacency, leading=sorted(seq - 1 for seq in self._controller_sequences))
+        positions = np.empty_like(order)
+        positions[order] = np.arange(order.size)
+        self._port_positions = positions
+        self._port_order_threshold = threshold
+        print(f'[order] Locality port order applied for {threshold:g} dB')
+
+    def _check_reciprocity(self) -> bool:
+        """Whether the reciprocal mode applies; the symmetry check runs once."""
+        if not self.reciprocal or self._network is None:
+            return False
+        if self._reciprocal_ok is None:
+            error = self._network.max_asymmetry()
+            self._reciprocal_ok = error <= self.reciprocal_tolerance
+            if self._reciprocal_ok and self.upper_touchstone:
+                self._trim_store.matrix_format = 'upper'
+                print(f'[prune] Reciprocal: max |Sij - Sji| = {error:.3g}; using upper-triangle storage')
+            elif self._reciprocal_ok:
+                # Coupling stats stay packed; netlists get full-matrix files.
+                print(
+                    f'[prune] Reciprocal: max |Sij - Sji| = {error:.3g}; upper-triangle coupling data, '
+                    f'full-matrix trimmed files (Upper format not verified for Circuit {self.circuit_version})'
+                )
+            else:
+                print(
+                    f'[prune] Not reciprocal: max |Sij - Sji| = {error:.3g} exceeds '
+                    f'{self.reciprocal_tolerance:g}; using the full matrix'
+                )
+        return self._reciprocal_ok
+
+    def _rx_coupling_db(self, criterion: Optional[str] = None) -> np.ndarray:
+        """Coupling in dB from every TX (columns) into every RX group (rows).
+
+        Rows follow ``rx_single_entries`` then ``rx_diff_entries``.
+        """
+        if not self._rx_coupling:
+            self._coupling_db, self._rx_coupling = self._scan_coupling()
+        return self._rx_coupling[criterion or self.prune_criterion]
+
+    def _threshold_mask(self) -> np.ndarray:
+        if self._prune_mask is None:
+            self._prune_mask = self._rx_coupling_db() >= float(self.threshold_db)
+        return self._prune_mask
+
+    def _sweep_counts(self, thresholds: np.ndarray, criterion: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Kept port and kept RX port counts, shaped ``(thresholds, txs)``.
+
+        Mirrors :meth:`_compute_prune_result`: the controller ports are always
+        kept, plus every RX group coupled at or above the threshold or
+        expecting the TX.  Nothing is written to disk.
+        """
+        coupling = self._rx_coupling_db(criterion)
+        rx_pos, rx_neg = self._rx_group_ports
+        tx_count = len(self.txs)
+        controller = np.zeros(len(self.port_metadata), dtype=bool)
+        controller[np.asarray(self._controller_sequences, dtype=int) - 1] = True
+        expected = self._rx_expected_column[:, None] == np.arange(tx_count)
+        group_ports = np.where(rx_pos != rx_neg, 2, 1)
+        in_controller = controller[rx_pos] & controller[rx_neg]
+
+        ports = np.empty((len(thresholds), tx_count), dtype=int)
+        rx_ports = np.empty((len(thresholds), tx_count), dtype=int)
+        for row, threshold in enumerate(thresholds):
+            keep = (coupling >= threshold) | expected | in_controller[:, None]
+            kept = np.repeat(controller[:, None], tx_count, axis=1)
+            kept[rx_pos] |= keep
+            kept[rx_neg] |= keep
+            ports[row] = kept.sum(axis=0)
+            rx_ports[row] = (keep * group_ports[:, None]).sum(axis=0)
+        return ports, rx_ports
+
+    def _criterion_port_counts(self) -> Dict[str, List[int]]:
+        """Kept port count of every TX under each criterion at the current threshold."""
+        threshold = np.array([float(self.threshold_db)])
+        return {criterion: self._sweep_counts(threshold, criterion)[0][0].tolist() for criterion in PRUNE_CRITERIA}
+
+    def threshold_sweep(self, thresholds: Iterable[float]) -> List[Dict[str, object]]:
+        """Kept ports of every TX at each threshold, from a single coupling scan.
+
+        Unlike :meth:`pre_run` this leaves ``threshold_db`` and the prune cache
+        untouched and writes no trimmed touchstones.
+        """
+        if not self.txs or not self.rxs:
+            raise RuntimeError("set_txs and set_rxs must be called before pre_run")
+        values = sorted({float(value) for value in thresholds})
+        total_port_count = len(self.port_metadata)
+        if self._network is None:
+            print(f'[prune] {self._network_error}; threshold sweep keeps every port')
+            ports = np.full((len(values), len(self.txs)), total_port_count, dtype=int)
+            rx_ports = np.full((len(values), len(self.txs)), self._rx_total_ports, dtype=int)
+        else:
+            ports, rx_ports = self._sweep_counts(np.array(values))
+
+        sweep: List[Dict[str, object]] = []
+        for column, tx in enumerate(self.txs):
+            sweep.append({
+                "tx_label": getattr(tx, 'label', 'tx'),
+                "prune_criterion": self.prune_criterion,
+                "thresholds": values,
+                "kept_port_count": ports[:, column].tolist(),
+                "kept_rx_port_count": rx_ports[:, column].tolist(),
+                "total_port_count": total_port_count,
+                "total_rx_port_count": self._rx_total_ports,
+            })
+        self._log_threshold_sweep(sweep)
+        return sweep
+
+    @staticmethod
+    def _log_threshold_sweep(sweep: List[Dict[str, object]]) -> None:
+        if not sweep:
+            return
+        thresholds = sweep[0]["thresholds"]
+        total = sweep[0]["total_port_count"]
+        print(f"[prune] Threshold sweep ({sweep[0]['prune_criterion']}), kept ports of {total}:")
+        print("[prune]   " + "tx".ljust(24) + "".join(f"{value:>9.1f}" for value in thresholds))
+        for entry in sweep:
+            print(f"[prune]   {str(entry['tx_label'])[:24]:<24}" + "".join(f"{count:>9d}" for count in entry["kept_port_count"]))
+        averages = [sum(entry["kept_port_count"][i] for entry in sweep) / len(sweep) for i in range(len(thresholds))]
+        print("[prune]   " + "average".ljust(24) + "".join(f"{value:>9.1f}" for value in averages))
+
+    def _compute_prune_result(self, tx: object, write: bool = True) -> PruneResult:
         if self.tx_config is None or self.rx_config is None:
             raise RuntimeError("set_txs and set_rxs must be called before running pruning")
 
         total_port_count = len(self.port_metadata)
-        kept_sequences = set(self._controller_sequences)
+        kept = np.zeros(total_port_count, dtype=bool)
+        kept[np.asarray(self._controller_sequences, dtype=int) - 1] = True
 
-        if isinstance(tx, Tx_diff):
-            tx_sequences = [tx.pid_pos, tx.pid_neg]
-        elif isinstance(tx, Tx):
-            tx_sequences = [tx.pid]
-        else:
+        if not isinstance(tx, (Tx, Tx_diff)):
             raise TypeError(f"Unsupported TX type: {type(tx)!r}")
 
         if self.threshold_db is not None and self._network is None and not self._prune_warning_emitted:
-            print('[prune] scikit-rf not available; pruning disabled for this run')
+            print(f'[prune] {self._network_error}; pruning disabled for this run')
             self._prune_warning_emitted = True
         if self.threshold_db is None or self._network is None:
-            kept_sequences.update(range(1, total_port_count + 1))
+            kept[:] = True
         else:
-            tx_indices = [seq - 1 for seq in tx_sequences]
-            threshold = float(self.threshold_db)
-
-            for entry in self.rx_single_entries:
-                base_rx = self.rx_single_map.get(entry.net)
-                keep = False
-                if base_rx is not None and base_rx.expected_tx is tx:
-                    keep = True
-                else:
-                    rx_idx = entry.sequence - 1
-                    peak = 0.0
-                    for tx_idx in tx_indices:
-                        data = np.abs(self._network.s[:, rx_idx, tx_idx])
-                        if data.size:
-                            peak = max(peak, float(np.max(data)))
-                    peak_db = 20 * math.log10(peak) if peak > 0 else float('-inf')
-                    keep = peak_db >= threshold
-                if keep:
-                    kept_sequences.add(entry.sequence)
-
-            for pos_entry, neg_entry in self.rx_diff_entries:
-                identifier = self._diff_identifier(pos_entry, neg_entry)
-                base_rx = self.rx_diff_map.get(identifier)
-                keep = False
-                if base_rx is not None and base_rx.expected_tx is tx:
-                    keep = True
-                else:
-                    rx_indices = [pos_entry.sequence - 1, neg_entry.sequence - 1]
-                    peak = 0.0
-                    for rx_idx in rx_indices:
-                        for tx_idx in tx_indices:
-                            data = np.abs(self._network.s[:, rx_idx, tx_idx])
-                            if data.size:
-                                peak = max(peak, float(np.max(data)))
-                    peak_db = 20 * math.log10(peak) if peak > 0 else float('-inf')
-                    keep = peak_db >= threshold
-                if keep:
-                    kept_sequences.update([pos_entry.sequence, neg_entry.sequence])
-
-            if not kept_sequences.issuperset(self._controller_sequences):
-                kept_sequences.update(self._controller_sequences)
-
-        kept_sequences_sorted = sorted(kept_sequences)
-        trimmed_metadata: List[PortMetadata] = []
-        for new_sequence, original_sequence in enumerate(kept_sequences_sorted, 1):
-            original_entry = self._metadata_by_sequence[original_sequence]
-            trimmed_metadata.append(_clone_port(original_entry, new_sequence))
-
-        (
-            tx_single_entries,
-            rx_single_entries,
-            tx_diff_entries,
-            rx_diff_entries,
-        ) = self._classify_port_groups(trimmed_metadata)
-
-        txs, tx_single_map, tx_diff_map = self._create_tx_objects(
-            tx_single_entries,
-            tx_diff_entries,
-            **self.tx_config,
-        )
-        rxs, rx_single_map, rx_diff_map = self._create_rx_objects(
-            rx_single_entries,
-            rx_diff_entries,
-            res_rx=self.rx_config["res_rx"],
-            cap_rx=self.rx_config["cap_rx"],
-            tx_single_map=tx_single_map,
-            tx_diff_map=tx_diff_map,
-        )
-
-        tx_lookup = {self._tx_to_key(tx_obj): tx_obj for tx_obj in txs}
-
-        kept_rx_group_count = len(rx_single_entries) + len(rx_diff_entries)
-        kept_rx_port_count = len(rx_single_entries) + 2 * len(rx_diff_entries)
+            self._rx_coupling_db()
+            column = self._tx_columns[self._tx_to_key(tx)]
+            keep = self._threshold_mask()[:, column] | (self._rx_expected_column == column)
+            rx_pos, rx_neg = self._rx_group_ports
+            kept[rx_pos[keep]] = True
+            kept[rx_neg[keep]] = True
+            self._ensure_port_order(write)
+
+        # Kept ports follow the S-block order of _slice_network.
+        kept_indices = np.flatnonzero(kept)
+        if self._port_positions is not None:
+            kept_indices = kept_indices[np.argsort(self._port_positions[kept_indices], kind='stable')]
+        new_sequence = self._new_sequences(kept_indices)
+        tx_groups = self._kept_groups(self._tx_group_ports, new_sequence)
+        rx_groups = self._kept_groups(self._rx_group_ports, new_sequence)
+
+        rx_pos, rx_neg = self._rx_group_ports
+        kept_rx_group_count = int(rx_groups.size)
+        kept_rx_port_count = kept_rx_group_count + int(np.count_nonzero(rx_pos[rx_groups] != rx_neg[rx_groups]))
 
         touchstone_path = Path(self.snp_path)
-        if self.threshold_db is not None and self._network is not None and kept_rx_group_count < self._rx_total_groups:
-            self._trim_dir.mkdir(parents=True, exist_ok=True)
-            port_indices = [seq - 1 for seq in kept_sequences_sorted]
-            trimmed_network = self._network.subnetwork(port_indices)
-            base_label = getattr(tx, 'label', 'tx')
-            label = self._sanitize_label(base_label)
-            port_count = len(kept_sequences_sorted)
-            filename = f"{Path(self.snp_path).stem}_{label}_{port_count}p"
-            trimmed_network.write_touchstone(filename=filename, dir=str(self._trim_dir))
-            touchstone_path = self._trim_dir / f"{filename}.s{port_count}p"
+        if not write:
+            if self.threshold_db is not None and self._network is not None and kept_rx_group_count < self._rx_total_groups:
+                touchstone_path = self._trim_store.path_for(self.snp_path, (kept_indices + 1).tolist())
+        elif self.threshold_db is not None and self._network is not None and kept_rx_group_count < self._rx_total_groups:
+            in_use = [cached.touchstone_path for cached in self._prune_cache.values()]
+            touchstone_path = self._trim_store.get_or_write(
+                self._slice_network,
+                self.snp_path,
+                (kept_indices + 1).tolist(),
+                in_use,
+                indices=self._network_indices(kept_indices),
+            )
 
         stats = {
             "tx_label": getattr(tx, 'label', 'tx'),
             "threshold_db": self.threshold_db,
-            "kept_port_count": len(kept_sequences_sorted),
+            "prune_criterion": self.prune_criterion,
+            "kept_port_count": int(kept_indices.size),
             "total_port_count": total_port_count,
             "kept_rx_port_count": kept_rx_port_count,
             "total_rx_port_count": self._rx_total_ports,
             "kept_rx_group_count": kept_rx_group_count,
             "total_rx_group_count": self._rx_total_groups,
+            "kept_port_runs": _index_runs(self._network_indices(kept_indices)),
             "touchstone_path": str(touchstone_path),
         }
 
         prune_result = PruneResult(
-            kept_sequences=kept_sequences_sorted,
-            trimmed_metadata=trimmed_metadata,
+            kept_indices=kept_indices,
+            tx_groups=tx_groups,
+            rx_groups=rx_groups,
             touchstone_path=touchstone_path,
-            txs=txs,
-            rxs=rxs,
-            tx_lookup=tx_lookup,
             stats=stats,
+            materialize=self._materialize_prune_result,
         )
         return prune_result
 
-    @staticmethod
-    def _sanitize_label(label: str) -> str:
-        sanitized = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_')
-        return sanitized or 'tx'
+    def select_threshold(
+        self,
+        budget_seconds: float,
+        tstep='100ps',
+        tstop='3ns',
+        licenses: int = 1,
+        engine: str = 'aedt',
+        thresholds: Optional[Iterable[float]] = None,
+    ) -> Dict[str, object]:
+        """Loosest threshold whose predicted runtime fits ``budget_seconds``.
+
+        Per-TX runtime comes from a :class:`CostModel` fitted to the run
+        history in ``workdir``; the total is the summed runtime spread over
+        ``licenses`` (but never below the slowest TX).  When no candidate
+        fits, the tightest one is returned with ``fits_budget`` false.  An
+        engine without run history has no runtime prediction: the current
+        threshold is kept and ``predicted_seconds`` is ``None``.
+        """
+        if not self.txs or not self.rxs:
+            raise RuntimeError("set_txs and set_rxs must be called before pre_run")
+        model = CostModel.fit(self._load_run_history(), str(engine or 'aedt').strip().lower())
+        if not model.predicts_time:
+            print(
+                f"[budget] No run history for engine {model.engine!r}; keeping the current threshold. "
+                "Run once without a budget to calibrate the prediction."
+            )
+            return {
+                "threshold_db": self.threshold_db,
+                "predicted_seconds": None,
+                "budget_seconds": float(budget_seconds),
+                "fits_budget": False,
+                "licenses": max(1, int(licenses or 1)),
+                "per_tx_seconds": None,
+                "kept_port_count": None,
+                "cost_model": model,
+            }
+        steps = parse_spice_value(tstop) / parse_spice_value(tstep)
+        licenses = max(1, int(licenses or 1))
+        if self._network is None:
+            print(f'[budget] {self._network_error}; predicting the unpruned runtime only')
+            candidates = [None]
+            ports = np.full((1, len(self.txs)), len(self.port_metadata), dtype=int)
+        else:
+            values = np.arange(-120.0, 0.25, 0.5) if thresholds is None else np.array(sorted({float(v) for v in thresholds}))
+            candidates = values.tolist()
+            ports = self._sweep_counts(values)[0]
+        per_tx = model.predict(ports, steps)
+        totals = np.maximum(per_tx.sum(axis=1) / licenses, per_tx.max(axis=1))
+        fitting = np.flatnonzero(totals <= budget_seconds)
+        index = int(fitting[0]) if fitting.size else len(candidates) - 1
+
+        choice = {
+            "threshold_db": candidates[index],
+            "predicted_seconds": float(totals[index]),
+            "budget_seconds": float(budget_seconds),
+            "fits_budget": bool(fitting.size),
+            "licenses": licenses,
+            "per_tx_seconds": per_tx[index].tolist(),
+            "kept_port_count": ports[index].tolist(),
+            "cost_model": model,
+        }
+        source = f"{model.samples} measured runs" if model.samples else "seed coefficients"
+        threshold_text = 'none' if choice["threshold_db"] is None else f"{choice['threshold_db']:g} dB"
+        print(
+            f"[budget] Threshold {threshold_text}: predicted {format_duration(choice['predicted_seconds'])} "
+            f"on {licenses} license(s), budget {format_duration(budget_seconds)} ({source})"
+        )
+        if not choice["fits_budget"]:
+            print('[budget] No threshold fits the budget; using the tightest candidate')
+        return choice
 
-    def pre_run(self, threshold_db: Optional[float] = None) -> List[Dict[str, object]]:
-        if threshold_db is not None:
+    def pre_run(
+        self,
+        threshold_db: Optional[float | Iterable[float]] = None,
+        budget_seconds: Optional[float] = None,
+        tstep='100ps',
+        tstop='3ns',
+        licenses: int = 1,
+        engine: str = 'aedt',
+    ) -> List[Dict[str, object]]:
+        """Prune every TX and return its stats.
+
+        Passing a list or range of thresholds runs :meth:`threshold_sweep`
+        instead and returns kept counts per TX at each threshold.  With
+        ``budget_seconds`` the threshold is chosen by :meth:`select_threshold`
+        and each summary carries its predicted runtime.
+        """
+        if isinstance(threshold_db, numbers.Real):  # includes NumPy integer/float scalars
+            threshold_db = float(threshold_db)
+        elif threshold_db is not None and not isinstance(threshold_db, (str, np.generic)):
+            return self.threshold_sweep(threshold_db)
+        choice = None
+        if budget_seconds is not None:
+            choice = self.select_threshold(budget_seconds, tstep, tstop, licenses, engine)
+            if choice["predicted_seconds"] is None and threshold_db is not None:
+                self.set_threshold(threshold_db)
+            else:
+                self.set_threshold(choice["threshold_db"])
+        elif threshold_db is not None:
             self.set_threshold(threshold_db)
         if not self.txs or not self.rxs:
             raise RuntimeError("set_txs and set_rxs must be called before pre_run")
         summaries: List[Dict[str, object]] = []
-        for tx in self.txs:
+        for index, tx in enumerate(self.txs):
             prune_result = self._ensure_prune_result(tx)
             stats = dict(prune_result.stats)
+            if choice is not None and choice["predicted_seconds"] is not None:
+                stats["predicted_seconds"] = choice["per_tx_seconds"][index]
+                stats["predicted_total_seconds"] = choice["predicted_seconds"]
+                stats["budget_seconds"] = choice["budget_seconds"]
             self._log_prune_stats(stats)
             summaries.append(stats)
         if summaries:
@@ -760,9 +3223,100 @@ class CCT:
             print(
                 f"[prune] Average kept ports: {ratio:.1%}; average kept RX ports: {rx_ratio:.1%}"
             )
+            if self.threshold_db is not None and self._network is not None:
+                counts = self._criterion_port_counts()
+                for index, stats in enumerate(summaries):
+                    stats["kept_port_count_by_criterion"] = {name: values[index] for name, values in counts.items()}
+                self._log_criterion_comparison(counts)
+                if self._port_positions is not None:
+                    self._log_port_runs(summaries)
+                if self.screening_precision != 'complex128' and self.check_screening:
+                    report = self.screening_accuracy_report()
+                    for index, stats in enumerate(summaries):
+                        stats["screening_match"] = index not in report["changed_tx_indices"]
+        self._trim_store.flush()
+        self._trim_store.log_stats()
         self._prerun_summaries = summaries
         return summaries
 
+    def _log_port_runs(self, summaries: List[Dict[str, object]]) -> None:
+        locality = [stats["kept_port_runs"] for stats in summaries]
+        metadata = [_index_runs(np.sort(self._prune_cache[self._tx_to_key(tx)].kept_indices)) for tx in self.txs]
+        print(
+            f"[order] Kept ports per TX: {sum(locality) / len(locality):.1f} index runs "
+            f"(metadata order {sum(metadata) / len(metadata):.1f}); "
+            f"{locality.count(1)}/{len(locality)} contiguous (metadata order {metadata.count(1)})"
+        )
+
+    def screening_accuracy_report(self) -> Dict[str, object]:
+        """Compare the screening-precision scan with a complex128 scan.
+
+        For every criterion reports the largest dB difference of the RX x TX
+        coupling and how many TX kept-port sets would change at the current
+        threshold; ``changed_tx_indices`` refers to the active criterion.
+        The complex128 scan runs once per TX/RX setup and the report is
+        reused until the threshold or criterion changes.
+        """
+        if self.threshold_db is None or self._network is None:
+            raise RuntimeError("screening_accuracy_report needs a threshold and a loaded network")
+        threshold = float(self.threshold_db)
+        report = self.screening_report
+        if report is not None and report["threshold_db"] == threshold and report["criterion"] == self.prune_criterion:
+            return report
+        self._rx_coupling_db()
+        screened = self._rx_coupling
+        if not self._reference_coupling:
+            self._reference_coupling = self._scan_coupling('complex128')[1]
+        reference = self._reference_coupling
+        expected = self._rx_expected_column[:, None] == np.arange(len(self.txs))
+        criteria: Dict[str, Dict[str, object]] = {}
+        for name in PRUNE_CRITERIA:
+            low, full = screened[name], reference[name]
+            finite = np.isfinite(low) & np.isfinite(full)
+            changed = ((low >= threshold) | expected) != ((full >= threshold) | expected)
+            criteria[name] = {
+                "max_delta_db": float(np.abs(low[finite] - full[finite]).max()) if finite.any() else 0.0,
+                "changed_txs": int(changed.any(axis=0).sum()),
+                "changed_rx_groups": int(changed.sum()),
+                "changed_tx_indices": np.flatnonzero(changed.any(axis=0)).tolist(),
+            }
+        active = criteria[self.prune_criterion]
+        report = {
+            "precision": self.screening_precision,
+            "threshold_db": threshold,
+            "criterion": self.prune_criterion,
+            "criteria": criteria,
+            "changed_tx_indices": active["changed_tx_indices"],
+            "same_decisions": active["changed_txs"] == 0,
+        }
+        tx_count = len(self.txs)
+        for name, entry in criteria.items():
+            print(
+                f"[precision] {self.screening_precision} vs complex128, {name}: max |delta| "
+                f"{entry['max_delta_db']:.2e} dB; kept ports differ for {entry['changed_txs']}/{tx_count} TX"
+            )
+        if report["same_decisions"]:
+            print(f"[precision] {self.prune_criterion} pruning decisions match complex128")
+        else:
+            print(
+                f"[precision] WARNING: {self.prune_criterion} pruning differs from complex128 for "
+                f"{active['changed_txs']} TX; use screening_precision='complex128' near this threshold"
+            )
+        self.screening_report = report
+        return report
+
+    def _log_criterion_comparison(self, counts: Dict[str, List[int]]) -> None:
+        total = len(self.port_metadata)
+        baseline = sum(counts['peak']) / len(counts['peak'])
+        for name, values in counts.items():
+            average = sum(values) / len(values)
+            msg = f"[prune] Criterion {name}: average kept ports {average:.1f}/{total} ({average / total:.1%})"
+            if name != 'peak' and baseline:
+                msg += f", {average / baseline - 1:+.1%} vs peak"
+            if name == self.prune_criterion:
+                msg += " (active)"
+            print(msg)
+
     def _log_prune_stats(self, stats: Dict[str, object]) -> None:
         kept = stats.get("kept_port_count", 0)
         total = stats.get("total_port_count", 1)
@@ -779,26 +3333,452 @@ class CCT:
             msg += f", rx ports {rx_kept}/{rx_total} ({rx_ratio:.1%})"
         if threshold is not None:
             msg += f", threshold {threshold} dB"
+        if "predicted_seconds" in stats:
+            msg += f", predicted {stats['predicted_seconds']:.0f} s"
         print(msg)
 
-    def run(self, tstep='100ps', tstop='3ns'):
+    def run(
+        self,
+        tstep='100ps',
+        tstop='3ns',
+        workers: int = 1,
+        circuit_factory=None,
+        batch_size: Optional[int | str] = None,
+        engine: str = 'aedt',
+        cache: bool = True,
+        incremental: bool = False,
+        service: bool = False,
+        streaming: bool = False,
+        keep_waveforms: bool = False,
+        schedule: str = 'lpt',
+        dry_run: bool = False,
+    ):
+        """Simulate every TX and store the RX waveforms.
+
+        With ``workers > 1`` the TX jobs are spread over a pool of worker
+        processes, each owning its own :class:`Design` (workdir, netlist
+        datablock and AEDT session).  Metrics do not depend on which worker
+        finished first.
+        ``circuit_factory`` replaces ``ansys.aedt.core.Circuit``, e.g. with
+        :class:`CircuitStandIn`.
+
+        ``batch_size`` solves several TXs in one analyze call by placing one
+        prefixed copy of the (pruned) channel per TX in the same netlist.  Pass
+        an integer for a fixed batch size or ``"auto"`` to size batches from
+        the kept port counts of the prune results.
+
+        ``engine="local"`` solves the linear circuit with :class:`LocalEngine`
+        (scikit-rf + NumPy) instead of AEDT; workers and batching are not used.
+
+        With ``cache`` enabled, per-TX results are looked up in the
+        :class:`PulseResponseCache` under ``<workdir>/pulse_cache`` before
+        simulating, keyed by the touchstone content, the kept port set, the
+        TX/RX settings, ``tstep``/``tstop`` and the circuit version.
+
+        ``incremental`` keys the same store by a fingerprint of each TX's final
+        netlist text plus the content of the touchstone it references, so after
+        a small edit (threshold, a few added ports) only TXs whose netlist
+        actually changed are simulated again.  The plan is printed first.
+
+        With ``service=True``, AEDT jobs are sent to the already initialised
+        designs of a listening ``cct_service.py`` process (see
+        :func:`service_address`) instead of launching a new session.  The
+        service is only used when it runs the same circuit kind as this call
+        (AEDT, or ``circuit_factory``), so a ``--stand-in`` service never
+        answers for AEDT.
+
+        ``streaming`` feeds each TX result into per-RX :class:`ChannelMetrics`
+        accumulators as soon as it arrives and drops the waveforms, so memory
+        stays flat in the number of TXs; :meth:`calculate` then writes the
+        same CSV from the accumulators.  Set ``keep_waveforms`` to store them
+        as well.
+
+        ``schedule="lpt"`` dispatches netlists longest predicted first (see
+        :class:`CostModel`) so big unpruned TXs do not leave workers idle at
+        the tail; ``"sequence"`` keeps TX order.  ``dry_run`` stops after
+        planning and returns the schedule with its predicted makespan; stored
+        waveforms and metrics are left alone and nothing is written: no
+        trimmed touchstones, permuted S copy, pulse cache or debug netlists.
+        """
         if not self.txs or not self.rxs:
             raise RuntimeError("set_txs and set_rxs must be called before run")
 
-        design = Design(self.workdir, tstep, tstop, version=self.circuit_version)
-        for rx in self.rxs:
-            rx.waveforms.clear()
+        engine_name = str(engine or 'aedt').strip().lower()
+        if engine_name not in {'aedt', 'local'}:
+            raise ValueError(f"Unsupported engine: {engine!r}")
+
+        engine_tag = engine_name
+        if circuit_factory is not None and engine_name == 'aedt':
+            engine_tag = f"{engine_name}:{circuit_kind(circuit_factory)}"
+
+        jobs = self._prepare_jobs(dry_run)
+        use_cache = cache or incremental
+        pulse_cache = PulseResponseCache(self.workdir / PULSE_CACHE_DIRNAME, read_only=dry_run) if use_cache else None
+        cached_results: Dict[int, Dict[int, Tuple[List[float], List[float]]]] = {}
+        cache_keys: Dict[int, str] = {}
+        if pulse_cache is not None:
+            key_func = self._netlist_fingerprint if incremental else self._pulse_cache_key
+            for index, job in enumerate(jobs):
+                try:
+                    cache_keys[index] = key_func(job, tstep, tstop, engine_tag)
+                except FileNotFoundError:
+                    if not dry_run:
+                        raise
+                    continue  # trimmed file not written yet: counted as a miss
+                hit = pulse_cache.get(cache_keys[index])
+                if hit is not None:
+                    cached_results[index] = hit
+        pending = [job for index, job in enumerate(jobs) if index not in cached_results]
+        if incremental:
+            self._log_incremental_plan(jobs, pending)
+
+        if engine_name == 'local':
+            batches = [[job] for job in pending]
+            worker_count = 1
+        else:
+            batches = self._plan_batches(pending, batch_size)
+            worker_count = max(1, min(int(workers or 1), len(batches)))
+        batches, plan = self._schedule_batches(batches, worker_count, tstep, tstop, engine_tag, schedule)
+        if dry_run:
+            self._log_schedule(plan, detailed=True)
+            return plan
+        self._log_schedule(plan)
+
+        self.waveforms.clear()
+        self.batch_seconds = []
+        if streaming:
+            self.metrics = ChannelMetrics(self.rxs, float(self.ui.replace('ps', '')), tx_order=self.txs)
+        else:
+            self.metrics = None
+
+        if engine_name == 'local':
+            results = self._run_batches_local(batches, tstep, tstop)
+        elif service and batches and self._service_matches(circuit_kind(circuit_factory)):
+            results = self._run_batches_service(batches, tstep, tstop, worker_count, circuit_kind(circuit_factory))
+        elif worker_count > 1:
+            results = self._run_batches_pool(batches, tstep, tstop, worker_count, circuit_factory)
+        else:
+            results = self._run_batches_serial(batches, tstep, tstop, circuit_factory)
+
+        for index, job in enumerate(jobs):
+            if index in cached_results:
+                self._merge_result(job, cached_results[index], keep_waveforms)
+        job_index = {id(job): index for index, job in enumerate(jobs)}
+        for batch, batch_results in zip(batches, results):
+            for job, result in zip(batch, batch_results):
+                if pulse_cache is not None:
+                    pulse_cache.put(cache_keys[job_index[id(job)]], result)
+                self._merge_result(job, result, keep_waveforms)
+        for _ in results:  # let the runner finish (pool shutdown, timing log)
+            pass
+
+        if pulse_cache is not None:
+            pulse_cache.log_stats()
+        self._record_run_history(batches, self.batch_seconds, tstep, tstop, engine_tag)
+
+    def _merge_result(self, job: SimulationJob, result: Dict[int, Tuple[List[float], List[float]]], keep_waveforms: bool) -> None:
+        block = self._collect_waveforms(job.prune_result, result)
+        if block is None:
+            return
+        if self.metrics is not None:
+            time_values, base_rxs, volts = block
+            # Match the precision calculate would see from the store.
+            self.metrics.add(job.tx, time_values, base_rxs, volts.astype(self.waveforms.dtype, copy=False))
+        if self.metrics is None or keep_waveforms:
+            self.waveforms.add(job.tx, *block)
+
+    def _schedule_batches(
+        self,
+        batches: List[List[SimulationJob]],
+        workers: int,
+        tstep,
+        tstop,
+        engine_tag: str,
+        schedule: str = 'lpt',
+    ) -> Tuple[List[List[SimulationJob]], Dict[str, object]]:
+        """Order batches for dispatch and predict when each one runs.
+
+        Costs come from :class:`CostModel` on the kept port counts.  The plan
+        replays greedy list scheduling (next batch to the first free worker),
+        which is how the pool and the service threads pick up queued work.
+        """
+        schedule_name = str(schedule or 'lpt').strip().lower()
+        if schedule_name not in {'lpt', 'sequence'}:
+            raise ValueError(f"Unsupported schedule: {schedule!r}")
+        model = CostModel.fit(self._load_run_history(), engine_tag)
+        steps = parse_spice_value(tstop) / parse_spice_value(tstep)
+        ports = [sum(int(job.prune_result.stats.get("kept_port_count", 0)) for job in batch) for batch in batches]
+        costs = [float(model.predict(count, steps)) for count in ports]
+        order = list(range(len(batches)))
+        if schedule_name == 'lpt':
+            order.sort(key=lambda index: -costs[index])
+
+        free_at = [0.0] * max(1, workers)
+        entries = []
+        for index in order:
+            worker = min(range(len(free_at)), key=free_at.__getitem__)
+            start = free_at[worker]
+            free_at[worker] = start + costs[index]
+            entries.append({
+                "txs": [getattr(job.tx, 'label', 'tx') for job in batches[index]],
+                "ports": ports[index],
+                "predicted_seconds": costs[index],
+                "worker": worker,
+                "start": start,
+                "end": free_at[worker],
+            })
+        plan = {
+            "schedule": schedule_name,
+            "workers": len(free_at),
+            "batches": entries,
+            "makespan": max(free_at) if entries else 0.0,
+            "serial_seconds": float(sum(costs)),
+            "cost_model": model,
+        }
+        return [batches[index] for index in order], plan
 
+    @staticmethod
+    def _log_schedule(plan: Dict[str, object], detailed: bool = False) -> None:
+        entries = plan["batches"]
+        if not entries:
+            return
+        if not plan["cost_model"].predicts_time:
+            print(
+                f"[schedule] {len(entries)} netlists on {plan['workers']} worker(s), {plan['schedule']} order: "
+                f"no run history for engine {plan['cost_model'].engine!r}, so no runtime prediction"
+            )
+            detailed = False
+        else:
+            print(
+                f"[schedule] {len(entries)} netlists on {plan['workers']} worker(s), {plan['schedule']} order: "
+                f"predicted makespan {format_duration(plan['makespan'])} (serial {format_duration(plan['serial_seconds'])})"
+            )
+        if not detailed:
+            return
+        for position, entry in enumerate(entries, 1):
+            print(
+                f"[schedule] {position:>4d}  worker {entry['worker']}  "
+                f"{format_duration(entry['start']):>10} -> {format_duration(entry['end']):>10}  "
+                f"{entry['ports']:>5d} ports  {', '.join(entry['txs'])}"
+            )
+
+    def _load_run_history(self) -> List[Dict[str, object]]:
+        path = self.workdir / RUN_HISTORY_FILENAME
+        try:
+            records = json.loads(path.read_text(encoding='utf-8')).get('records', [])
+        except (OSError, ValueError, AttributeError):
+            return []
+        return [record for record in records if isinstance(record, dict)]
+
+    def _record_run_history(self, batches: List[List[SimulationJob]], seconds: List[float], tstep, tstop, engine_tag: str) -> None:
+        """Append one record per simulated netlist for :class:`CostModel`."""
+        if not batches or len(seconds) != len(batches):
+            return
+        steps = parse_spice_value(tstop) / parse_spice_value(tstep)
+        records = self._load_run_history()
+        for batch, elapsed in zip(batches, seconds):
+            records.append({
+                "engine": engine_tag,
+                "ports": sum(int(job.prune_result.stats.get("kept_port_count", 0)) for job in batch),
+                "txs": len(batch),
+                "steps": round(steps, 6),
+                "seconds": round(elapsed, 4),
+            })
+        path = self.workdir / RUN_HISTORY_FILENAME
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({"records": records[-RUN_HISTORY_LIMIT:]}, indent=1), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _netlist_fingerprint(self, job: SimulationJob, tstep, tstop, engine_tag: str) -> str:
+        touchstone_path = str(job.prune_result.touchstone_path)
+        netlist_text = job.netlist_text.replace(touchstone_path, _file_digest(touchstone_path))
+        return PulseResponseCache.make_key(
+            netlist=netlist_text,
+            nets=[
+                (self.port_metadata[index].net, self.port_metadata[index].component_role)
+                for index in job.prune_result.kept_indices.tolist()
+            ],
+            tx=list(self._tx_to_key(job.tx)),
+            tstep=str(tstep),
+            tstop=str(tstop),
+            circuit_version=self.circuit_version,
+            engine=engine_tag,
+        )
+
+    @staticmethod
+    def _log_incremental_plan(jobs: List[SimulationJob], pending: List[SimulationJob]) -> None:
+        print(f"[incremental] {len(pending)} of {len(jobs)} TX changed")
+        if pending and len(pending) < len(jobs):
+            labels = ', '.join(str(getattr(job.tx, 'label', 'tx')) for job in pending)
+            print(f"[incremental] Resimulating: {labels}")
+
+    def _pulse_cache_key(self, job: SimulationJob, tstep, tstop, engine_tag: str) -> str:
+        # The netlist text carries each port's role and termination; the
+        # trimmed file it references is already covered by touchstone + ports.
+        netlist_text = job.netlist_text.replace(str(job.prune_result.touchstone_path), '<touchstone>')
+        return PulseResponseCache.make_key(
+            touchstone=_file_digest(self.snp_path),
+            ports=list(job.prune_result.kept_sequences),
+            netlist=hashlib.sha256(netlist_text.encode('utf-8')).hexdigest(),
+            tx=list(self._tx_to_key(job.tx)),
+            tx_config=self.tx_config,
+            rx_config=self.rx_config,
+            tstep=str(tstep),
+            tstop=str(tstop),
+            circuit_version=self.circuit_version,
+            engine=engine_tag,
+        )
+
+    def _prepare_jobs(self, dry_run: bool = False) -> List[SimulationJob]:
+        """Build each TX's netlist; ``dry_run`` writes no trimmed or debug files."""
+        jobs: List[SimulationJob] = []
         for tx in self.txs:
-            prune_result = self._ensure_prune_result(tx)
+            prune_result = self._ensure_prune_result(tx, write=not dry_run)
             if not self._prerun_summaries:
                 self._log_prune_stats(prune_result.stats)
 
             netlist_lines = self._build_netlist(prune_result, tx)
             netlist_text = '\n'.join(netlist_lines)
-            self._write_debug_netlist(tx, netlist_text)
-            result = design.run(netlist_text)
-            self._store_waveforms(prune_result, result, tx)
+            if not dry_run:
+                self._write_debug_netlist(tx, netlist_text)
+            jobs.append(SimulationJob(tx=tx, prune_result=prune_result, netlist_text=netlist_text))
+        if not dry_run:
+            self._trim_store.flush()
+            self._trim_store.log_stats()
+        return jobs
+
+    def _plan_batches(self, jobs: List[SimulationJob], batch_size: Optional[int | str]) -> List[List[SimulationJob]]:
+        if isinstance(batch_size, str):
+            if batch_size.strip().lower() != 'auto':
+                raise ValueError(f"Unsupported batch size: {batch_size!r}")
+            return self._auto_batches(jobs)
+        size = int(batch_size) if batch_size is not None else 1
+        if size < 1:
+            raise ValueError("batch_size must be positive")
+        if size == 1:
+            return [[job] for job in jobs]
+        batches = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+        self._log_batches(batches)
+        return batches
+
+    def _auto_batches(self, jobs: List[SimulationJob]) -> List[List[SimulationJob]]:
+        # A batch may hold as many ports as the unpruned channel, so batching
+        # never produces a netlist larger than a single full-network run.
+        port_budget = len(self.port_metadata)
+        batches: List[List[SimulationJob]] = []
+        current: List[SimulationJob] = []
+        current_ports = 0
+        for job in jobs:
+            ports = int(job.prune_result.stats.get("kept_port_count", port_budget))
+            if current and current_ports + ports > port_budget:
+                batches.append(current)
+                current, current_ports = [], 0
+            current.append(job)
+            current_ports += ports
+        if current:
+            batches.append(current)
+        self._log_batches(batches)
+        return batches
+
+    @staticmethod
+    def _log_batches(batches: List[List[SimulationJob]]) -> None:
+        job_count = sum(len(batch) for batch in batches)
+        if len(batches) < job_count:
+            print(f"[run] Batched {job_count} TX jobs into {len(batches)} netlists")
+
+    @staticmethod
+    def _batch_netlist(batch: List[SimulationJob]) -> str:
+        if len(batch) == 1:
+            return batch[0].netlist_text
+        lines: List[str] = []
+        for index, job in enumerate(batch, 1):
+            lines.extend(prefix_netlist_lines(job.netlist_text.splitlines(), f"b{index}"))
+        return '\n'.join(lines)
+
+    def _run_batches_local(self, batches: List[List[SimulationJob]], tstep, tstop):
+        engine = LocalEngine(self._slice_network, tstep, tstop)
+        for batch in batches:
+            start = time.perf_counter()
+            results = [
+                engine.run(job.netlist_text, port_indices=self._network_indices(job.prune_result.kept_indices))
+                for job in batch
+            ]
+            self.batch_seconds.append(time.perf_counter() - start)
+            yield results
+
+    def _run_batches_serial(self, batches: List[List[SimulationJob]], tstep, tstop, circuit_factory=None):
+        design = Design(self.workdir, tstep, tstop, version=self.circuit_version, circuit_factory=circuit_factory)
+        for batch in batches:
+            netlist_text = self._batch_netlist(batch)
+            start = time.perf_counter()
+            if len(batch) > 1:
+                results = design.run_batch(netlist_text, len(batch))
+            else:
+                results = [design.run(netlist_text)]
+            self.batch_seconds.append(time.perf_counter() - start)
+            yield results
+        design.log_timings()
+
+    @staticmethod
+    def _service_matches(circuit: str) -> bool:
+        address = service_address()
+        reported = service_circuit(address)
+        if reported is None:
+            print(f"[run] No CCT service at {address[0]}:{address[1]}; starting a local session")
+            return False
+        if reported != circuit:
+            print(f"[run] Ignoring CCT service at {address[0]}:{address[1]}: it runs {reported!r}, not {circuit!r}")
+            return False
+        return True
+
+    def _run_batches_service(self, batches: List[List[SimulationJob]], tstep, tstop, workers: int, circuit: str = "aedt"):
+        address = service_address()
+        print(f"[run] Sending {len(batches)} netlists to CCT service at {address[0]}:{address[1]}")
+
+        def submit(batch: List[SimulationJob]):
+            start = time.perf_counter()
+            with ServiceClient(address) as client:
+                results = client.run(
+                    self._batch_netlist(batch), tstep, tstop, self.circuit_version, len(batch), circuit
+                )
+            return time.perf_counter() - start, results
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from self._windowed_results(
+                (lambda batch=batch: executor.submit(submit, batch) for batch in batches), workers
+            )
+
+    def _run_batches_pool(self, batches: List[List[SimulationJob]], tstep, tstop, workers: int, circuit_factory=None):
+        print(f"[run] Dispatching {len(batches)} netlists to {workers} workers")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_pool_worker,
+            initargs=(str(self.workdir), tstep, tstop, self.circuit_version, circuit_factory),
+        ) as executor:
+            yield from self._windowed_results(
+                (
+                    lambda batch=batch: executor.submit(_run_timed_pool_job, self._batch_netlist(batch), len(batch))
+                    for batch in batches
+                ),
+                workers,
+            )
+
+    def _windowed_results(self, submissions: Iterable[Callable[[], object]], workers: int):
+        """Yield results in submission order with about ``2 * workers`` in flight.
+
+        A finished future is dropped as soon as its result is taken, so the
+        waveforms held at once do not grow with the number of TXs.
+        """
+        submissions = iter(submissions)
+        window = 2 * max(1, workers)
+        pending = deque(submit() for submit in islice(submissions, window))
+        while pending:
+            elapsed, results = pending.popleft().result()
+            for submit in islice(submissions, 1):
+                pending.append(submit())
+            self.batch_seconds.append(elapsed)
+            yield results
+            del results
 
     def _build_netlist(self, prune_result: PruneResult, active_tx: object) -> List[str]:
         nets = ' '.join([f'net_{entry.sequence}' for entry in prune_result.trimmed_metadata])
@@ -814,23 +3794,45 @@ class CCT:
             netlist.extend(rx.get_netlist())
         return netlist
 
-    def _store_waveforms(self, prune_result: PruneResult, result: Dict[int, Tuple[List[float], List[float]]], base_tx: object) -> None:
-        for rx in prune_result.rxs:
-            base_rx = self._rx_lookup.get(self._rx_to_key(rx))
-            if base_rx is None:
+    def _collect_waveforms(
+        self, prune_result: PruneResult, result: Dict[int, Tuple[List[float], List[float]]]
+    ) -> Optional[Tuple[np.ndarray, List[object], np.ndarray]]:
+        self._rx_groups()
+        new_sequence = self._new_sequences(prune_result.kept_indices)
+        rx_pos, rx_neg = self._rx_group_ports
+        groups = prune_result.rx_groups
+        group_pos = new_sequence[rx_pos[groups]].tolist()
+        group_neg = new_sequence[rx_neg[groups]].tolist()
+        base_rxs: List[object] = []
+        positive_nodes: List[int] = []
+        negative_nodes: List[Optional[int]] = []
+        for group, positive, negative in zip(groups.tolist(), group_pos, group_neg):
+            base_rx = self._rx_group_rxs[group]
+            if base_rx is None or positive not in result or negative not in result:
                 continue
-            if isinstance(rx, Rx):
-                if rx.sequence in result:
-                    base_rx.waveforms[base_tx] = result[rx.sequence]
-            elif isinstance(rx, Rx_diff):
-                if rx.pid_pos in result and rx.pid_neg in result:
-                    time_pos, waveform_pos = result[rx.pid_pos]
-                    _, waveform_neg = result[rx.pid_neg]
-                    new_result = (
-                        time_pos,
-                        [vpos - vneg for vpos, vneg in zip(waveform_pos, waveform_neg)],
-                    )
-                    base_rx.waveforms[base_tx] = new_result
+            base_rxs.append(base_rx)
+            positive_nodes.append(positive)
+            negative_nodes.append(negative if negative != positive else None)
+        if not base_rxs:
+            return None
+
+        # Results may be views into a mapped result file; stacking copies them.
+        nodes = sorted(set(positive_nodes) | {node for node in negative_nodes if node is not None})
+        time_values = np.array(result[nodes[0]][0], dtype=float)
+        node_rows = {node: row for row, node in enumerate(nodes)}
+        node_volts = np.empty((len(nodes), time_values.size), dtype=float)
+        for node, row in node_rows.items():
+            node_time, node_waveform = result[node]
+            node_waveform = np.asarray(node_waveform, dtype=float)
+            if node_waveform.size != time_values.size:
+                node_waveform = np.interp(time_values, np.asarray(node_time, dtype=float), node_waveform)
+            node_volts[row] = node_waveform
+
+        volts = node_volts[[node_rows[node] for node in positive_nodes]]
+        diff_rows = [i for i, node in enumerate(negative_nodes) if node is not None]
+        if diff_rows:
+            volts[diff_rows] -= node_volts[[node_rows[negative_nodes[i]] for i in diff_rows]]
+        return time_values, base_rxs, volts
 
     def calculate(self, output_path):
         output_file = Path(output_path)
@@ -838,33 +3840,12 @@ class CCT:
 
         ui = float(self.ui.replace('ps', ''))
 
-        result = []
-        for rx in self.rxs:
-            if not getattr(rx, 'waveforms', None):
-                continue
-            primary_tx = getattr(rx, 'expected_tx', None)
-            if primary_tx is None:
-                continue
-            waveform_primary = rx.waveforms.get(primary_tx)
-            if waveform_primary is None:
-                continue
-            sig = isi = 0.0
-            xtalk = 0.0
-            for tx, waveform in rx.waveforms.items():
-                time, voltage = waveform
-                if tx == primary_tx:
-                    sig, isi = get_sig_isi(time, voltage, ui)
-                else:
-                    xtalk += integrate_nonuniform(time, [abs(v) for v in voltage])
-            pseudo_eye = sig - isi - xtalk
-            denom = isi + xtalk
-            p_ratio = sig / denom if denom else float('inf')
-
-            tx_label = getattr(primary_tx, 'label', getattr(primary_tx, 'pid', 'unknown'))
-            rx_label = getattr(rx, 'label', str(getattr(rx, 'pid', 'unknown')))
-            result.append(
-                f'{tx_label}, {rx_label}, {sig:.3f}, {isi:.3f}, {xtalk:.3f}, {pseudo_eye:.3f}, {p_ratio:.3f}'
-            )
+        metrics = self.metrics
+        if metrics is None:
+            metrics = ChannelMetrics(self.rxs, ui, tx_order=self.txs)
+            for tx in self.waveforms.txs():
+                metrics.add(tx, *self.waveforms.block(tx))
+        result = metrics.rows()
 
         with output_file.open('w') as f:
             f.writelines('tx_name, rx_name, sig(V*ps), isi(V*ps), xtalk(V*ps), pseudo_eye(V*ps), power_ratio\n')
@@ -887,18 +3868,24 @@ class CCT:
 if __name__ == '__main__':
     import sys
 
+    dry_run = '--dry-run' in sys.argv
+    if dry_run:
+        sys.argv.remove('--dry-run')
+
     if len(sys.argv) >= 3:
         touchstone_path = sys.argv[1]
         metadata_path = sys.argv[2]
         output_csv = sys.argv[3] if len(sys.argv) >= 4 else str(Path(metadata_path).with_name(f"{Path(metadata_path).stem}_cct.csv"))
         threshold_arg = sys.argv[4] if len(sys.argv) >= 5 else None
         version_arg = sys.argv[5] if len(sys.argv) >= 6 else None
+        workers_arg = sys.argv[6] if len(sys.argv) >= 7 else None
     else:
         touchstone_path = r"D:\OneDrive - ANSYS, Inc\a-client-repositories\quanta-cct-circuit-202508\data\Sweep1_DV3.s88p"
         metadata_path = r"D:\OneDrive - ANSYS, Inc\a-client-repositories\quanta-cct-circuit-202508\output\Sweep1_DV3_ports.json"
         output_csv = str(Path(metadata_path).with_name(f"{Path(metadata_path).stem}_cct.csv"))
         threshold_arg = None
         version_arg = None
+        workers_arg = None
 
     threshold_db = None
     if threshold_arg is not None:
@@ -907,10 +3894,20 @@ if __name__ == '__main__':
         except ValueError:
             threshold_db = None
 
+    workers = 1
+    if workers_arg is not None:
+        try:
+            workers = max(1, int(workers_arg))
+        except ValueError:
+            workers = 1
+
     cct = CCT(touchstone_path, metadata_path, threshold_db=threshold_db, circuit_version=version_arg)
     cct.set_txs(vhigh="0.8V", t_rise="30ps", ui="133ps", res_tx="40ohm", cap_tx="1pF")
     cct.set_rxs(res_rx="30ohm", cap_rx="1.8pF")
-    if threshold_db is not None:
+    if threshold_db is not None and not dry_run:
         cct.pre_run()
-    cct.run()
-    cct.calculate(output_path=output_csv)
+    if dry_run:
+        cct.run(workers=workers, dry_run=True)
+    else:
+        cct.run(workers=workers, streaming=True)
+        cct.calculate(output_path=output_csv)
@@ -0,0 +1,216 @@
+"""Long-lived CCT simulation service.
+
+Keeps one or more initialised :class:`cct.Design` objects (AEDT session,
+netlist datablock and ``myTransient`` setup) alive and serves netlist jobs
+over a local socket, so ``CCT.run`` and the GUI skip the AEDT start-up cost.
+
+    python src/cct_service.py --designs 2
+    python src/cct_service.py --stand-in        # no AEDT, for protocol tests
+"""
+from __future__ import annotations
+
+import argparse
+import queue
+import sys
+import threading
+import traceback
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cct import (
+    DEFAULT_CIRCUIT_VERSION,
+    CircuitStandIn,
+    Design,
+    circuit_kind,
+    service_address,
+    service_authkey,
+)
+
+
+def info(message: str) -> None:
+    print(f"[service] {message}", flush=True)
+
+
+def _detach(result: Dict[int, Tuple[object, object]]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    return {key: (np.array(time_values), np.array(volts)) for key, (time_values, volts) in result.items()}
+
+
+class CctService:
+    def __init__(
+        self,
+        workdir: Path,
+        designs: int = 1,
+        tstep='100ps',
+        tstop='3ns',
+        version: Optional[str] = None,
+        circuit_factory=None,
+    ) -> None:
+        self.workdir = Path(workdir)
+        self.default_version = (str(version).strip() if version else '') or DEFAULT_CIRCUIT_VERSION
+        self.circuit_factory = circuit_factory
+        self.circuit = circuit_kind(circuit_factory)
+        self._tstep = tstep
+        self._tstop = tstop
+        self._pools: Dict[str, "queue.Queue[Design]"] = {}
+        self._designs: List[Design] = []
+        self._lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._address: Optional[Tuple[str, int]] = None
+        self._authkey: Optional[bytes] = None
+        self._stopping = threading.Event()
+        for _ in range(max(1, int(designs))):
+            self._release(self._create_design(self.default_version))
+
+    def _create_design(self, version: str) -> Design:
+        index = len(self._designs)
+        info(f"Initialising design {index} (AEDT {version})")
+        design = Design(
+            self.workdir / f"design_{index}",
+            self._tstep,
+            self._tstop,
+            version=version,
+            circuit_factory=self.circuit_factory,
+            new_desktop=True,
+        )
+        with self._lock:
+            self._designs.append(design)
+        return design
+
+    def _pool(self, version: str) -> "queue.Queue[Design]":
+        with self._lock:
+            return self._pools.setdefault(version, queue.Queue())
+
+    def _acquire(self, version: str) -> Design:
+        pool = self._pool(version)
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            pass
+        if version != self.default_version and not any(d.circuit_version == version for d in self._designs):
+            return self._create_design(version)
+        return pool.get()
+
+    def _release(self, design: Design) -> None:
+        self._pool(design.circuit_version).put(design)
+
+    def handle_request(self, request: Dict[str, object]) -> Dict[str, object]:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "designs": len(self._designs), "circuit": self.circuit}
+        if op == "shutdown":
+            self._stopping.set()
+            return {"ok": True}
+        if op != "run":
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        circuit = str(request.get("circuit") or "aedt")
+        if circuit != self.circuit:
+            return {"ok": False, "error": f"service runs {self.circuit!r}, not {circuit!r}"}
+
+        version = (str(request.get("version") or '').strip()) or self.default_version
+        batch_count = int(request.get("batch_count") or 1)
+        design = self._acquire(version)
+        try:
+            design.set_transient(request.get("tstep") or self._tstep, request.get("tstop") or self._tstop)
+            netlist = str(request.get("netlist", ''))
+            if batch_count > 1:
+                results = design.run_batch(netlist, batch_count)
+            else:
+                results = [design.run(netlist)]
+            # Copy out of the design's result buffers before another request
+            # can reuse them.
+            results = [_detach(result) for result in results]
+        finally:
+            self._release(design)
+        return {"ok": True, "results": results}
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while not self._stopping.is_set():
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self.handle_request(request)
+                except Exception as exc:  # pragma: no cover - reported to the client
+                    traceback.print_exc()
+                    reply = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                conn.send(reply)
+                if self._stopping.is_set():
+                    self._wake_listener()
+
+    def _wake_listener(self) -> None:
+        # accept() does not return when the socket is closed from another
+        # thread, so connect once to let the accept loop see the stop flag.
+        try:
+            Client(self._address, authkey=self._authkey).close()
+        except Exception:
+            pass
+
+    def serve_forever(self, address: Optional[Tuple[str, int]] = None, authkey: Optional[bytes] = None) -> None:
+        address = address or service_address()
+        self._authkey = authkey = authkey or service_authkey()
+        self._listener = Listener(address, authkey=authkey)
+        # The bound address, so port 0 picks a free port.
+        self._address = address = self._listener.address
+        info(f"Listening on {address[0]}:{address[1]} with {len(self._designs)} design(s)")
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn = self._listener.accept()
+                except OSError:
+                    break
+                except Exception as exc:  # pragma: no cover - bad handshake
+                    info(f"Rejected connection: {exc}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            self.close()
+
+    def close(self) -> None:
+        for design in self._designs:
+            design.log_timings()
+            try:
+                design.close()
+            except Exception:  # pragma: no cover - best effort shutdown
+                pass
+        info("Stopped")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Keep AEDT Circuit designs warm for CCT runs.")
+    parser.add_argument("--designs", type=int, default=1, help="number of pre-initialised designs")
+    parser.add_argument("--tstep", default="100ps")
+    parser.add_argument("--tstop", default="3ns")
+    parser.add_argument("--version", default=None, help=f"AEDT version (default {DEFAULT_CIRCUIT_VERSION})")
+    parser.add_argument("--workdir", default=str(Path.cwd() / "cct_service_work"))
+    parser.add_argument("--address", default=None, help="host:port to listen on")
+    parser.add_argument("--stand-in", action="store_true", help="use CircuitStandIn instead of AEDT")
+    args = parser.parse_args(argv)
+
+    address = None
+    if args.address:
+        host, _, port = args.address.rpartition(':')
+        address = (host or "127.0.0.1", int(port))
+
+    service = CctService(
+        Path(args.workdir),
+        designs=args.designs,
+        tstep=args.tstep,
+        tstop=args.tstop,
+        version=args.version,
+        circuit_factory=CircuitStandIn if args.stand_in else None,
+    )
+    try:
+        service.serve_forever(address)
+    except KeyboardInterrupt:
+        info("Interrupted")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import batch_abs_integral, batch_sig_isi, get_sig_isi, integrate_nonuniform  # noqa: E402
+
+
+def _nonuniform_case(rng, samples):
+    steps = rng.uniform(0.2, 1.8, samples - 1)
+    time_ps = np.concatenate([[0.0], np.cumsum(steps)]) * (3000.0 / steps.sum())
+    volts = rng.standard_normal((6, samples)) * 0.1
+    volts[0] += 0.8 * np.exp(-((time_ps - 900.0) / 60.0) ** 2)
+    return time_ps, volts
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_batch_metrics_match_scalar_functions(seed):
+    rng = np.random.default_rng(seed)
+    time_ps, volts = _nonuniform_case(rng, 2001)
+    # 133 ps never lands on a sample of this grid, so every window end is
+    # interpolated between two samples.
+    unit_interval = 133.0
+    assert not np.isin(time_ps + unit_interval, time_ps).any()
+
+    sig, isi = batch_sig_isi(time_ps, volts, unit_interval)
+    xtalk = batch_abs_integral(time_ps, volts)
+    for row, waveform in enumerate(volts):
+        expected_sig, expected_isi = get_sig_isi(time_ps, waveform, unit_interval)
+        assert sig[row] == pytest.approx(expected_sig, abs=1e-9, rel=0)
+        assert isi[row] == pytest.approx(expected_isi, abs=1e-9, rel=0)
+        assert xtalk[row] == pytest.approx(integrate_nonuniform(time_ps, np.abs(waveform)), abs=1e-9, rel=0)
+
+
+def test_batch_metrics_handle_window_ends_on_samples():
+    time_ps = np.concatenate([np.linspace(0.0, 1000.0, 401), np.linspace(1001.0, 3000.0, 667)])
+    volts = np.random.default_rng(7).standard_normal((3, time_ps.size))
+    sig, isi = batch_sig_isi(time_ps, volts, 100.0)
+    for row, waveform in enumerate(volts):
+        expected_sig, expected_isi = get_sig_isi(time_ps, waveform, 100.0)
+        assert sig[row] == pytest.approx(expected_sig, abs=1e-9, rel=0)
+        assert isi[row] == pytest.approx(expected_isi, abs=1e-9, rel=0)
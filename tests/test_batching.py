@@ -0,0 +1,101 @@
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import Design, prefix_netlist_lines  # noqa: E402
+from test_pool_run import DrivenStandIn  # noqa: E402
+
+
+def test_prefix_renames_elements_nodes_and_models():
+    lines = [
+        '.model "Channel" S TSTONEFILE="board.s3p" INTDATTYP=MA',
+        'S1 net_1 net_2 net_13 FQMODEL="Channel"',
+        'V1 netb_1 0 PULSE(0 0.8 1e-10 30ps 30ps 133ps 1.5e+100)',
+        'R1 netb_1 net_1 40ohm',
+        'C1 netb_1 0 1pF',
+        '',
+        'R13 net_13 0 30ohm',
+    ]
+    assert prefix_netlist_lines(lines, 'b2') == [
+        '.model "Channel_b2" S TSTONEFILE="board.s3p" INTDATTYP=MA',
+        'Sb2_1 b2_net_1 b2_net_2 b2_net_13 FQMODEL="Channel_b2"',
+        'Vb2_1 b2_netb_1 0 PULSE(0 0.8 1e-10 30ps 30ps 133ps 1.5e+100)',
+        'Rb2_1 b2_netb_1 b2_net_1 40ohm',
+        'Cb2_1 b2_netb_1 0 1pF',
+        'Rb2_13 b2_net_13 0 30ohm',
+    ]
+
+
+def test_prefix_renames_params_and_subcircuits():
+    lines = [
+        '.param rtx=40 ctx={rtx*0.025p}',
+        'R1 netb_1 net_1 {rtx}',
+        'C1 netb_1 0 ctx',
+        '.subckt rterm a b rval=50',
+        'R1 a b {rval}',
+        '.ends rterm',
+        'X2 net_2 0 rterm rval=rtx',
+        'R3 net_3 0 rtx2',
+    ]
+    assert prefix_netlist_lines(lines, 'b1') == [
+        '.param rtx_b1=40 ctx_b1={rtx_b1*0.025p}',
+        'Rb1_1 b1_netb_1 b1_net_1 {rtx_b1}',
+        'Cb1_1 b1_netb_1 0 ctx_b1',
+        '.subckt rterm_b1 a b rval=50',
+        'Rb1_1 a b {rval}',
+        '.ends rterm_b1',
+        'Xb1_2 b1_net_2 0 rterm_b1 rval=rtx_b1',
+        'Rb1_3 b1_net_3 0 rtx2',
+    ]
+
+
+def test_prefixed_copies_share_only_ground():
+    lines = ['S1 net_1 net_2 FQMODEL="Channel"', 'R1 net_1 0 30', 'R2 net_2 0 30']
+    first, second = prefix_netlist_lines(lines, 'b1'), prefix_netlist_lines(lines, 'b2')
+    nodes = [{token for line in copy for token in line.split()[1:3]} for copy in (first, second)]
+    assert nodes[0] & nodes[1] == {'0'}
+    assert {line.split()[0] for line in first}.isdisjoint(line.split()[0] for line in second)
+
+
+class ReportStandIn(DrivenStandIn):
+    write_results_file = False
+
+
+def _copy(driven, nets):
+    lines = [
+        '.model "Channel" S TSTONEFILE="board.s8p" INTDATTYP=MA',
+        f"S1 {' '.join(f'net_{net}' for net in nets)} FQMODEL=\"Channel\"",
+        f'V{driven} netb_{driven} 0 PULSE(0 0.8 1e-10 30ps 30ps 133ps 1.5e+100)',
+        f'R{driven} netb_{driven} net_{driven} 40ohm',
+    ]
+    return lines + [f'R{net} net_{net} 0 30ohm' for net in nets if net != driven]
+
+
+@pytest.mark.parametrize('circuit_factory', [DrivenStandIn, ReportStandIn])
+def test_run_batch_splits_results_per_copy(tmp_path, circuit_factory):
+    # (driven TX, kept nets) per copy; the stand-in scales every copy by its TX.
+    copies = [(1, [1, 2]), (5, [3, 5, 7]), (4, [2, 4]), (8, [1, 8])] * 3
+    netlist = []
+    for index, (driven, nets) in enumerate(copies, 1):
+        netlist.extend(prefix_netlist_lines(_copy(driven, nets), f'b{index}'))
+    design = Design(tmp_path, circuit_factory=circuit_factory)
+
+    results = design.run_batch('\n'.join(netlist), len(copies))
+    assert len(results) == len(copies)
+    for (driven, nets), result in zip(copies, results):
+        assert sorted(result) == nets
+        for net, (time_ps, volts) in result.items():
+            time_ns = np.asarray(time_ps) * 1e-3
+            expected = 1.0 / net * np.exp(-time_ns) * (1.0 + 0.1 * driven)
+            np.testing.assert_allclose(volts, expected, rtol=1e-9)
+    assert design.run_count == 1
+
+    unbatched = Design(tmp_path / 'single', circuit_factory=circuit_factory).run('\n'.join(_copy(5, [3, 5, 7])))
+    for net, (_, volts) in unbatched.items():
+        np.testing.assert_allclose(results[1][net][1], volts, rtol=1e-12)
+    assert math.isclose(results[1][3][1][0], 1.5 / 3)
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import CostModel  # noqa: E402
+
+
+def test_only_aedt_predicts_time_without_history():
+    assert CostModel.fit([], 'aedt').predicts_time
+    local = CostModel.fit([{'engine': 'aedt', 'ports': 10, 'steps': 30, 'seconds': 40.0}], 'local')
+    assert local.engine == 'local' and local.samples == 0
+    assert not local.predicts_time
+    # The seed shape still ranks netlists by size for the LPT order.
+    assert local.predict(20, 30.0) > local.predict(10, 30.0)
+
+
+def test_history_calibrates_any_engine():
+    records = [{'engine': 'local', 'ports': ports, 'steps': 30, 'seconds': 0.01 * ports} for ports in (4, 8, 16, 32)]
+    model = CostModel.fit(records, 'local')
+    assert model.samples == 4 and model.predicts_time
+    assert abs(float(model.predict(16, 30.0)) - 0.16) < 0.05
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('skrf')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import cct  # noqa: E402
+from cct import CCT  # noqa: E402
+from test_pool_run import DrivenStandIn, _board  # noqa: E402
+
+
+def _snapshot(directory: Path):
+    return {
+        str(path.relative_to(directory)): (path.stat().st_size, path.stat().st_mtime_ns)
+        for path in directory.rglob('*')
+    }
+
+
+def _tool(snp_path, metadata_path, workdir):
+    tool = CCT(snp_path, metadata_path, workdir=workdir, threshold_db=-30.0, port_order='locality')
+    tool.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+    tool.set_rxs(res_rx='30ohm', cap_rx='1.8pF')
+    return tool
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_dry_run_leaves_the_tree_untouched(tmp_path, monkeypatch, incremental):
+    monkeypatch.setattr(cct, 'NETLIST_DEBUG_DIR', tmp_path / 'netlist')
+    snp_path, metadata_path = _board(tmp_path)
+    tool = _tool(snp_path, metadata_path, tmp_path / 'work')
+
+    before = _snapshot(tmp_path)
+    plan = tool.run(circuit_factory=DrivenStandIn, cache=True, incremental=incremental, dry_run=True)
+    assert _snapshot(tmp_path) == before
+    assert len(plan['batches']) == len(tool.txs)
+    assert not tool._prune_cache and tool._slice_network is tool._network
+
+    # A real run writes the permuted copy, trimmed files and cache entries;
+    # a dry run over them only reads.
+    tool.run(circuit_factory=DrivenStandIn, cache=True, incremental=incremental)
+    assert (tmp_path / 'work' / cct.PULSE_CACHE_DIRNAME).is_dir()
+    assert tool._slice_network is not tool._network
+    rerun = _tool(snp_path, metadata_path, tmp_path / 'work')
+    before = _snapshot(tmp_path)
+    rerun.run(circuit_factory=DrivenStandIn, cache=True, incremental=incremental, dry_run=True)
+    assert _snapshot(tmp_path) == before
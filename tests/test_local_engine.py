@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+rf = pytest.importorskip('skrf')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import LocalEngine, PortMetadata, Rx, Tx  # noqa: E402
+
+DELAY, RISE, WIDTH = 100e-12, 30e-12, 600e-12
+
+
+def _thru():
+    freqs = np.linspace(5e7, 100e9, 2000)
+    s = np.tile(np.array([[0.0, 1.0], [1.0, 0.0]], dtype=complex), (freqs.size, 1, 1))
+    return rf.Network(frequency=rf.Frequency.from_f(freqs, unit='Hz'), s=s, z0=50)
+
+
+def _ramp_response(t, tau):
+    """Unit ramp-to-step of rise ``RISE`` starting at ``t = 0`` through a single pole."""
+    rising = (t - tau * (1.0 - np.exp(-t / tau))) / RISE
+    settled = 1.0 - tau / RISE * (np.exp(-(t - RISE) / tau) - np.exp(-t / tau))
+    return np.where(t <= 0, 0.0, np.where(t < RISE, rising, settled))
+
+
+@pytest.mark.parametrize('res_rx, steady', [(30.0, 0.342857), (50.0, 0.444444)])
+def test_thru_matches_the_rc_divider(res_rx, steady):
+    res_tx, cap_rx, vhigh = 40.0, 1.8e-12, 0.8
+    tx = Tx(PortMetadata(1, 'U1_DQ0', 'U1', 'controller', 'DQ0', 'single'), vhigh, RISE, WIDTH, res_tx, 1e-12)
+    rx = Rx(PortMetadata(2, 'U2_DQ0', 'U2', 'dram', 'DQ0', 'single'), res_rx, cap_rx)
+    netlist = '\n'.join([*tx.get_netlist(), *rx.get_netlist(), 'S1 net_1 net_2 FQMODEL="Channel"'])
+
+    result = LocalEngine(_thru(), tstep='1ps', tstop='1.5ns').run(netlist)
+    assert sorted(result) == [1, 2]
+    time_ps, volts = result[2]
+    np.testing.assert_allclose(result[1][1], volts, atol=1e-9)  # ideal thru
+
+    # The TX cap sits on the ideal source node, so one pole remains:
+    # (R_tx || R_rx) with the RX cap.
+    t = time_ps * 1e-12
+    final = vhigh * res_rx / (res_tx + res_rx)
+    assert final == pytest.approx(steady, abs=1e-6)
+    tau = res_tx * res_rx / (res_tx + res_rx) * cap_rx
+    expected = final * (_ramp_response(t - DELAY, tau) - _ramp_response(t - DELAY - RISE - WIDTH, tau))
+    np.testing.assert_allclose(volts, expected, atol=2e-3 * final)
+
+    plateau = (t > DELAY + RISE + 10 * tau) & (t < DELAY + RISE + WIDTH)
+    assert plateau.any()
+    np.testing.assert_allclose(volts[plateau], final, atol=1e-4)
+    settled = t > DELAY + 2 * RISE + WIDTH + 10 * tau
+    assert settled.any()
+    np.testing.assert_allclose(volts[settled], 0.0, atol=1e-4)
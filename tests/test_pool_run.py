@@ -0,0 +1,104 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import cct  # noqa: E402
+from cct import CCT, CircuitStandIn, write_touchstone_ma  # noqa: E402
+
+
+class DrivenStandIn(CircuitStandIn):
+    """Stand-in whose waveforms also depend on the TX driven in each copy.
+
+    A result merged into the wrong TX, or a batch copy split back to the
+    wrong job, changes the metrics.
+    """
+
+    def analyze(self, setup_name: str) -> bool:
+        super().analyze(setup_name)
+        text = self._netlist_path.read_text(encoding='utf-8')
+        driven = {
+            prefix: int(pid)
+            for prefix, pid in re.findall(r'^V\S* ((?:b\d+_)?)netb_(\d+) 0 PULSE\(0 [^-]', text, re.MULTILINE)
+        }
+        for name, (time_ns, volts_mv) in self.solutions.items():
+            prefix = re.match(r'V\(((?:b\d+_)?)net_', name).group(1)
+            scale = 1.0 + 0.1 * driven.get(prefix, 0)
+            self.solutions[name] = (time_ns, [value * scale for value in volts_mv])
+        if self.write_results_file and self.results_directory:
+            names = list(self.solutions)
+            cct.write_transient_raw(
+                Path(self.results_directory) / cct.TRANSIENT_RESULT_FILENAME,
+                np.asarray(self.solutions[names[0]][0]) * 1e-9,
+                names,
+                np.asarray([self.solutions[name][1] for name in names]) * 1e-3,
+            )
+        return True
+
+
+def _board(directory: Path):
+    ports = []
+    for net in range(5):
+        for component, role in (('U1', 'controller'), ('U2', 'dram')):
+            ports.append({
+                'sequence': len(ports) + 1,
+                'name': f'{component}_DQ{net}',
+                'component': component,
+                'component_role': role,
+                'net': f'DQ{net}',
+                'net_type': 'single',
+            })
+    for component, role in (('U1', 'controller'), ('U2', 'dram')):
+        for polarity in ('positive', 'negative'):
+            ports.append({
+                'sequence': len(ports) + 1,
+                'name': f'{component}_CK_{polarity[0].upper()}',
+                'component': component,
+                'component_role': role,
+                'net': f'CK_{polarity[0].upper()}',
+                'net_type': 'differential',
+                'pair': 'CK',
+                'polarity': polarity,
+            })
+    metadata_path = directory / 'board_ports.json'
+    metadata_path.write_text(json.dumps({
+        'reference_net': 'GND',
+        'controller_components': ['U1'],
+        'dram_components': ['U2'],
+        'ports': ports,
+    }), encoding='utf-8')
+    snp_path = directory / f'board.s{len(ports)}p'
+    write_touchstone_ma(snp_path, np.array([1e9, 2e9]), np.tile(np.eye(len(ports)) * 0.1, (2, 1, 1)))
+    return snp_path, metadata_path
+
+
+def _run(snp_path, metadata_path, workdir, output_path, **run_kwargs):
+    tool = CCT(snp_path, metadata_path, workdir=workdir)
+    tool.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+    tool.set_rxs(res_rx='30ohm', cap_rx='1.8pF')
+    tool.run(circuit_factory=DrivenStandIn, cache=False, **run_kwargs)
+    tool.calculate(output_path)
+    return tool
+
+
+@pytest.mark.parametrize('batch_size', [1, 2])
+def test_pool_run_matches_serial_run(tmp_path, monkeypatch, batch_size):
+    monkeypatch.setattr(cct, 'NETLIST_DEBUG_DIR', tmp_path / 'netlist')
+    snp_path, metadata_path = _board(tmp_path)
+
+    serial = _run(snp_path, metadata_path, tmp_path / 'serial', tmp_path / 'serial.csv')
+    pooled = _run(
+        snp_path, metadata_path, tmp_path / 'pool', tmp_path / 'pool.csv', workers=2, batch_size=batch_size,
+    )
+
+    serial_csv = (tmp_path / 'serial.csv').read_text()
+    assert (tmp_path / 'pool.csv').read_text() == serial_csv
+    tx_labels = [line.split(',')[0] for line in serial_csv.splitlines()[1:]]
+    assert tx_labels == [tx.label for tx in serial.txs]
+    assert len(set(line.split(',')[2] for line in serial_csv.splitlines()[1:])) == len(tx_labels)
+    assert [tx.label for tx in pooled.waveforms.txs()] == [tx.label for tx in serial.waveforms.txs()]
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+rf = pytest.importorskip('skrf')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import cct  # noqa: E402
+from cct import CCT, Tx_diff, _clone_port, write_touchstone_ma  # noqa: E402
+from test_pool_run import _board  # noqa: E402
+
+THRESHOLD_DB = -30.0
+
+
+def _coupled_board(directory: Path):
+    """The stand-in board with random reciprocal coupling from -60 to -10 dB."""
+    snp_path, metadata_path = _board(directory)
+    rng = np.random.default_rng(7)
+    freqs = np.linspace(1e8, 2e10, 24)
+    ports = 14
+    loss_db = rng.uniform(10.0, 60.0, (ports, ports))
+    ripple = rng.uniform(0.3, 1.0, (freqs.size, ports, ports))
+    s = 10 ** (-loss_db / 20) * ripple * np.exp(-2j * np.pi * freqs[:, None, None] * 1e-10)
+    s = np.triu(s) + np.triu(s, 1).transpose(0, 2, 1)
+    write_touchstone_ma(snp_path, freqs, s)
+    return snp_path, metadata_path
+
+
+def _tool(tmp_path, board=_board, **kwargs):
+    snp_path, metadata_path = board(tmp_path)
+    tool = CCT(snp_path, metadata_path, workdir=tmp_path / 'work', threshold_db=THRESHOLD_DB, **kwargs)
+    tool.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+    tool.set_rxs(res_rx='30ohm', cap_rx='1.8pF')
+    return tool
+
+
+def test_set_rxs_keeps_pruning_when_only_terminations_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(cct, 'NETLIST_DEBUG_DIR', tmp_path / 'netlist')
+    tool = _tool(tmp_path)
+    summaries = tool.pre_run()
+    coupling, mask = tool._rx_coupling[tool.prune_criterion], tool._prune_mask
+    prune_results = dict(tool._prune_cache)
+    assert all('30ohm' in line for result in prune_results.values() for rx in result.rxs for line in rx.netlist[::2])
+
+    tool.set_rxs(res_rx='50ohm', cap_rx='2pF')
+    assert tool._rx_coupling[tool.prune_criterion] is coupling and tool._prune_mask is mask
+    assert tool._prune_cache == prune_results and tool._prerun_summaries == summaries
+    for tx in tool.txs:
+        prune_result = tool._prune_cache[tool._tx_to_key(tx)]
+        netlist = tool._build_netlist(prune_result, tx)
+        assert not any('30ohm' in line or '1.8pF' in line for line in netlist)
+        assert sum('50ohm' in line for line in netlist) == prune_result.stats['kept_rx_port_count']
+    tool._rx_groups()
+    assert all(rx is None or rx in tool.rxs for rx in tool._rx_group_rxs)
+
+    tool.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+    tool.set_rxs(res_rx='50ohm', cap_rx='2pF')
+    assert not tool._prune_cache and not tool._rx_coupling
+
+
+def _tx_ports(tx):
+    return [tx.pid_pos - 1, tx.pid_neg - 1] if isinstance(tx, Tx_diff) else [tx.pid - 1]
+
+
+def _rx_ports(rx):
+    return [rx.pid_pos - 1, rx.pid_neg - 1] if hasattr(rx, 'pid_pos') else [rx.pid - 1]
+
+
+def _baseline_mask(tool):
+    """RX x TX peak coupling mask from one |S| max per port pair, as before the coupling index."""
+    s = np.asarray(tool._network.s)
+    peak_db = {
+        (rx, tx): 20 * np.log10(np.abs(s[:, rx, tx]).max())
+        for rx in range(s.shape[1]) for tx in range(s.shape[2])
+    }
+    return np.array([
+        [
+            max(peak_db[rx_port, tx_port] for rx_port in _rx_ports(rx) for tx_port in _tx_ports(tx)) >= THRESHOLD_DB
+            for tx in tool.txs
+        ]
+        for rx in tool._rx_group_rxs
+    ])
+
+
+def _eager(tool, tx, kept_indices):
+    """Trimmed metadata and netlist lines built the pre-index way: clone, classify, rebuild."""
+    trimmed = [_clone_port(tool.port_metadata[index], seq) for seq, index in enumerate(kept_indices.tolist(), 1)]
+    tx_single, rx_single, tx_diff, rx_diff = tool._classify_port_groups(trimmed)
+    txs, tx_single_map, tx_diff_map = tool._create_tx_objects(tx_single, tx_diff, **tool.tx_config)
+    rxs, _, _ = tool._create_rx_objects(
+        rx_single, rx_diff, **tool.rx_config, tx_single_map=tx_single_map, tx_diff_map=tx_diff_map,
+    )
+    active = {tool._tx_to_key(candidate): candidate for candidate in txs}.get(tool._tx_to_key(tx))
+    lines = [line for candidate in txs for line in candidate.get_netlist(candidate is active)]
+    return trimmed, lines + [line for rx in rxs for line in rx.get_netlist()], len(rx_single) + len(rx_diff)
+
+
+def test_peak_mask_matches_the_per_pair_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(cct, 'NETLIST_DEBUG_DIR', tmp_path / 'netlist')
+    tool = _tool(tmp_path, board=_coupled_board)
+    mask = tool._threshold_mask()
+    baseline = _baseline_mask(tool)
+    np.testing.assert_array_equal(mask, baseline)
+    assert 0 < baseline.sum() < baseline.size
+
+
+@pytest.mark.parametrize('port_order', ['metadata', 'locality'])
+def test_lazy_prune_results_match_eager_ones(tmp_path, monkeypatch, port_order):
+    monkeypatch.setattr(cct, 'NETLIST_DEBUG_DIR', tmp_path / 'netlist')
+    tool = _tool(tmp_path, board=_coupled_board, port_order=port_order)
+    summaries = tool.pre_run()
+    network = rf.Network(str(tool.snp_path))
+    baseline = _baseline_mask(tool)
+    controllers = {seq - 1 for seq in tool._controller_sequences}
+    assert any(stats['kept_port_count'] < stats['total_port_count'] for stats in summaries)
+
+    for column, (tx, stats) in enumerate(zip(tool.txs, summaries)):
+        prune_result = tool._prune_cache[tool._tx_to_key(tx)]
+        assert prune_result._objects is None
+        kept = set(controllers)
+        for row, rx in enumerate(tool._rx_group_rxs):
+            if baseline[row, column] or rx.expected_tx is tx:
+                kept.update(_rx_ports(rx))
+        assert sorted(prune_result.kept_indices.tolist()) == sorted(kept)
+
+        trimmed, lines, rx_groups = _eager(tool, tx, prune_result.kept_indices)
+        assert prune_result.trimmed_metadata == trimmed
+        assert tool._build_netlist(prune_result, tx)[2:] == lines
+        assert stats['kept_port_count'] == len(kept)
+        assert stats['kept_rx_group_count'] == rx_groups
+        assert stats['kept_rx_port_count'] == sum(
+            len(set(_rx_ports(rx))) for rx in tool._rx_group_rxs if set(_rx_ports(rx)) <= kept
+        )
+
+        trimmed_file = rf.Network(str(prune_result.touchstone_path))
+        indices = prune_result.kept_indices
+        np.testing.assert_allclose(trimmed_file.s, network.s[:, indices[:, None], indices[None, :]], atol=1e-10)
@@ -0,0 +1,78 @@
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import cct  # noqa: E402
+from cct import CCT, CircuitStandIn, ServiceClient  # noqa: E402
+from cct_service import CctService  # noqa: E402
+from test_pool_run import _board  # noqa: E402
+
+AUTHKEY = 'cct-test-key'
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv('CCT_SERVICE_AUTHKEY', AUTHKEY)
+    monkeypatch.setattr(cct, 'NETLIST_DEBUG_DIR', tmp_path / 'netlist')
+    server = CctService(tmp_path / 'service', designs=2, circuit_factory=CircuitStandIn)
+    thread = threading.Thread(target=server.serve_forever, args=(('127.0.0.1', 0),), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while server._address is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    host, port = server._address
+    monkeypatch.setenv('CCT_SERVICE_ADDRESS', f'{host}:{port}')
+    yield server, thread
+    if thread.is_alive():
+        with ServiceClient() as client:
+            client.request({'op': 'shutdown'})
+        thread.join(10)
+
+
+def _run(snp_path, metadata_path, workdir, output_path, **run_kwargs):
+    tool = CCT(snp_path, metadata_path, workdir=workdir)
+    tool.set_txs(vhigh='0.8V', t_rise='30ps', ui='133ps', res_tx='40ohm', cap_tx='1pF')
+    tool.set_rxs(res_rx='30ohm', cap_rx='1.8pF')
+    tool.run(circuit_factory=CircuitStandIn, cache=False, **run_kwargs)
+    tool.calculate(output_path)
+    return Path(output_path).read_text()
+
+
+def test_service_run_matches_serial_run(tmp_path, service):
+    server, _ = service
+    snp_path, metadata_path = _board(tmp_path)
+    serial = _run(snp_path, metadata_path, tmp_path / 'serial', tmp_path / 'serial.csv')
+    served = _run(
+        snp_path, metadata_path, tmp_path / 'served', tmp_path / 'served.csv',
+        service=True, workers=2, batch_size=2,
+    )
+    assert served == serial
+    assert sum(design.run_count for design in server._designs) == 3
+
+
+def test_service_protocol(service):
+    server, thread = service
+    with ServiceClient() as client:
+        assert client.ping() == {'ok': True, 'designs': 2, 'circuit': 'CircuitStandIn'}
+        with pytest.raises(RuntimeError, match="service runs 'CircuitStandIn', not 'aedt'"):
+            client.run('', '100ps', '3ns')
+        # Another circuit version gets its own design; the default pool is untouched.
+        client.run('S1 net_1 FQMODEL="Channel"', '100ps', '3ns', version='2024.2', circuit='CircuitStandIn')
+        assert client.ping()['designs'] == 3
+        assert server._pools['2024.2'].qsize() == 1
+        assert server._pools[server.default_version].qsize() == 2
+
+    with pytest.raises(AuthenticationError):
+        ServiceClient(authkey=b'wrong-key')
+
+    with ServiceClient() as client:
+        assert client.request({'op': 'shutdown'}) == {'ok': True}
+    thread.join(10)
+    assert not thread.is_alive()
+    assert ServiceClient.connect() is None
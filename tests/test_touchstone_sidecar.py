@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+rf = pytest.importorskip('skrf')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import LazyNetwork, TrimmedTouchstoneStore, _parse_touchstone_v1  # noqa: E402
+
+
+def _per_port_network(tmp_path):
+    rng = np.random.default_rng(0)
+    s = 0.1 * (rng.standard_normal((5, 3, 3)) + 1j * rng.standard_normal((5, 3, 3)))
+    s = (s + s.transpose(0, 2, 1)) / 2
+    network = rf.Network(frequency=rf.Frequency(1, 10, 5, 'GHz'), s=s, z0=[50, 40, 30])
+    network.write_touchstone('per_port', dir=str(tmp_path), version='2.0')
+    path = tmp_path / 'per_port.s3p'
+    (tmp_path / 'per_port.ts').rename(path)
+    return network, path
+
+
+def test_sidecar_keeps_per_port_reference_impedances(tmp_path):
+    network, path = _per_port_network(tmp_path)
+    lazy = LazyNetwork.open(path)
+    assert lazy.reference_z0 is None
+    np.testing.assert_array_equal(lazy.z0[0], [50, 40, 30])
+
+    reopened = LazyNetwork.open(path)
+    np.testing.assert_array_equal(reopened.z0[-1], [50, 40, 30])
+    np.testing.assert_array_equal(lazy.permuted([2, 0, 1]).z0[0], [30, 50, 40])
+
+    sub = lazy.subnetwork([2, 0])
+    np.testing.assert_array_equal(sub.z0[0], [30, 50])
+    np.testing.assert_allclose(sub.s, network.subnetwork([2, 0]).s)
+
+
+@pytest.mark.parametrize('matrix_format', ['full', 'upper'])
+def test_trimmed_file_renormalizes_per_port_impedances(tmp_path, matrix_format):
+    network, path = _per_port_network(tmp_path)
+    store = TrimmedTouchstoneStore(tmp_path / 'trimmed', matrix_format=matrix_format)
+    trimmed = rf.Network(str(store.get_or_write(LazyNetwork.open(path), path, [3, 1])))
+    np.testing.assert_array_equal(trimmed.z0[0], [50, 50])
+    np.testing.assert_allclose(trimmed.z, network.subnetwork([2, 0]).z, rtol=1e-9)
+
+
+def test_parser_falls_back_on_unparsable_numbers(tmp_path):
+    rows = ['# GHz S RI R 50', '1.0 0.5 0.0 0.1 0.0 0.1 0.0 0.5 0.0', '2.0 0.4 0.1 0.2 0.0 0.2 0.0 0.4 0.1']
+    path = tmp_path / 'plain.s2p'
+    path.write_text('\n'.join(rows) + '\n')
+    assert _parse_touchstone_v1(path, tmp_path / 'f.bin', tmp_path / 's.bin') == (2, 2, 50.0)
+    np.testing.assert_allclose(LazyNetwork.open(path).s, rf.Network(str(path)).s)
+
+    fortran = tmp_path / 'fortran.s2p'
+    fortran.write_text('\n'.join(rows).replace('0.1 0.0 0.1', '1.0D-1 0.0 0.1') + '\n')
+    assert _parse_touchstone_v1(fortran, tmp_path / 'f.bin', tmp_path / 's.bin') is None
@@ -0,0 +1,95 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+rf = pytest.importorskip('skrf')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import LazyNetwork, TrimmedTouchstoneStore, load_network, write_touchstone_ma  # noqa: E402
+
+# 12 significant digits in magnitude and in the angle in degrees.
+ATOL = 1e-10
+
+
+def _s_params(n_ports, n_freq=7, reciprocal=False, seed=0):
+    rng = np.random.default_rng(seed)
+    s = rng.uniform(0.01, 0.9, (n_freq, n_ports, n_ports)) * np.exp(
+        1j * rng.uniform(-np.pi, np.pi, (n_freq, n_ports, n_ports))
+    )
+    if reciprocal:
+        s = np.triu(s) + np.triu(s, 1).transpose(0, 2, 1)
+    return np.linspace(1e8, 2e10, n_freq), s
+
+
+def _assert_round_trip(path, freqs_hz, s, z0):
+    for reloaded in (rf.Network(str(path)), load_network(path)):
+        np.testing.assert_allclose(reloaded.f, freqs_hz, rtol=1e-11)
+        np.testing.assert_allclose(reloaded.s, s, rtol=0, atol=ATOL)
+        np.testing.assert_array_equal(reloaded.z0, np.full(s.shape[:2], z0))
+
+
+@pytest.mark.parametrize('n_ports', [1, 2, 3, 5])
+def test_full_matrix_round_trip(tmp_path, n_ports):
+    freqs_hz, s = _s_params(n_ports)
+    path = tmp_path / f'full.s{n_ports}p'
+    write_touchstone_ma(path, freqs_hz, s, z0=42.5)
+    _assert_round_trip(path, freqs_hz, s, 42.5)
+
+
+def test_two_port_column_order(tmp_path):
+    freqs_hz = np.array([1e9])
+    s = np.array([[[0.1, 0.2], [0.3, 0.4]]], dtype=complex)
+    path = tmp_path / 'order.s2p'
+    write_touchstone_ma(path, freqs_hz, s, precision=3)
+    data = [line.split() for line in path.read_text().splitlines() if not line.startswith(('!', '#'))]
+    # Touchstone 1.0 two-port rows are S11 S21 S12 S22.
+    assert [float(value) for value in data[0][1::2]] == [0.1, 0.3, 0.2, 0.4]
+    _assert_round_trip(path, freqs_hz, s, 50.0)
+
+
+@pytest.mark.parametrize('n_ports', [2, 3, 5])
+def test_upper_matrix_round_trip(tmp_path, n_ports):
+    freqs_hz, s = _s_params(n_ports, reciprocal=True)
+    path = tmp_path / f'upper.s{n_ports}p'
+    write_touchstone_ma(path, freqs_hz, s, z0=50.0, matrix_format='upper')
+    text = path.read_text()
+    assert '[Matrix Format] Upper' in text and text.endswith('[End]\n')
+    _assert_round_trip(path, freqs_hz, s, 50.0)
+
+
+def test_unknown_matrix_format_is_rejected(tmp_path):
+    freqs_hz, s = _s_params(2)
+    with pytest.raises(ValueError):
+        write_touchstone_ma(tmp_path / 'lower.s2p', freqs_hz, s, matrix_format='lower')
+
+
+def test_background_writes_are_joined_by_flush(tmp_path):
+    freqs_hz, s = _s_params(6, n_freq=40)
+    source = tmp_path / 'source.s6p'
+    write_touchstone_ma(source, freqs_hz, s)
+    network = LazyNetwork.open(source)
+    kept_sets = [[1, 2, 3], [2, 4, 6], [5]]
+
+    store = TrimmedTouchstoneStore(tmp_path / 'background', background=True)
+    paths = [store.get_or_write(network, source, kept) for kept in kept_sets]
+    threads = list(store._executor._threads)
+    assert threads
+    store.flush()
+    assert store._executor is None and not store._pending
+    assert not any(thread.is_alive() for thread in threads)
+
+    written = [path.read_bytes() for path in paths]
+    for kept, path in zip(kept_sets, paths):
+        np.testing.assert_allclose(rf.Network(str(path)).s, network.slice([seq - 1 for seq in kept]), atol=ATOL)
+
+    foreground = TrimmedTouchstoneStore(tmp_path / 'foreground')
+    for kept, data in zip(kept_sets, written):
+        assert foreground.get_or_write(network, source, kept).read_bytes() == data
+
+    assert [store.get_or_write(network, source, kept) for kept in kept_sets] == paths
+    assert store.reused == len(kept_sets) and store.written == len(kept_sets)
+    assert store._executor is None
+    assert [path.read_bytes() for path in paths] == written
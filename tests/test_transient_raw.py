@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import TRANSIENT_RESULT_FILENAME, CircuitStandIn, Design, TransientRawFile, write_transient_raw  # noqa: E402
+
+
+def _fixture(path):
+    time_s = np.linspace(0.0, 3e-9, 301)
+    names = ['V(net_1)', 'V(b2_net_7)', 'I(vsrc)']
+    volts = np.vstack([np.exp(-time_s * 1e9), 0.5 * np.sin(time_s * 1e9), np.zeros_like(time_s)])
+    write_transient_raw(path, time_s, names, volts)
+    return time_s, names, volts
+
+
+def test_raw_file_round_trip(tmp_path):
+    path = tmp_path / 'fixture.raw'
+    time_s, names, volts = _fixture(path)
+    with TransientRawFile(path) as raw_file:
+        assert raw_file.names == ['time'] + names
+        np.testing.assert_allclose(raw_file.time_ps, time_s * 1e12)
+        np.testing.assert_array_equal(raw_file.column('V(b2_net_7)'), volts[1])
+        block = raw_file.columns(['I(vsrc)', 'V(net_1)'])
+    assert raw_file.data is None
+    np.testing.assert_array_equal(block, volts[[2, 0]])
+
+
+def test_read_results_file_accepts_only_the_nexxim_name(tmp_path):
+    design = SimpleNamespace(circuit=SimpleNamespace(results_directory=str(tmp_path)))
+    (tmp_path / 'nested').mkdir()
+    _fixture(tmp_path / 'nested' / 'other.raw')
+    assert Design._read_results_file(design) is None
+
+    _, _, volts = _fixture(tmp_path / TRANSIENT_RESULT_FILENAME)
+    raw = Design._read_results_file(design)
+    assert sorted(raw) == ['V(b2_net_7)', 'V(net_1)']
+    np.testing.assert_array_equal(raw['V(net_1)'][1], volts[0])
+
+    # The values are copies: the file can be rewritten while they are held.
+    (tmp_path / TRANSIENT_RESULT_FILENAME).write_bytes(b'')
+    np.testing.assert_array_equal(raw['V(b2_net_7)'][1], volts[1])
+
+
+class ReportOnlyStandIn(CircuitStandIn):
+    write_results_file = False
+
+
+def test_stale_results_file_is_not_returned(tmp_path):
+    design = Design(tmp_path, circuit_factory=ReportOnlyStandIn)
+    stale = Path(design.circuit.results_directory) / TRANSIENT_RESULT_FILENAME
+    stale.parent.mkdir()
+    time_s = np.linspace(0.0, 3e-9, 301)
+    write_transient_raw(stale, time_s, ['V(net_1)', 'V(net_3)'], np.zeros((2, time_s.size)))
+
+    result = design.run('R1 net_1 0 30\nR3 net_3 0 30')
+    assert not stale.exists()
+    time_ns = np.asarray(result[3][0]) * 1e-3
+    np.testing.assert_allclose(result[3][1], np.exp(-time_ns) / 3)
+    np.testing.assert_allclose(result[1][1], np.exp(-time_ns))
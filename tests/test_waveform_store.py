@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from cct import DiskWaveformStore  # noqa: E402
+
+
+def test_stores_sharing_a_directory_keep_their_shards(tmp_path):
+    time_values = np.linspace(0.0, 3e3, 31)
+    first = DiskWaveformStore(tmp_path)
+    first.add('tx', time_values, ['rx'], np.ones((1, 31)))
+    second = DiskWaveformStore(tmp_path)
+    second.add('tx', time_values, ['rx'], np.zeros((1, 31)))
+
+    assert first.directory != second.directory
+    np.testing.assert_array_equal(first.get('rx', 'tx')[1], np.ones(31))
+    np.testing.assert_array_equal(second.get('rx', 'tx')[1], np.zeros(31))
+
+    directory = first.directory
+    del first
+    assert not directory.exists()
+    assert second.directory.exists()